@@ -0,0 +1,200 @@
+import operator
+
+from sql_interpreter import executor
+from sql_interpreter import vectorized
+
+
+
+# group by is answered by hash aggregation: a single pass over the input keeps, for every group found
+# so far, one value for every aggregate (a sum, a minimum...) plus the number of rows of the group,
+# groups are returned in the order their first rows are found
+# aggregates are (function, column_index) pairs, column_index is None for count(*)
+# the aggregates of a scan whose conditions, aggregated and grouped columns can all be read as numpy
+# arrays are computed over whole columns by VectorizedAggregate, like VectorizedEvaluator its int
+# sums wrap around on overflow
+# there are no null values: without group by and without input rows the result is a single row
+# with zero counts and sums and NaN averages, or no row at all if it contains min or max
+
+
+
+functions = ('count', 'sum', 'avg', 'min', 'max')
+
+
+numeric_types = ('int', 'float')
+
+
+
+def get_column_name(function, column_name):
+   return '{}({})'.format(function, '*' if column_name is None else column_name)
+
+
+
+def get_result_type(function, column_type):
+   if function == 'count':
+      return 'int'
+   if function == 'avg':
+      return 'float'
+   return column_type
+
+
+
+def get_output_columns(column_names, column_types, group_keys, aggregates):
+   # the names and the types of the rows produced by an aggregation: the grouped columns then the aggregates
+   names = [column_names[i] for i in group_keys]
+   types = [column_types[i] for i in group_keys]
+   for function, column_index in aggregates:
+      names.append(get_column_name(function, None if column_index is None else column_names[column_index]))
+      types.append(get_result_type(function, None if column_index is None else column_types[column_index]))
+   return names, types
+
+
+
+def get_empty_result(aggregates, column_types):
+   # the rows of an aggregation without groups and without input rows
+   if any(function in ('min', 'max') for function, _ in aggregates):
+      return []
+   values = {'count': lambda column_type: 0,
+             'sum': lambda column_type: 0 if column_type == 'int' else 0.0,
+             'avg': lambda column_type: float('nan')}
+   return [tuple(values[function](None if column_index is None else column_types[column_index])
+                 for function, column_index in aggregates)]
+
+
+
+class HashAggregate(executor.Operator):
+   def __init__(self, child, group_keys, aggregates):
+      self.group_keys = tuple(group_keys)
+      self.aggregates = tuple(aggregates)
+      super().__init__(*get_output_columns(child.get_column_names(), child.get_column_types(), self.group_keys, self.aggregates))
+      self.child = child
+
+
+   def __iter__(self):
+      group_keys = self.group_keys
+      aggregates = self.aggregates
+      if not group_keys:
+         key = lambda row: ()
+      else:
+         key = operator.itemgetter(*group_keys)
+      # the position of the value of every aggregate inside the state of a group, the last one is the row count
+      columns = [column_index for _, column_index in aggregates]
+      sums = [(slot, column_index) for slot, (function, column_index) in enumerate(aggregates) if function in ('sum', 'avg')]
+      mins = [(slot, column_index) for slot, (function, column_index) in enumerate(aggregates) if function == 'min']
+      maxs = [(slot, column_index) for slot, (function, column_index) in enumerate(aggregates) if function == 'max']
+
+      groups = {}
+      for row in self.child:
+         group_key = key(row)
+         state = groups.get(group_key)
+         if state is None:
+            # the first row of the group is the initial value of every aggregate
+            groups[group_key] = [None if column_index is None else row[column_index] for column_index in columns] + [1]
+            continue
+         state[-1] += 1
+         for slot, column_index in sums:
+            state[slot] += row[column_index]
+         for slot, column_index in mins:
+            value = row[column_index]
+            if value < state[slot]:
+               state[slot] = value
+         for slot, column_index in maxs:
+            value = row[column_index]
+            if value > state[slot]:
+               state[slot] = value
+
+      if not groups and not group_keys:
+         yield from get_empty_result(aggregates, self.child.get_column_types())
+         return
+      for group_key, state in groups.items():
+         if len(group_keys) == 1:
+            group_key = (group_key,)
+         count = state[-1]
+         values = []
+         for slot, (function, _) in enumerate(aggregates):
+            if function == 'count':
+               values.append(count)
+            elif function == 'avg':
+               values.append(state[slot] / count)
+            else:
+               values.append(state[slot])
+         yield group_key + tuple(values)
+
+
+
+def supports_vectorized(table, conjuncts, group_keys, aggregates):
+   # the conditions and the aggregated columns must be numeric, grouped strings are read as their ids
+   if not vectorized.is_available():
+      return False
+   column_types = table.get_column_types()
+   if any(column_index is not None and column_types[column_index] not in numeric_types for _, column_index in aggregates):
+      return False
+   evaluator = vectorized.VectorizedEvaluator(table.columns, column_types, len(table))
+   return all(evaluator.supports(conjunct) for conjunct in conjuncts)
+
+
+
+class VectorizedAggregate(executor.Operator):
+   def __init__(self, table, condition_tree, group_keys, aggregates):
+      self.group_keys = tuple(group_keys)
+      self.aggregates = tuple(aggregates)
+      super().__init__(*get_output_columns(table.get_column_names(), table.get_column_types(), self.group_keys, self.aggregates))
+      self.table = table
+      self.condition_tree = condition_tree
+
+
+   def __iter__(self):
+      # the whole result is computed before the first row is returned, the numpy views over the
+      # column buffers must not outlive this call or the columns couldn't grow anymore
+      numpy = vectorized.numpy
+      table = self.table
+      length = len(table)
+      selected = None
+      if self.condition_tree:
+         evaluator = vectorized.VectorizedEvaluator(table.columns, table.get_column_types(), length)
+         selected = numpy.flatnonzero(evaluator.evaluate(self.condition_tree))
+         del evaluator
+      row_count = length if selected is None else len(selected)
+      if row_count == 0:
+         return iter([] if self.group_keys else get_empty_result(self.aggregates, table.get_column_types()))
+
+      def get_values(column_index):
+         column = table.columns[column_index]
+         values = numpy.frombuffer(column.data, dtype=numpy.dtype(column.typecode), count=length)
+         return values if selected is None else values[selected]
+
+      # every combination of grouped values gets a code, then codes are numbered in the order of
+      # their first rows, as hash aggregation does
+      codes = numpy.zeros(row_count, dtype='int64')
+      for column_index in self.group_keys:
+         uniques, inverse = numpy.unique(get_values(column_index), return_inverse=True)
+         codes = codes * len(uniques) + inverse.reshape(-1)
+         _, codes = numpy.unique(codes, return_inverse=True)
+      _, first_rows, codes = numpy.unique(codes.reshape(-1), return_index=True, return_inverse=True)
+      group_count = len(first_rows)
+      appearance = numpy.argsort(first_rows, kind='stable')
+      group_ids = numpy.empty(group_count, dtype='int64')
+      group_ids[appearance] = numpy.arange(group_count)
+      group_ids = group_ids[codes.reshape(-1)]
+      first_rows = first_rows[appearance]
+
+      # the rows are ordered by group, so every aggregate is a reduction over consecutive slices
+      order = numpy.argsort(group_ids, kind='stable')
+      counts = numpy.bincount(group_ids, minlength=group_count)
+      starts = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+      result_columns = []
+      for column_index in self.group_keys:
+         values = get_values(column_index)[first_rows].tolist()
+         column = table.columns[column_index]
+         if hasattr(column, 'pool'):
+            values = [column.pool[string_id] for string_id in values]
+         result_columns.append(values)
+      reductions = {'sum': numpy.add, 'avg': numpy.add, 'min': numpy.minimum, 'max': numpy.maximum}
+      for function, column_index in self.aggregates:
+         if function == 'count':
+            result_columns.append(counts.tolist())
+            continue
+         values = reductions[function].reduceat(get_values(column_index)[order], starts)
+         if function == 'avg':
+            values = values / counts
+         result_columns.append(values.tolist())
+      return zip(*result_columns)
@@ -0,0 +1,63 @@
+import socket
+
+from sql_interpreter import protocol
+
+
+
+# blocking client of server.py, tables come back as database.Table objects and the errors raised by
+# the statements are raised again with the same type
+class Client:
+   def __init__(self, host='127.0.0.1', port=5433, path=None):
+      if path:
+         self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+         self.socket.connect(path)
+      else:
+         self.socket = socket.create_connection((host, port))
+         self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+      self.file = self.socket.makefile('rb')
+
+
+   def __enter__(self):
+      return self
+
+
+   def __exit__(self, *args):
+      self.close()
+
+
+   def close(self):
+      self.file.close()
+      self.socket.close()
+
+
+   def execute(self, query, *parameters):
+      result = self.pipeline([(query, parameters)])[0]
+      if isinstance(result, Exception):
+         raise result
+      return result
+
+
+   def pipeline(self, statements):
+      # sends all the statements, given as queries or (query, parameters) pairs, before reading any
+      # response, so they cost a single round trip
+      # returns their results in order, the statements which failed have the exception in place of the result
+      requests = []
+      for statement in statements:
+         query, parameters = (statement, ()) if isinstance(statement, str) else statement
+         requests.append(protocol.encode_frame({'query': query, 'parameters': list(parameters)}))
+      self.socket.sendall(b''.join(requests))
+      return [self.read_response() for _ in requests]
+
+
+   def read_response(self):
+      response = protocol.decode_payload(self.read_exactly(protocol.decode_length(self.read_exactly(protocol.header.size))))
+      if 'error' in response:
+         return protocol.decode_error(response['error'])
+      return protocol.decode_result(response['result'])
+
+
+   def read_exactly(self, size):
+      data = self.file.read(size)
+      if len(data) != size:
+         raise ConnectionError('The server closed the connection.')
+      return data
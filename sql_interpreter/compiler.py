@@ -0,0 +1,185 @@
+import itertools
+
+
+
+NAN = float('nan')
+
+
+
+def build_tree(condition):
+   # turns the postfix list returned by Table.modify_condition into a tree made of nested tuples:
+   # ('OPERATOR', operator, left, right), ('COLUMN_NAME', index) or ('LITERAL', value)
+   stack = []
+   for element in condition:
+      if element[0] == 'OPERATOR':
+         try:
+            right = stack.pop()
+            left = stack.pop()
+         except IndexError as ie:
+            raise ValueError("Wrong syntax for SELECT, something went wrong while parsing the condition list.") from ie
+         stack.append(('OPERATOR', element[1], left, right))
+      else:
+         stack.append(element)
+   if len(stack) != 1:
+      raise ValueError("Wrong syntax for SELECT, something went wrong while parsing the condition list.")
+   return stack[0]
+
+
+
+def split_conjuncts(tree):
+   # returns the list of subtrees which are joined together by the top level and operators
+   if tree[0] == 'OPERATOR' and tree[1] == 'and':
+      return split_conjuncts(tree[2]) + split_conjuncts(tree[3])
+   return [tree]
+
+
+
+def join_conjuncts(conjuncts):
+   tree = conjuncts[0]
+   for conjunct in conjuncts[1:]:
+      tree = ('OPERATOR', 'and', tree, conjunct)
+   return tree
+
+
+
+def get_column_indexes(tree):
+   if tree[0] == 'COLUMN_NAME':
+      return {tree[1]}
+   if tree[0] == 'OPERATOR':
+      return get_column_indexes(tree[2]) | get_column_indexes(tree[3])
+   return set()
+
+
+
+def shift_columns(tree, offset):
+   # moves every column reference by offset, needed when a condition is applied to a part of the row
+   if tree[0] == 'COLUMN_NAME':
+      return ('COLUMN_NAME', tree[1] + offset)
+   if tree[0] == 'OPERATOR':
+      return ('OPERATOR', tree[1], shift_columns(tree[2], offset), shift_columns(tree[3], offset))
+   return tree
+
+
+
+def map_columns(tree, positions):
+   # moves every column reference to positions[index]
+   if tree[0] == 'COLUMN_NAME':
+      return ('COLUMN_NAME', positions[tree[1]])
+   if tree[0] == 'OPERATOR':
+      return ('OPERATOR', tree[1], map_columns(tree[2], positions), map_columns(tree[3], positions))
+   return tree
+
+
+
+def format_tree(tree, column_names):
+   # the condition as it would be written inside a query, with brackets around nested operators
+   if tree[0] == 'COLUMN_NAME':
+      return column_names[tree[1]]
+   if tree[0] == 'LITERAL':
+      return str(tree[1])
+   if tree[0] == 'PARAMETER':
+      return '?'
+   operands = []
+   for operand in tree[2:]:
+      operand_source = format_tree(operand, column_names)
+      operands.append('(' + operand_source + ')' if operand[0] == 'OPERATOR' else operand_source)
+   return '{} {} {}'.format(operands[0], tree[1], operands[1])
+
+
+
+def div_int(value1, value2):
+   if value2 == 0 or value1 != value1 or value2 != value2:
+      return NAN
+   return int(value1 / value2)
+
+
+
+def div_float(value1, value2):
+   if value2 == 0 or value1 != value1 or value2 != value2:
+      return NAN
+   return value1 / value2
+
+
+
+def not_equal(value1, value2):
+   # comparisons involving NaN are always false, python's != is the only one which disagrees
+   return value1 == value1 and value2 == value2 and value1 != value2
+
+
+
+# translates a condition into the source of a single python lambda working on tuples of raw values,
+# the types of every subexpression are known in advance so all the checks made by the Type classes
+# while interpreting the condition are done only once, here
+class ConditionCompiler:
+   comparison_operators = {'<': '<', '<=': '<=', '=': '==', '>': '>', '>=': '>='}
+   arithmetic_operators = {'+': '+', '-': '-', '*': '*'}
+   boolean_operators = {'and': 'and', 'or': 'or'}
+
+
+   # operators supported by the left operand type, mirrors the operators dicts of the Type classes
+   type_operators = {'bool': {'and', 'or'},
+                     'int': {'<', '<=', '=', '<>', '>', '>=', '+', '-', '*', '/'},
+                     'float': {'<', '<=', '=', '<>', '>', '>=', '+', '-', '*', '/'},
+                     'string': {'<', '<=', '=', '<>', '>', '>=', '+'}}
+
+
+   literal_types = {'TypeInt': 'int', 'TypeFloat': 'float', 'TypeString': 'string', 'TypeBool': 'bool'}
+
+
+   def __init__(self, column_types):
+      self.column_types = tuple(column_types)
+
+
+   def compile(self, condition):
+      tree = build_tree(condition)
+      return self.compile_tree(tree)
+
+
+   def compile_tree(self, tree):
+      namespace = {'div_int': div_int, 'div_float': div_float, 'not_equal': not_equal}
+      source, value_type, _ = self.translate(tree, namespace)
+      if value_type != 'bool':
+         raise ValueError('Something went wrong while applying the condition, final value was not a bool.')
+      return eval('lambda row: ' + source, namespace)
+
+
+   # returns the source of the expression, its type and whether it could evaluate to NaN
+   def translate(self, node, namespace):
+      if node[0] == 'COLUMN_NAME':
+         return 'row[{}]'.format(node[1]), self.column_types[node[1]], False
+      if node[0] == 'LITERAL':
+         name = 'literal{}'.format(len(namespace))
+         namespace[name] = node[1].get_value()
+         return name, self.literal_types[type(node[1]).__name__], False
+
+      _, operator, left, right = node
+      left_source, left_type, left_nan = self.translate(left, namespace)
+      right_source, right_type, right_nan = self.translate(right, namespace)
+      maybe_nan = left_nan or right_nan
+      if operator not in self.type_operators[left_type]:
+         raise ValueError('Undefined operator {}'.format(operator))
+      # <= is the only operator which doesn't check the type of its arguments
+      if operator != '<=' and left_type != right_type:
+         raise TypeError('Arguments belongs to different types.')
+
+      if operator in self.boolean_operators:
+         source = '({} {} {})'.format(left_source, operator, right_source)
+         return source, 'bool', False
+      if operator == '<>':
+         if maybe_nan:
+            return 'not_equal({}, {})'.format(left_source, right_source), 'bool', False
+         return '({} != {})'.format(left_source, right_source), 'bool', False
+      if operator in self.comparison_operators:
+         source = '({} {} {})'.format(left_source, self.comparison_operators[operator], right_source)
+         return source, 'bool', False
+      if operator == '/':
+         function = 'div_int' if left_type == 'int' else 'div_float'
+         return '{}({}, {})'.format(function, left_source, right_source), left_type, True
+      source = '({} {} {})'.format(left_source, self.arithmetic_operators[operator], right_source)
+      return source, left_type, maybe_nan
+
+
+
+def filter_indexes(predicate, rows):
+   # positions of the rows satisfying the predicate, computed without leaving C code but for the predicate calls
+   return list(itertools.compress(itertools.count(), map(predicate, rows)))
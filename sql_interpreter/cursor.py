@@ -0,0 +1,66 @@
+import itertools
+
+from sql_interpreter import database
+from sql_interpreter import executor
+
+
+
+# streams the rows of a query instead of storing them inside a table, rows are pulled from the
+# pipeline only when they are fetched, so the first ones are available before the whole result
+# is computed and the memory used doesn't grow with the number of rows
+# rows are tuples of raw values, format_row turns them into text as Table.__str__ does
+class Cursor:
+   # number of rows returned by fetchmany when no size is given
+   arraysize = 100
+
+
+   def __init__(self, pipeline):
+      self.column_names = pipeline.get_column_names()
+      self.column_types = pipeline.get_column_types()
+      self.rows = iter(pipeline)
+      self.factories = tuple(database.Table.value_factories[column_type] for column_type in self.column_types)
+
+
+   @classmethod
+   def create_from_table(cls, table):
+      # the rows inserted into the table while the cursor is open aren't returned
+      return cls(executor.TableScan(table.get_version()))
+
+
+   def __iter__(self):
+      return self.rows
+
+
+   def fetchone(self):
+      # returns None once all the rows have been fetched
+      return next(self.rows, None)
+
+
+   def fetchmany(self, size=None):
+      return list(itertools.islice(self.rows, self.arraysize if size is None else size))
+
+
+   def fetchall(self):
+      return list(self.rows)
+
+
+   def close(self):
+      # the rows not fetched yet are never computed
+      self.rows = iter(())
+
+
+   def get_column_names(self):
+      return self.column_names
+
+
+   def get_column_types(self):
+      return self.column_types
+
+
+   def get_header_string(self):
+      columns = (' '.join(column) for column in zip(self.column_names, self.column_types))
+      return ','.join(columns)
+
+
+   def format_row(self, row):
+      return str(database.Row(factory(value) for factory, value in zip(self.factories, row)))
@@ -1,5 +1,24 @@
+import csv
 import itertools
 import re
+import time
+
+from sql_interpreter import aggregate
+from sql_interpreter import compiler
+from sql_interpreter import cursor as cursor_module
+from sql_interpreter import executor
+from sql_interpreter import index as index_module
+from sql_interpreter import parallel
+from sql_interpreter import planner
+from sql_interpreter import result_cache as result_cache_module
+from sql_interpreter import snapshot
+from sql_interpreter import sort
+from sql_interpreter import statistics as statistics_module
+from sql_interpreter import storage
+from sql_interpreter import vectorized
+from sql_interpreter import view as view_module
+from sql_interpreter import wal
+from sql_interpreter import zonemap
 
 
 
@@ -12,11 +31,61 @@ def zip_equal(*args):
 
 
 
+# translates column names into indexes and parses literals into TypeClasses, ? placeholders become
+# numbered parameters which are replaced by bind_parameters
+def modify_condition(condition, name_to_index):
+   modified_condition = []
+   parameter_count = 0
+   for element in condition:
+      if element in name_to_index:
+         modified_condition.append(('COLUMN_NAME', name_to_index[element]))
+      elif element == '?':
+         modified_condition.append(('PARAMETER', parameter_count))
+         parameter_count += 1
+      elif TypeFloat.regex.match(element):
+         modified_condition.append(('LITERAL', TypeFloat(element)))
+      elif TypeInt.regex.match(element):
+         modified_condition.append(('LITERAL', TypeInt(element)))
+      elif TypeString.regex.match(element):
+         modified_condition.append(('LITERAL', TypeString(element)))
+      else:
+         modified_condition.append(('OPERATOR', element))
+   return modified_condition
+
+
+
+def count_parameters(condition):
+   return sum(1 for element in condition if element[0] == 'PARAMETER')
+
+
+
+def bind_parameters(condition, parameters):
+   # parameters are python values, so they are wrapped into TypeClasses without parsing any literal
+   bound_condition = []
+   for element in condition:
+      if element[0] == 'PARAMETER':
+         value = parameters[element[1]]
+         if type(value) not in parameter_classes:
+            raise TypeError('Parameter number {} has unsupported type {}.'.format(element[1], type(value).__name__))
+         element = ('LITERAL', parameter_classes[type(value)].new_instance(value))
+      bound_condition.append(element)
+   return bound_condition
+
+
+
 # TODO: definite exceptions classes for every error type
+# values don't have a __dict__ and share the operators tables of their classes, so creating one only
+# costs the allocation of the object itself, instances are never modified so they can be shared
 class Type:
+   __slots__ = ('value',)
+
+
+   # maps every operator to the function implementing it
+   operators = {}
+
+
    def __init__(self, value):
       self.value = value
-      self.operators = {}
 
 
    def __str__(self):
@@ -33,89 +102,107 @@ class Type:
 
 
    def do_operation(self, operator, value2):
-      if operator not in self.operators:
+      function = self.operators.get(operator)
+      if function is None:
          raise ValueError('Undefined operator {}'.format(operator))
-      return self.operators[operator](value2)
+      return function(self, value2)
 
 
 
 class TypeBool(Type):
+   __slots__ = ()
+
+
    def __init__(self, value):
       if type(value) is not bool:
          raise TypeError('Bool value must be either True or False.')
       super().__init__(value)
-      self.operators['and'] = self.boolean_and
-      self.operators['or'] = self.boolean_or
+
+
+   @staticmethod
+   def new_instance(value):
+      return TypeBool.true if value else TypeBool.false
 
 
    def boolean_and(self, value2):
       self.check_type(value2)
-      return TypeBool(self.get_value() and value2.get_value())
+      return TypeBool.new_instance(self.value and value2.value)
 
 
    def boolean_or(self, value2):
       self.check_type(value2)
-      return TypeBool(self.get_value() or value2.get_value())
+      return TypeBool.new_instance(self.value or value2.value)
+
+
+   operators = {'and': boolean_and,
+                'or': boolean_or}
+
+
+TypeBool.true = TypeBool(True)
+TypeBool.false = TypeBool(False)
 
 
 
 class TypeBase(Type):
-   def __init__(self, value):
-      super().__init__(value)
-      self.operators['<'] = self.less_than
-      self.operators['<='] = self.less_than_or_equal
-      self.operators['='] = self.equal
-      self.operators['<>'] = self.not_equal
-      self.operators['>'] = self.greater_than
-      self.operators['>='] = self.greater_than_or_equal
-      self.operators['+'] = self.add
+   __slots__ = ()
 
 
    def less_than(self, value2):
       self.check_type(value2)
-      return TypeBool(self.get_value() < value2.get_value())
+      return TypeBool.new_instance(self.value < value2.value)
 
 
    def less_than_or_equal(self, value2):
-      return TypeBool(self.get_value() <= value2.get_value())
+      return TypeBool.new_instance(self.value <= value2.value)
 
 
    def equal(self, value2):
       self.check_type(value2)
-      return TypeBool(self.get_value() == value2.get_value())
+      return TypeBool.new_instance(self.value == value2.value)
 
 
    def not_equal(self, value2):
       self.check_type(value2)
-      return TypeBool(self.get_value() != value2.get_value())
+      return TypeBool.new_instance(self.value != value2.value)
 
 
    def greater_than(self, value2):
       self.check_type(value2)
-      return TypeBool(self.get_value() > value2.get_value())
+      return TypeBool.new_instance(self.value > value2.value)
 
 
    def greater_than_or_equal(self, value2):
       self.check_type(value2)
-      return TypeBool(self.get_value() >= value2.get_value())
+      return TypeBool.new_instance(self.value >= value2.value)
 
 
    def add(self, value2):
       self.check_type(value2)
       # self.new_instance will call the new_instance method of the child class
       # that's because in python every function is a virtual function in the c++ sense
-      return self.new_instance(self.get_value() + value2.get_value())
+      return self.new_instance(self.value + value2.value)
+
+
+   operators = {'<': less_than,
+                '<=': less_than_or_equal,
+                '=': equal,
+                '<>': not_equal,
+                '>': greater_than,
+                '>=': greater_than_or_equal,
+                '+': add}
 
 
 
 class TypeNumber(TypeBase):
+   __slots__ = ('isNaN',)
+
+
+   arithmetic_operators = frozenset(('+', '-', '*', '/'))
+
+
    def __init__(self, value, isNaN=False):
       super().__init__(value)
       self.isNaN = isNaN
-      self.operators['-'] = self.sub
-      self.operators['*'] = self.mul
-      self.operators['/'] = self.div
-      self.arithmetic_operators = {'+', '-', '*', '/'}
 
 
    def sub(self, value2):
@@ -123,20 +210,26 @@ class TypeNumber(TypeBase):
       if self.isNaN or value2.isNaN:
          return self.new_instance(0, True)
       else:
-         return self.new_instance(self.get_value() - value2.get_value())
+         return self.new_instance(self.value - value2.value)
 
 
    def mul(self, value2):
       self.check_type(value2)
-      return self.new_instance(self.get_value() * value2.get_value())
+      return self.new_instance(self.value * value2.value)
 
 
    def div(self, value2):
       self.check_type(value2)
-      if value2.get_value() == 0:
+      if value2.value == 0:
          return self.new_instance(0, True)
       else:
-         return self.new_instance(self.get_value() / value2.get_value())
+         return self.new_instance(self.value / value2.value)
+
+
+   operators = dict(TypeBase.operators)
+   operators.update({'-': sub,
+                     '*': mul,
+                     '/': div})
 
 
    def __str__(self):
@@ -145,23 +238,33 @@ class TypeNumber(TypeBase):
       else:
          return super().__str__()
 
+
    def do_operation(self, operator, value2):
-      if operator not in self.operators:
+      function = self.operators.get(operator)
+      if function is None:
          raise ValueError('Undefined operator {}'.format(operator))
       if self.isNaN or value2.isNaN:
          if operator in self.arithmetic_operators:
             return self.new_instance(0, True)
          else:
-            return TypeBool(False)
-      return super().do_operation(operator, value2)
-
+            return TypeBool.false
+      return function(self, value2)
 
 
 
 class TypeString(TypeBase):
+   __slots__ = ()
+
+
    regex = re.compile(r"^'.*'$")
 
 
+   # the most recently created short strings are shared instead of being allocated again
+   interned = {}
+   intern_max_length = 32
+   intern_max_size = 4096
+
+
    def __init__(self, value):
       if type(value) is str and not self.regex.match(value):
          raise TypeError("Value can't be parsed as a string.")
@@ -174,12 +277,28 @@ class TypeString(TypeBase):
 
    @staticmethod
    def new_instance(value):
-      return TypeString(value)
+      # value is an already unquoted string, so the literal parsing is skipped
+      instance = TypeString.interned.get(value)
+      if instance is None:
+         instance = TypeString.__new__(TypeString)
+         instance.value = value
+         if len(value) <= TypeString.intern_max_length:
+            if len(TypeString.interned) >= TypeString.intern_max_size:
+               TypeString.interned.clear()
+            TypeString.interned[value] = instance
+      return instance
 
 
 
 class TypeInt(TypeNumber):
-   regex = re.compile(r"^-?\d*$")
+   __slots__ = ()
+
+
+   regex = re.compile(r"^-?\d+$")
+
+
+   # instances for the most common values are created only once
+   small_ints_range = range(-5, 257)
 
 
    def __init__(self, value, isNaN=False):
@@ -190,11 +309,23 @@ class TypeInt(TypeNumber):
 
    @staticmethod
    def new_instance(value, isNaN=False):
-      return TypeInt(value, isNaN)
+      value = int(value)
+      if not isNaN and value in TypeInt.small_ints_range:
+         return TypeInt.small_ints[value - TypeInt.small_ints_range.start]
+      instance = TypeInt.__new__(TypeInt)
+      instance.value = value
+      instance.isNaN = isNaN
+      return instance
+
+
+TypeInt.small_ints = tuple(TypeInt(value) for value in TypeInt.small_ints_range)
 
 
 
 class TypeFloat(TypeNumber):
+   __slots__ = ()
+
+
    regex = re.compile(r"^-?\d*\.\d*$")
 
 
@@ -206,11 +337,24 @@ class TypeFloat(TypeNumber):
 
    @staticmethod
    def new_instance(value, isNaN=False):
-      return TypeFloat(value, isNaN)
+      instance = TypeFloat.__new__(TypeFloat)
+      instance.value = float(value)
+      instance.isNaN = isNaN
+      return instance
+
+
+
+# python types accepted as parameters of prepared statements
+parameter_classes = {int: TypeInt,
+                     float: TypeFloat,
+                     str: TypeString}
 
 
 
 class Row:
+   __slots__ = ('row',)
+
+
    def __init__(self, row):
       self.row = tuple(row)
 
@@ -259,11 +403,42 @@ class Row:
 
 
 class Table:
+   # wraps the raw values stored in the columns into the classes used by the conditions
+   value_factories = {'int': TypeInt.new_instance,
+                      'float': TypeFloat.new_instance,
+                      'string': TypeString.new_instance}
+
+
+   value_classes = {'int': TypeInt,
+                    'float': TypeFloat,
+                    'string': TypeString}
+
+
+   # column-operator-literal is the same as literal-flipped_operator-column
+   flipped_operators = {'=': '=', '<>': '<>', '<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+
+   # when conditions can be vectorized, the zone maps are used only if they skip most of the rows
+   zone_map_max_fraction = 0.1
+
+
    def __init__(self, column_names_list, column_types_list):
       self.column_names = tuple(column_names_list)
       self.column_types = tuple(column_types_list)
       self.name_to_index = {column_name: index for index, column_name in enumerate(self.column_names)}
-      self.rows = []
+      self.columns = tuple(storage.column_classes[column_type]() for column_type in self.column_types)
+      self.indexes = []
+      # collected by analyze
+      self.statistics = None
+      # built the first time a scan could use them
+      self.zone_maps = None
+
+
+   @classmethod
+   def create_from_columns(cls, column_names_list, column_types_list, columns):
+      table = cls(column_names_list, column_types_list)
+      table.columns = tuple(columns)
+      return table
 
 
    @classmethod
@@ -271,11 +446,10 @@ class Table:
       names_iter = (col_name for table in tables for col_name in table.get_column_names())
       types_iter = (col_type for table in tables for col_type in table.get_column_types())
       table_object = cls(names_iter, types_iter)
-      row_groups = list(table.get_rows() for table in tables)
+      row_groups = list(list(table.get_raw_rows()) for table in tables)
       cartesian_product = itertools.product(*row_groups) # each entry will be a tuple of rows
-      new_rows = (Row.create_from_rows(*row) for row in cartesian_product) # we merge each tuple of rows into a single row
-      for row in new_rows:
-         table_object.insert_row(row)
+      new_rows = (tuple(itertools.chain(*row)) for row in cartesian_product) # we merge each tuple of rows into a single row
+      table_object.insert_raw_rows(new_rows)
       return table_object
 
 
@@ -283,11 +457,8 @@ class Table:
       filter_iterator = tuple(i in column_indexes for i in range(len(self.column_names)))
       column_names = itertools.compress(self.column_names, filter_iterator)
       column_types = itertools.compress(self.column_types, filter_iterator)
-      filtered_table = Table(column_names, column_types)
-      filtered_rows = (itertools.compress(row, filter_iterator) for row in self.get_rows())
-      for row in filtered_rows:
-         filtered_table.insert_row(row)
-      return filtered_table
+      columns = (column.copy() for column in itertools.compress(self.columns, filter_iterator))
+      return Table.create_from_columns(column_names, column_types, columns)
 
 
    def extract_columns_by_name(self, column_names):
@@ -297,50 +468,165 @@ class Table:
 
    def reorder_iterable(self, order, it):
       zipped_it = zip_equal(order, it)
-      ordered_it = sorted(zipped_it)
+      ordered_it = sorted(zipped_it, key=lambda el: el[0])
       return (el[1] for el in ordered_it)
 
 
    def reorder_columns(self, order):
       ordered_column_names = self.reorder_iterable(order, self.column_names)
       ordered_column_types = self.reorder_iterable(order, self.column_types)
+      ordered_columns = (column.copy() for column in self.reorder_iterable(order, self.columns))
+      return Table.create_from_columns(ordered_column_names, ordered_column_types, ordered_columns)
 
-      reordered_table = Table(ordered_column_names, ordered_column_types)
-      ordered_rows = (self.reorder_iterable(order, row) for row in self.get_rows())
-      for row in ordered_rows:
-         row = list(row)
-         reordered_table.insert_row(row)
-      return reordered_table
 
-
-   def filter_table(self, condition):
+   def filter_table(self, condition, vectorize=False, workers=1):
       if not condition:
          return self
       # translates column names into indexes and parses literals into TypeClasses
       condition = self.modify_condition(condition)
-      filtered_table = Table(self.get_column_names(), self.get_column_types())
-      for row in self.get_rows():
-         if row.verify_condition(condition):
-            filtered_table.insert_row(row)
+      tree = compiler.build_tree(condition)
+      # the whole condition is compiled once to report type errors as if it wasn't split
+      compiler.ConditionCompiler(self.column_types).compile_tree(tree)
+      filtered_table = Table(self.column_names, self.column_types)
+      filtered_table.insert_raw_rows(self.scan(compiler.split_conjuncts(tree), vectorize, workers))
       return filtered_table
 
 
+   def scan(self, conjuncts=(), vectorize=False, workers=1):
+      # returns the operator reading the rows satisfying all the conjuncts, through the access path
+      # chosen by choose_access, the conjuncts it doesn't answer are evaluated by a filter
+      conjuncts = list(conjuncts)
+      access_path, argument = self.choose_access(conjuncts, vectorize, workers)
+      if access_path == 'index':
+         index, operator, value, conjunct = argument
+         conjuncts.remove(conjunct)
+         scan = executor.IndexScan(self, index, operator, value)
+      elif access_path == 'zone maps':
+         scan = executor.BlockScan(self, argument)
+      elif access_path == 'vectorized':
+         conjuncts = [conjunct for conjunct in conjuncts if conjunct not in argument]
+         scan = executor.VectorizedScan(self, compiler.join_conjuncts(argument))
+      elif access_path == 'parallel':
+         scan = parallel.ParallelScan(self, compiler.join_conjuncts(conjuncts), workers)
+         conjuncts = []
+      else:
+         scan = executor.TableScan(self)
+      if conjuncts:
+         scan = executor.Filter(scan, compiler.join_conjuncts(conjuncts))
+      return scan
+
+
+   def choose_access(self, conjuncts, vectorize=False, workers=1):
+      # returns how scan reads the rows, shared with explain: an index if possible, then the blocks
+      # which can't satisfy the conjuncts are skipped, otherwise numeric conjuncts can be evaluated
+      # with numpy when vectorize is set and the other ones by workers processes in parallel
+      # the result is ('index', index access), ('zone maps', row ranges), ('vectorized', vectorized
+      # conjuncts), ('parallel', None) or ('full', None)
+      index_access = self.find_index_access(conjuncts)
+      if index_access:
+         return 'index', index_access
+      row_ranges = self.find_row_ranges(conjuncts)
+      vectorize = vectorize and vectorized.is_available()
+      if row_ranges is not None and vectorize:
+         if sum(end - start for start, end in row_ranges) > self.zone_map_max_fraction * len(self):
+            row_ranges = None
+      if row_ranges is not None:
+         return 'zone maps', row_ranges
+      if vectorize:
+         evaluator = vectorized.VectorizedEvaluator(self.columns, self.column_types, len(self))
+         vectorized_conjuncts = [conjunct for conjunct in conjuncts if evaluator.supports(conjunct)]
+         if vectorized_conjuncts:
+            return 'vectorized', vectorized_conjuncts
+      if conjuncts and workers > 1 and len(self) >= parallel.min_rows:
+         return 'parallel', None
+      return 'full', None
+
+
+   def get_column_comparison(self, conjunct):
+      # returns (column_index, operator, raw value) if the conjunct compares a column with a literal
+      # of the same type, otherwise None
+      if conjunct[0] != 'OPERATOR' or conjunct[1] not in self.flipped_operators:
+         return None
+      operator, left, right = conjunct[1:]
+      if left[0] == 'LITERAL' and right[0] == 'COLUMN_NAME':
+         operator, left, right = self.flipped_operators[operator], right, left
+      if left[0] != 'COLUMN_NAME' or right[0] != 'LITERAL':
+         return None
+      if self.value_classes[self.column_types[left[1]]] is not type(right[1]):
+         return None
+      return left[1], operator, right[1].get_value()
+
+
+   def find_index_access(self, conjuncts):
+      # looks for a column-operator-literal conjunct answered by an index, equality is preferred
+      candidates = []
+      for conjunct in conjuncts:
+         comparison = self.get_column_comparison(conjunct)
+         if comparison is None:
+            continue
+         column_index, operator, value = comparison
+         for index in self.indexes:
+            if index.column_index == column_index and index.supports(operator):
+               candidates.append((operator != '=', index.index_type != 'hash', len(candidates),
+                                  (index, operator, value, conjunct)))
+      if not candidates:
+         return None
+      return min(candidates)[-1]
+
+
+   def find_row_ranges(self, conjuncts):
+      # the ranges of rows which can satisfy all the column-operator-literal conjuncts according to
+      # the zone maps, None if no block can be skipped
+      if len(self) <= zonemap.ZoneMap.block_size:
+         return None
+      blocks = None
+      for conjunct in conjuncts:
+         comparison = self.get_column_comparison(conjunct)
+         if comparison is None:
+            continue
+         column_index, operator, value = comparison
+         column_blocks = self.get_zone_maps()[column_index].get_blocks(operator, value)
+         blocks = column_blocks if blocks is None else [flag and column_flag for flag, column_flag in zip(blocks, column_blocks)]
+      if blocks is None or all(blocks):
+         return None
+      return zonemap.get_row_ranges(blocks, len(self))
+
+
+   def get_zone_maps(self):
+      if self.zone_maps is None:
+         self.zone_maps = tuple(zonemap.ZoneMap(column) for column in self.columns)
+      return self.zone_maps
+
+
+   def analyze(self):
+      self.statistics = statistics_module.TableStatistics(self)
+      return self.statistics
+
+
+   def get_statistics(self):
+      # statistics which are too old to be trusted aren't returned
+      if self.statistics is None or self.statistics.is_stale():
+         return None
+      return self.statistics
+
+
+   def create_index(self, index_name, column_index, index_type):
+      index = index_module.index_classes[index_type](index_name, column_index)
+      index.build(self.columns[column_index].get_raw_values())
+      self.indexes.append(index)
+      return index
+
+
    # this can't be done by the parser because it needs to know about tables etc.
    def modify_condition(self, condition):
-      modified_condition = []
-      column_names = self.get_column_names()
-      for element in condition:
-         if element in column_names:
-            modified_condition.append(('COLUMN_NAME', self.get_index_by_name(element)))
-         elif TypeFloat.regex.match(element):
-            modified_condition.append(('LITERAL', TypeFloat(element)))
-         elif TypeInt.regex.match(element):
-            modified_condition.append(('LITERAL', TypeInt(element)))
-         elif TypeString.regex.match(element):
-            modified_condition.append(('LITERAL', TypeString(element)))
-         else:
-            modified_condition.append(('OPERATOR', element))
-      return modified_condition
+      return modify_condition(condition, self.name_to_index)
+
+
+   def take_rows(self, row_indexes):
+      # returns a new table containing only the rows in the specified positions
+      row_indexes = row_indexes if isinstance(row_indexes, (list, range)) else list(row_indexes)
+      columns = (column.take(row_indexes) for column in self.columns)
+      return Table.create_from_columns(self.column_names, self.column_types, columns)
 
 
    def __str__(self):
@@ -353,8 +639,68 @@ class Table:
       return result
 
 
+   def __len__(self):
+      return len(self.columns[0]) if self.columns else 0
+
+
    def insert_row(self, row):
-      self.rows.append(Row(row))
+      values = tuple(value.get_value() if isinstance(value, Type) else value for value in row)
+      self.insert_raw_rows((values,))
+
+
+   def insert_raw_rows(self, rows):
+      # the columns are kept aligned even if a value can't be stored
+      first_row_index = length = len(self)
+      try:
+         for row in rows:
+            if len(row) != len(self.columns):
+               raise ValueError('The row has {} values, the table has {} columns.'.format(len(row), len(self.columns)))
+            for column, value in zip(self.columns, row):
+               column.append(value)
+            length += 1
+      except (ValueError, TypeError):
+         for column in self.columns:
+            column.truncate(length)
+         raise
+      self.update_indexes(first_row_index)
+
+
+   def insert_raw_columns(self, columns):
+      # appends one sequence of raw values to every column, all the sequences must have the same length
+      first_row_index = len(self)
+      try:
+         for column, values in zip(self.columns, columns):
+            column.extend(values)
+      except (ValueError, TypeError):
+         for column in self.columns:
+            column.truncate(first_row_index)
+         raise
+      self.update_indexes(first_row_index)
+
+
+   def truncate(self, length):
+      # removes all the rows after the first length ones
+      if length >= len(self):
+         return
+      for column in self.columns:
+         column.truncate(length)
+      for index in self.indexes:
+         index.build(self.columns[index.column_index].get_raw_values())
+      if self.statistics:
+         self.statistics.invalidate()
+      self.zone_maps = None
+
+
+   def update_indexes(self, first_row_index):
+      # adds the rows starting from first_row_index to every index, to the statistics and to the zone maps
+      for index in self.indexes:
+         column = self.columns[index.column_index]
+         index.insert(first_row_index, (column.get_raw(i) for i in range(first_row_index, len(self))))
+      if self.statistics:
+         self.statistics.update(self, first_row_index)
+      if self.zone_maps is not None:
+         for zone_map, column in zip(self.zone_maps, self.columns):
+            zone_map.update(column, first_row_index)
 
 
    def get_header_string(self):
@@ -367,8 +713,8 @@ class Table:
 
 
    def get_column_type_by_name(self, column_name):
-      index = self.get_index_from_name(name)
-      return self.get_column_type_by_name_index(index)
+      index = self.get_index_by_name(column_name)
+      return self.get_column_type_by_index(index)
 
 
    def get_column_type_by_index(self, column_index):
@@ -379,14 +725,88 @@ class Table:
       return self.column_names
 
 
+   def get_column(self, column_index):
+      return self.columns[column_index]
+
+
    def get_rows(self):
-      return self.rows
+      factories = tuple(self.value_factories[column_type] for column_type in self.column_types)
+      for values in self.get_raw_rows():
+         yield Row(factory(value) for factory, value in zip(factories, values))
+
+
+   def get_raw_row(self, row_index):
+      return tuple(column.get_raw(row_index) for column in self.columns)
+
+
+   def get_raw_rows(self):
+      return zip(*(column.get_raw_values() for column in self.columns))
+
+
+   def get_memory_usage(self):
+      return sum(column.get_memory_usage() for column in self.columns)
 
 
    def get_index_by_name(self, name):
       return self.name_to_index[name]
 
 
+   def get_version(self):
+      return TableVersion(self, len(self))
+
+
+
+# the rows of a table as they were at some point: tables only grow (truncate only removes the rows of
+# a failed statement), so the version made of the first length rows never changes, the rows appended
+# later are simply never read and everything else is shared with the table
+# queries reading versions can be suspended and resumed while other statements insert rows
+class TableVersion(Table):
+   def __init__(self, table, length):
+      self.table = table
+      self.length = length
+      self.column_names = table.column_names
+      self.column_types = table.column_types
+      self.name_to_index = table.name_to_index
+      self.columns = table.columns
+      self.indexes = list(table.indexes)
+
+
+   def __len__(self):
+      return self.length
+
+
+   def get_raw_rows(self):
+      return itertools.islice(super().get_raw_rows(), self.length)
+
+
+   def get_zone_maps(self):
+      return self.table.get_zone_maps()
+
+
+   def get_statistics(self):
+      return self.table.get_statistics()
+
+
+   def get_version(self):
+      return self
+
+
+
+# the values of a column are converted all together, after being checked with the regexes of the Type classes
+def parse_int_column(values):
+   return list(map(int, values))
+
+
+
+def parse_float_column(values):
+   return list(map(float, values))
+
+
+
+def parse_string_column(values):
+   return [value[1:-1] for value in values]
+
+
 
 class Database:
    value_parse = {'string': TypeString,
@@ -394,29 +814,182 @@ class Database:
                   'int': TypeInt}
 
 
-   def __init__(self):
+   column_parse = {'string': (re.compile(r"'.*'"), parse_string_column),
+                   'float': (re.compile(r"-?\d*\.\d*"), parse_float_column),
+                   'int': (re.compile(r"-?\d+"), parse_int_column)}
+
+
+   # csv fields are stored as they are inside string columns, without quotes
+   csv_column_parse = dict(column_parse, string=(None, list))
+
+
+   # number of csv lines converted and appended at a time by the load command
+   load_chunk_size = 65536
+
+
+   # commands changing the content of the database, they are recorded inside the write ahead log
+   logged_commands = {'create_table', 'create_table_as', 'create_materialized_view', 'create_index', 'drop_table',
+                      'insert_into', 'insert_many', 'insert_values'}
+
+
+   # commands reading files which could change before a replay, a checkpoint is taken right after them
+   checkpointed_commands = {'load', 'load_database'}
+
+
+   # vectorize enables the numpy evaluation of the conditions on numeric columns, if numpy is installed
+   # wal_file_name enables the write ahead log: the database is restored from its last checkpoint and
+   # from the log, then every mutation is appended to the log and synced every fsync_interval seconds,
+   # a new checkpoint is taken every checkpoint_interval records
+   # workers greater than one splits the scans and the products of large tables among processes
+   # sorts using more than sort_memory_budget bytes are done on disk
+   # result_cache_memory enables the cache of the results of selects, using at most that many bytes
+   def __init__(self, vectorize=False, wal_file_name=None, fsync_interval=1.0, checkpoint_interval=100000, workers=1,
+                sort_memory_budget=sort.default_memory_budget, result_cache_memory=0):
+      self.vectorize = vectorize
+      self.workers = workers
+      self.sort_memory_budget = sort_memory_budget
       self.tables = {}
+      self.indexes = {}
+      # incremented every time rows are inserted into a table or the table is dropped, cached results
+      # computed with an older version are no longer valid
+      self.table_versions = {}
+      self.result_cache = result_cache_module.ResultCache(result_cache_memory) if result_cache_memory else None
+      # the definitions of the materialized views, their rows are stored inside tables
+      self.views = {}
+      # incremented every time a table is created or dropped, plans resolved against an older
+      # version are no longer valid
+      self.schema_version = 0
+      self.wal = None
+      self.checkpoint_interval = checkpoint_interval
+      self.records_since_checkpoint = 0
       self.commands = {'create_table': self.create_table,
+                       'create_index': self.create_index,
                        'create_table_as': self.create_table_as,
+                       'create_materialized_view': self.create_materialized_view,
                        'drop_table': self.drop_table,
+                       'analyze': self.analyze,
+                       'explain': self.explain,
                        'insert_into': self.insert_into,
+                       'insert_many': self.insert_many,
+                       'insert_values': self.insert_values,
+                       'load': self.load,
+                       'load_database': self.load_database,
                        'print_table': self.print_table,
-                       'select': self.select}
+                       'select': self.select,
+                       'store': self.store,
+                       'store_database': self.store_database}
+
+
+      if wal_file_name:
+         self.open_wal(wal_file_name, fsync_interval)
 
 
    def transact(self, command, *args):
-      return self.commands[command](*args)
+      result = self.commands[command](*args)
+      # only the commands which succeeded are logged
+      if self.wal:
+         if command in self.logged_commands:
+            self.wal.append(command, args)
+            self.records_since_checkpoint += 1
+            if self.records_since_checkpoint >= self.checkpoint_interval:
+               self.checkpoint()
+         elif command in self.checkpointed_commands:
+            self.checkpoint()
+      return result
+
+
+   def open_wal(self, wal_file_name, fsync_interval):
+      self.checkpoint_file_name = wal_file_name + '.checkpoint'
+      checkpoint_lsn = 0
+      if snapshot.is_snapshot(self.checkpoint_file_name):
+         stored_tables, metadata = self.read_snapshot(self.checkpoint_file_name)
+         self.restore_tables(stored_tables)
+         self.restore_views(metadata.get('views', {}))
+         checkpoint_lsn = metadata['lsn']
+
+      # records older than the checkpoint are found only if the log couldn't be truncated after it
+      last_lsn = checkpoint_lsn
+      for lsn, command, args in wal.WriteAheadLog.recover(wal_file_name):
+         if lsn > checkpoint_lsn:
+            self.commands[command](*args)
+            self.records_since_checkpoint += 1
+            last_lsn = lsn
+      self.wal = wal.WriteAheadLog(wal_file_name, fsync_interval, last_lsn + 1)
+
+
+   def checkpoint(self):
+      # stores the whole database, the log records are then useless
+      if not self.wal:
+         raise ValueError('The write ahead log is not enabled.')
+      self.wal.sync()
+      metadata = {'lsn': self.wal.next_lsn - 1,
+                  'views': {view_name: view.get_definition() for view_name, view in self.views.items()}}
+      snapshot.write_snapshot(self.checkpoint_file_name, self.tables, metadata)
+      self.wal.truncate()
+      self.records_since_checkpoint = 0
+
+
+   def close(self):
+      if self.wal:
+         self.wal.close()
+         self.wal = None
 
 
    def create_table(self, table_name, column_names, column_types):
       if table_name in self.tables:
          raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
       self.tables[table_name] = Table(column_names, column_types)
+      self.schema_version += 1
 
-   def create_table_as(self, table_name, columns_list, tables_list, condition):
+   def create_table_as(self, table_name, columns_list, tables_list, condition, order_by=(), limit=None, group_by=()):
       if table_name in self.tables:
          raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
-      self.tables[table_name] = self.select(columns_list, tables_list, condition)
+      # the new table mustn't share its columns with a cached result
+      self.tables[table_name] = self.run_query(columns_list, tables_list, condition, order_by, limit, group_by)
+      self.schema_version += 1
+
+
+   def create_materialized_view(self, view_name, columns_list, tables_list, condition, order_by=(), limit=None, group_by=()):
+      # the rows inserted into the tables of the view are added to it by update_views
+      if view_name in self.tables:
+         raise NameError('A table named {} already exists in memory.'.format(view_name))
+      if order_by or limit is not None or group_by or not all(type(column_name) is str for column_name in columns_list):
+         raise ValueError('Materialized views can\'t contain order by, limit, group by or aggregates.')
+      if count_parameters(condition):
+         raise ValueError('? placeholders can only be used inside prepared statements.')
+      view = view_module.MaterializedView(columns_list, tables_list, condition,
+                                          {table_name: len(self.tables[table_name]) for table_name in tables_list if table_name in self.tables})
+      view.resolve(self)
+      self.tables[view_name] = self.materialize(self.build_select(
+         {table_name: self.tables[table_name] for table_name in view.table_names}, view.resolved_condition, view.projection))
+      self.views[view_name] = view
+      self.schema_version += 1
+
+
+   def table_changed(self, table_name):
+      # called after rows are inserted into a table
+      self.table_versions[table_name] = self.table_versions.get(table_name, 0) + 1
+      self.update_views(table_name)
+
+
+   def update_views(self, table_name):
+      # appends to the views reading table_name the rows produced by its new rows
+      for view_name, view in self.views.items():
+         if view.reads(table_name):
+            self.tables[view_name].insert_raw_rows(view.get_delta(self, table_name))
+            self.table_changed(view_name)
+
+
+   def restore_views(self, definitions):
+      for view_name, definition in definitions.items():
+         view = view_module.MaterializedView(*definition)
+         view.resolve(self)
+         self.views[view_name] = view
+
+
+   def check_not_view(self, table_name):
+      if table_name in self.views:
+         raise ValueError('Rows can\'t be inserted into materialized view {}.'.format(table_name))
 
 
    def print_table(self, table_name):
@@ -429,12 +1002,42 @@ class Database:
    def drop_table(self, table_name):
       if table_name not in self.tables:
          raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      for view_name, view in self.views.items():
+         if view.reads(table_name):
+            raise ValueError('Table {} is read by materialized view {}.'.format(table_name, view_name))
       del self.tables[table_name]
+      self.views.pop(table_name, None)
+      self.table_versions[table_name] = self.table_versions.get(table_name, 0) + 1
+      self.schema_version += 1
+      for index_name, index_table_name in list(self.indexes.items()):
+         if index_table_name == table_name:
+            del self.indexes[index_name]
+
+
+   def analyze(self, table_name):
+      if table_name not in self.tables:
+         raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      self.tables[table_name].analyze()
+
+
+   def create_index(self, index_name, table_name, column_name, index_type):
+      if index_name in self.indexes:
+         raise NameError('An index named {} already exists in memory.'.format(index_name))
+      if index_type not in index_module.index_classes:
+         raise ValueError('Unknown index type {}.'.format(index_type))
+      if table_name not in self.tables:
+         raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      table = self.tables[table_name]
+      if column_name not in table.get_column_names():
+         raise NameError('A column named {} doesn\'t exists inside table {}.'.format(column_name, table_name))
+      table.create_index(index_name, table.get_index_by_name(column_name), index_type)
+      self.indexes[index_name] = table_name
 
 
    def insert_into(self, table_name, values_list):
       if table_name not in self.tables:
          raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      self.check_not_view(table_name)
 
       table = self.tables[table_name]
       types = table.get_column_types()
@@ -451,9 +1054,288 @@ class Database:
          parsed_values.append(value)
 
       table.insert_row(parsed_values)
+      self.table_changed(table_name)
+
+
+   def insert_many(self, table_name, rows):
+      # rows contains lists of literals, formatted as in the insert into command
+      if table_name not in self.tables:
+         raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      self.check_not_view(table_name)
+
+      table = self.tables[table_name]
+      types = table.get_column_types()
+      if not rows:
+         return
+      if set(map(len, rows)) != {len(types)}:
+         i, row = next((i, row) for i, row in enumerate(rows) if len(row) != len(types))
+         raise ValueError('Row number {} has {} values, table {} has {} columns.'.format(i, len(row), table_name, len(types)))
+
+      columns = []
+      for j, (values, column_type) in enumerate(zip(zip(*rows), types)):
+         columns.append(self.parse_column(j, values, column_type))
+      table.insert_raw_columns(columns)
+      self.table_changed(table_name)
 
 
-   def select(self, columns_list, tables_list, condition):
+   # python types of the raw values stored inside every column type
+   raw_value_types = {'int': int,
+                      'float': float,
+                      'string': str}
+
+
+   def insert_values(self, table_name, rows):
+      # rows contains lists of raw python values, as produced by prepared statements
+      if table_name not in self.tables:
+         raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      self.check_not_view(table_name)
+
+      table = self.tables[table_name]
+      types = table.get_column_types()
+      if not rows:
+         return
+      if set(map(len, rows)) != {len(types)}:
+         i, row = next((i, row) for i, row in enumerate(rows) if len(row) != len(types))
+         raise ValueError('Row number {} has {} values, table {} has {} columns.'.format(i, len(row), table_name, len(types)))
+
+      columns = list(zip(*rows))
+      for j, (values, column_type) in enumerate(zip(columns, types)):
+         value_type = self.raw_value_types[column_type]
+         if not all(type(value) is value_type for value in values):
+            row_index = next(i for i, value in enumerate(values) if type(value) is not value_type)
+            raise TypeError("Value number {} of row number {} isn't of type {}".format(j, row_index, column_type))
+      table.insert_raw_columns(columns)
+      self.table_changed(table_name)
+
+
+   def resolve_insert(self, table_name, rows):
+      # parses the literals of the rows once, ? placeholders are replaced by ('PARAMETER', number)
+      if table_name not in self.tables:
+         raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      self.check_not_view(table_name)
+
+      types = self.tables[table_name].get_column_types()
+      resolved_rows = []
+      parameter_count = 0
+      for i, row in enumerate(rows):
+         if len(row) != len(types):
+            raise ValueError('Row number {} has {} values, table {} has {} columns.'.format(i, len(row), table_name, len(types)))
+         resolved_row = []
+         for j, (value, column_type) in enumerate(zip(row, types)):
+            if value == '?':
+               resolved_row.append(('PARAMETER', parameter_count))
+               parameter_count += 1
+               continue
+            try:
+               resolved_row.append(self.value_parse[column_type](value).get_value())
+            except TypeError:
+               raise TypeError("Value number {} of row number {} isn't of type {}".format(j, i, column_type))
+         resolved_rows.append(resolved_row)
+      return resolved_rows, parameter_count
+
+
+   def load(self, table_name, file_name):
+      if snapshot.is_snapshot(file_name):
+         return self.load_snapshot(table_name, file_name)
+
+      # the csv file is read and appended to the table in chunks, if something goes wrong the
+      # table is brought back to its previous state
+      if table_name not in self.tables:
+         raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      self.check_not_view(table_name)
+
+      table = self.tables[table_name]
+      types = table.get_column_types()
+      start_time = time.perf_counter()
+      initial_length = len(table)
+      line_number = 0
+      try:
+         with open(file_name, newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            while True:
+               rows = list(itertools.islice(reader, self.load_chunk_size))
+               if not rows:
+                  break
+               # an header with the column names is skipped
+               if line_number == 0 and tuple(rows[0]) == table.get_column_names():
+                  rows = rows[1:]
+                  line_number = 1
+               if rows and set(map(len, rows)) != {len(types)}:
+                  i, row = next((i, row) for i, row in enumerate(rows) if len(row) != len(types))
+                  raise ValueError('Line number {} has {} values, table {} has {} columns.'.format(line_number + i + 1, len(row), table_name, len(types)))
+               columns = [self.parse_column(j, values, column_type, line_number + 1, self.csv_column_parse)
+                          for j, (values, column_type) in enumerate(zip(zip(*rows), types))]
+               table.insert_raw_columns(columns)
+               line_number += len(rows)
+      except OSError as oe:
+         table.truncate(initial_length)
+         raise ValueError('Can\'t read file {}: {}'.format(file_name, oe)) from oe
+      except (csv.Error, ValueError, TypeError):
+         table.truncate(initial_length)
+         raise
+
+      self.table_changed(table_name)
+      elapsed_time = time.perf_counter() - start_time
+      loaded_rows = len(table) - initial_length
+      return 'Loaded {} rows into {} in {:.2f} seconds ({:.0f} rows/s).'.format(
+         loaded_rows, table_name, elapsed_time, loaded_rows / elapsed_time if elapsed_time else 0)
+
+
+   def load_snapshot(self, table_name, file_name):
+      # a missing table is created directly over the memory mapped file, otherwise the rows are
+      # appended to the existing table
+      start_time = time.perf_counter()
+      stored_tables, _ = self.read_snapshot(file_name)
+      if len(stored_tables) != 1:
+         stored_tables = [stored_table for stored_table in stored_tables if stored_table[0] == table_name]
+         if not stored_tables:
+            raise NameError('A table named {} doesn\'t exists inside snapshot {}.'.format(table_name, file_name))
+      _, column_names, column_types, columns, _ = stored_tables[0]
+
+      if table_name not in self.tables:
+         self.tables[table_name] = Table.create_from_columns(column_names, column_types, columns)
+         self.schema_version += 1
+         loaded_rows = len(self.tables[table_name])
+      else:
+         self.check_not_view(table_name)
+         table = self.tables[table_name]
+         if tuple(column_types) != table.get_column_types():
+            raise TypeError('The columns of the snapshot have types {}, table {} has types {}.'.format(
+               ','.join(column_types), table_name, ','.join(table.get_column_types())))
+         table.insert_raw_columns(column.get_raw_values() for column in columns)
+         self.table_changed(table_name)
+         loaded_rows = len(columns[0]) if columns else 0
+
+      elapsed_time = time.perf_counter() - start_time
+      return 'Loaded {} rows into {} in {:.2f} seconds.'.format(loaded_rows, table_name, elapsed_time)
+
+
+   def load_database(self, file_name):
+      # the indexes of the tables are built again
+      stored_tables, _ = self.read_snapshot(file_name)
+      self.restore_tables(stored_tables)
+      return 'Loaded {} tables.'.format(len(stored_tables))
+
+
+   def restore_tables(self, stored_tables):
+      for table_name, _, _, _, indexes in stored_tables:
+         if table_name in self.tables:
+            raise NameError('A table named {} already exists in memory.'.format(table_name))
+         for index_name, _, _ in indexes:
+            if index_name in self.indexes:
+               raise NameError('An index named {} already exists in memory.'.format(index_name))
+      for table_name, column_names, column_types, columns, indexes in stored_tables:
+         table = Table.create_from_columns(column_names, column_types, columns)
+         for index_name, column_index, index_type in indexes:
+            table.create_index(index_name, column_index, index_type)
+            self.indexes[index_name] = table_name
+         self.tables[table_name] = table
+      self.schema_version += 1
+
+
+   def read_snapshot(self, file_name):
+      try:
+         return snapshot.read_snapshot(file_name)
+      except OSError as oe:
+         raise ValueError('Can\'t read file {}: {}'.format(file_name, oe)) from oe
+
+
+   def store(self, table_name, file_name):
+      if table_name not in self.tables:
+         raise NameError('A table named {} doesn\'t exists in memory.'.format(table_name))
+      self.write_snapshot(file_name, {table_name: self.tables[table_name]})
+
+
+   def store_database(self, file_name):
+      self.write_snapshot(file_name, self.tables)
+
+
+   def write_snapshot(self, file_name, tables):
+      try:
+         snapshot.write_snapshot(file_name, tables)
+      except OSError as oe:
+         raise ValueError('Can\'t write file {}: {}'.format(file_name, oe)) from oe
+
+
+   def parse_column(self, column_index, values, column_type, first_row_number=0, column_parse=None):
+      regex, parse = (column_parse or self.column_parse)[column_type]
+      if regex and not all(map(regex.fullmatch, values)):
+         row_index = next(i for i, value in enumerate(values) if not regex.fullmatch(value))
+         raise TypeError("Value number {} of row number {} isn't of type {}".format(column_index, first_row_number + row_index, column_type))
+      try:
+         return parse(values)
+      except ValueError as ve:
+         raise TypeError("A value of column number {} isn't of type {}".format(column_index, column_type)) from ve
+
+
+   def select(self, columns_list, tables_list, condition, order_by=(), limit=None, group_by=(), cursor=False):
+      # order_by contains (column_name, descending) pairs, limit is the maximum number of rows, group_by
+      # the names of the grouped columns, columns can be aggregates given as (function, column_name) pairs
+      # with cursor set the rows are returned by a cursor.Cursor as they are fetched, reading the
+      # tables as they are now, otherwise the result can come from the result cache
+      if self.result_cache is None or cursor:
+         return self.run_query(columns_list, tables_list, condition, order_by, limit, group_by, cursor)
+      key = result_cache_module.get_query_key(columns_list, tables_list, condition, order_by, limit, group_by)
+      return self.get_cached_result(key, tables_list, lambda: self.run_query(
+         columns_list, tables_list, condition, order_by, limit, group_by))
+
+
+   def get_cached_result(self, key, tables_list, run):
+      # returns the result stored for key if the tables it read didn't change, otherwise the one
+      # computed by run, the returned tables are shared with the cache and mustn't be modified
+      if self.result_cache is None:
+         return run()
+      versions = self.get_table_versions(tables_list)
+      result = self.result_cache.get(key, versions)
+      if result is None:
+         result = run()
+         self.cache_result(key, versions, result)
+      return result
+
+
+   def get_table_versions(self, tables_list):
+      return tuple(self.table_versions.get(table_name, 0) for table_name in tables_list)
+
+
+   def cache_result(self, key, versions, result):
+      # versions are the ones the tables had when the result started being computed
+      self.result_cache.put(key, versions, result, result_cache_module.get_result_size(result))
+
+
+   def run_query(self, columns_list, tables_list, condition, order_by=(), limit=None, group_by=(), cursor=False):
+      tables_scope, condition, projection, order, aggregation = self.resolve_query(columns_list, tables_list, condition, order_by, group_by)
+      if count_parameters(condition):
+         raise ValueError('? placeholders can only be used inside prepared statements.')
+      if cursor:
+         tables_scope = {table_name: table.get_version() for table_name, table in tables_scope.items()}
+         return cursor_module.Cursor(self.build_select(tables_scope, condition, projection, order, limit, aggregation))
+      return self.run_select(tables_scope, condition, projection, order, limit, aggregation)
+
+
+   def explain(self, columns_list, tables_list, condition, order_by=(), limit=None, group_by=()):
+      # returns the plan chosen for the select, with the number of rows expected from every node
+      tables_scope, condition, projection, order, aggregation = self.resolve_query(columns_list, tables_list, condition, order_by, group_by)
+      if count_parameters(condition):
+         raise ValueError('? placeholders can only be used inside prepared statements.')
+      plan = self.create_planner().plan_select(tables_scope, condition, projection, order, limit, aggregation)
+      return '\n'.join(plan.explain())
+
+
+   def resolve_query(self, columns_list, tables_list, condition, order_by=(), group_by=()):
+      # returns the arguments of run_select, the aggregation is None if the select has neither group
+      # by nor aggregates
+      items = list(columns_list) + [column_name for column_name, _ in order_by]
+      if not group_by and all(type(item) is str for item in items):
+         tables_scope, condition, projection = self.resolve_select(columns_list, tables_list, condition)
+         return tables_scope, condition, projection, self.resolve_order(tables_scope, order_by), None
+      tables_scope, condition, _ = self.resolve_select([], tables_list, condition)
+      aggregation, projection, order = self.resolve_aggregation(tables_scope, columns_list, order_by, group_by)
+      return tables_scope, condition, projection, order, aggregation
+
+
+   def resolve_select(self, columns_list, tables_list, condition):
+      # returns the tables read by the query (by name), the condition with column names translated
+      # into indexes and the indexes of the projected columns, everything depending only on the schema
       # checks if all the tables exist and creates the tables scope
       tables_scope = {}
       for table_name in tables_list:
@@ -476,10 +1358,82 @@ class Database:
          else: # executes only if the for loop terminates by exhaustion (not with a break)
             raise NameError('A column named {} doesn\'t exists inside the specified tables list.'.format(column_name))
 
-      select_table = Table.cartesian_product(tables_scope.values())
-      select_table = select_table.filter_table(condition)
-      column_names_iterator = (column_name for column_name in columns)
-      select_table = select_table.extract_columns_by_name(column_names_iterator)
-      columns_order = tuple(columns[column_name] for column_name in select_table.get_column_names())
-      select_table = select_table.reorder_columns(columns_order)
-      return select_table
\ No newline at end of file
+      tables = list(tables_scope.values())
+      column_names = tuple(column_name for table in tables for column_name in table.get_column_names())
+      name_to_index = {column_name: index for index, column_name in enumerate(column_names)}
+      condition = modify_condition(condition, name_to_index) if condition else []
+      projection = tuple(name_to_index[column_name] for column_name in columns)
+      return tables_scope, condition, projection
+
+
+   def resolve_order(self, tables_scope, order_by):
+      # translates the column names of the (column_name, descending) pairs into positions inside the
+      # product of the tables
+      column_names = [column_name for table in tables_scope.values() for column_name in table.get_column_names()]
+      order = []
+      for column_name, descending in order_by:
+         if column_name not in column_names:
+            raise NameError('A column named {} doesn\'t exists inside the specified tables list.'.format(column_name))
+         order.append((column_names.index(column_name), descending))
+      return order
+
+
+   def resolve_aggregation(self, tables_scope, columns_list, order_by, group_by):
+      # returns the (group_keys, aggregates) pair, with positions inside the product of the tables,
+      # and the projection and the order translated into positions inside the aggregated rows, which
+      # contain the grouped columns followed by the aggregates used by the select and by the order
+      column_names = [column_name for table in tables_scope.values() for column_name in table.get_column_names()]
+      column_types = [column_type for table in tables_scope.values() for column_type in table.get_column_types()]
+      if not columns_list:
+         raise ValueError('The columns of a select with group by must be listed.')
+      group_keys = []
+      for column_name in group_by:
+         if column_name not in column_names:
+            raise NameError('A column named {} doesn\'t exists inside the specified tables list.'.format(column_name))
+         group_keys.append(column_names.index(column_name))
+
+      aggregates = []
+      def get_position(item):
+         if type(item) is str:
+            if item not in column_names:
+               raise NameError('A column named {} doesn\'t exists inside the specified tables list.'.format(item))
+            if item not in group_by:
+               raise ValueError('Column {} must be grouped or used inside an aggregate function.'.format(item))
+            return group_by.index(item)
+         function, column_name = item
+         column_index = None
+         if column_name != '*':
+            if column_name not in column_names:
+               raise NameError('A column named {} doesn\'t exists inside the specified tables list.'.format(column_name))
+            column_index = column_names.index(column_name)
+            if function in ('sum', 'avg') and column_types[column_index] not in aggregate.numeric_types:
+               raise TypeError('{} can\'t be applied to column {} of type {}.'.format(function, column_name, column_types[column_index]))
+         if (function, column_index) not in aggregates:
+            aggregates.append((function, column_index))
+         return len(group_by) + aggregates.index((function, column_index))
+
+      projection = tuple(get_position(item) for item in columns_list)
+      if len(set(projection)) != len(projection): # at the moment we only support columns with distinct names
+         raise ValueError('You can\'t have 2 columns with the same name in a query.')
+      order = [(get_position(item), descending) for item, descending in order_by]
+      return (group_keys, aggregates), projection, order
+
+
+   def run_select(self, tables_scope, condition, projection, order=(), limit=None, aggregation=None):
+      # the rows flow one at a time through scan -> join -> filter -> [aggregate] -> [sort | limit] ->
+      # project, only the output is stored
+      return self.materialize(self.build_select(tables_scope, condition, projection, order, limit, aggregation))
+
+
+   def build_select(self, tables_scope, condition, projection, order=(), limit=None, aggregation=None):
+      return self.create_planner().plan_select(tables_scope, condition, projection, order, limit, aggregation).build()
+
+
+   def create_planner(self):
+      return planner.Planner(self.vectorize, self.workers, self.sort_memory_budget)
+
+
+   def materialize(self, pipeline):
+      table = Table(pipeline.get_column_names(), pipeline.get_column_types())
+      table.insert_raw_rows(pipeline)
+      return table
@@ -0,0 +1,223 @@
+import functools
+import heapq
+import itertools
+import operator
+
+from sql_interpreter import compiler
+from sql_interpreter import sort
+from sql_interpreter import vectorized
+
+
+
+# the select statements are executed by a tree of operators, every operator pulls the rows it needs
+# from its children one at a time (the so called volcano or iterator model), so only the rows which
+# make it to the end of the pipeline are ever stored
+# rows are plain tuples of raw values, the Type classes are never involved
+class Operator:
+   def __init__(self, column_names, column_types):
+      self.column_names = tuple(column_names)
+      self.column_types = tuple(column_types)
+
+
+   def __iter__(self):
+      raise NotImplementedError
+
+
+   def get_column_names(self):
+      return self.column_names
+
+
+   def get_column_types(self):
+      return self.column_types
+
+
+
+class TableScan(Operator):
+   def __init__(self, table):
+      super().__init__(table.get_column_names(), table.get_column_types())
+      self.table = table
+
+
+   def __iter__(self):
+      return iter(self.table.get_raw_rows())
+
+
+
+class BlockScan(Operator):
+   def __init__(self, table, row_ranges):
+      super().__init__(table.get_column_names(), table.get_column_types())
+      self.table = table
+      self.row_ranges = row_ranges
+
+
+   def __iter__(self):
+      # only the rows inside the (start, end) ranges are read
+      columns = self.table.columns
+      for start, end in self.row_ranges:
+         yield from zip(*(column.get_raw_slice(start, end) for column in columns))
+
+
+
+class IndexScan(Operator):
+   def __init__(self, table, index, operator, value):
+      super().__init__(table.get_column_names(), table.get_column_types())
+      self.table = table
+      self.index = index
+      self.operator = operator
+      self.value = value
+
+
+   def __iter__(self):
+      # the positions are sorted, the ones past the end of the table belong to rows appended after
+      # a version of the table was taken
+      row_indexes = itertools.takewhile(len(self.table).__gt__, self.index.lookup(self.operator, self.value))
+      return map(self.table.get_raw_row, row_indexes)
+
+
+
+class VectorizedScan(Operator):
+   def __init__(self, table, condition_tree):
+      super().__init__(table.get_column_names(), table.get_column_types())
+      self.table = table
+      self.condition_tree = condition_tree
+
+
+   def __iter__(self):
+      # the mask is computed over whole columns before the first row is returned, the numpy views
+      # over the column buffers must not outlive this call or the columns couldn't grow anymore
+      table = self.table
+      evaluator = vectorized.VectorizedEvaluator(table.columns, self.column_types, len(table))
+      row_indexes = vectorized.numpy.flatnonzero(evaluator.evaluate(self.condition_tree)).tolist()
+      del evaluator
+      return map(table.get_raw_row, row_indexes)
+
+
+
+class CrossProduct(Operator):
+   def __init__(self, left, right):
+      super().__init__(left.get_column_names() + right.get_column_names(),
+                       left.get_column_types() + right.get_column_types())
+      self.left = left
+      self.right = right
+
+
+   def __iter__(self):
+      # the inner side is read only once, memory usage is bounded by its size and not by the size of the product
+      right_rows = list(self.right)
+      if not right_rows:
+         return
+      for left_row in self.left:
+         for right_row in right_rows:
+            yield left_row + right_row
+
+
+
+class HashJoin(Operator):
+   def __init__(self, left, right, left_keys, right_keys):
+      super().__init__(left.get_column_names() + right.get_column_names(),
+                       left.get_column_types() + right.get_column_types())
+      self.left = left
+      self.right = right
+      self.left_keys = tuple(left_keys)
+      self.right_keys = tuple(right_keys)
+
+
+   def __iter__(self):
+      # the inner side is loaded inside a hash table, every row of the outer side then finds its
+      # matches with a single lookup, buckets keep the rows in order so the output order is the
+      # same one of a filtered CrossProduct
+      right_key = operator.itemgetter(*self.right_keys)
+      left_key = operator.itemgetter(*self.left_keys)
+      buckets = {}
+      for right_row in self.right:
+         buckets.setdefault(right_key(right_row), []).append(right_row)
+      if not buckets:
+         return
+      for left_row in self.left:
+         matches = buckets.get(left_key(left_row))
+         if matches:
+            for right_row in matches:
+               yield left_row + right_row
+
+
+
+class Filter(Operator):
+   def __init__(self, child, condition_tree):
+      super().__init__(child.get_column_names(), child.get_column_types())
+      self.child = child
+      self.predicate = compiler.ConditionCompiler(self.column_types).compile_tree(condition_tree)
+
+
+   def __iter__(self):
+      return filter(self.predicate, self.child)
+
+
+
+class Project(Operator):
+   def __init__(self, child, column_indexes):
+      column_indexes = tuple(column_indexes)
+      column_names = (child.get_column_names()[i] for i in column_indexes)
+      column_types = (child.get_column_types()[i] for i in column_indexes)
+      super().__init__(column_names, column_types)
+      self.child = child
+      self.column_indexes = column_indexes
+
+
+   def __iter__(self):
+      if self.column_indexes == tuple(range(len(self.child.get_column_names()))):
+         return iter(self.child)
+      if len(self.column_indexes) == 1:
+         index = self.column_indexes[0]
+         return ((row[index],) for row in self.child)
+      return map(operator.itemgetter(*self.column_indexes), self.child)
+
+
+
+class Sort(Operator):
+   # rows with the same keys keep their order, rows exceeding memory_budget bytes are sorted on disk
+   def __init__(self, child, keys, memory_budget=sort.default_memory_budget):
+      super().__init__(child.get_column_names(), child.get_column_types())
+      self.child = child
+      self.keys = tuple(keys)
+      self.memory_budget = memory_budget
+
+
+   def __iter__(self):
+      key = sort.get_sort_key(self.keys, self.column_types)
+      return sort.ExternalSorter(key, self.memory_budget).sort(self.child)
+
+
+
+class TopN(Operator):
+   # the first count rows of the sorted child, found with a heap of count rows instead of sorting
+   # all of them
+   def __init__(self, child, keys, count):
+      super().__init__(child.get_column_names(), child.get_column_types())
+      self.child = child
+      self.keys = tuple(keys)
+      self.count = count
+
+
+   def __iter__(self):
+      if self.count == 0:
+         return iter(())
+      return iter(heapq.nsmallest(self.count, self.child, key=sort.get_sort_key(self.keys, self.column_types)))
+
+
+
+class Limit(Operator):
+   # the child stops being pulled once count rows have been returned, so the rest of its rows is never computed
+   def __init__(self, child, count):
+      super().__init__(child.get_column_names(), child.get_column_types())
+      self.child = child
+      self.count = count
+
+
+   def __iter__(self):
+      return itertools.islice(self.child, self.count)
+
+
+
+def cross_product(children):
+   # builds a left deep tree of products, the rows are produced in the same order as itertools.product
+   return functools.reduce(CrossProduct, children)
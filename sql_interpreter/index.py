@@ -0,0 +1,136 @@
+import bisect
+import itertools
+import operator
+from array import array
+
+
+
+# secondary indexes map the values of a single column to the positions of the rows containing them,
+# positions are always returned sorted so that the rows keep the order they have inside the table
+class Index:
+   operators = set()
+
+
+   def __init__(self, name, column_index):
+      self.name = name
+      self.column_index = column_index
+
+
+   def supports(self, operator):
+      return operator in self.operators
+
+
+   def build(self, values):
+      self.clear()
+      self.insert(0, values)
+
+
+   def clear(self):
+      raise NotImplementedError
+
+
+   def insert(self, first_row_index, values):
+      raise NotImplementedError
+
+
+   def lookup(self, operator, value):
+      raise NotImplementedError
+
+
+
+class HashIndex(Index):
+   index_type = 'hash'
+   operators = {'='}
+
+
+   def __init__(self, name, column_index):
+      super().__init__(name, column_index)
+      self.buckets = {}
+
+
+   def clear(self):
+      self.buckets = {}
+
+
+   def insert(self, first_row_index, values):
+      buckets = self.buckets
+      for row_index, value in enumerate(values, first_row_index):
+         bucket = buckets.get(value)
+         if bucket is None:
+            buckets[value] = bucket = array('q')
+         bucket.append(row_index)
+
+
+   def lookup(self, operator, value):
+      return self.buckets.get(value, ())
+
+
+
+# NaNs can't be ordered and don't satisfy any comparison, the positions of their rows are kept apart
+# and never returned by lookups
+class OrderedIndex(Index):
+   index_type = 'ordered'
+   operators = {'=', '<', '<=', '>', '>='}
+
+
+   def __init__(self, name, column_index):
+      super().__init__(name, column_index)
+      self.clear()
+
+
+   def clear(self):
+      self.keys = []
+      self.row_indexes = array('q')
+      self.nan_row_indexes = array('q')
+
+
+   def build(self, values):
+      # a single sort instead of an insertion for every value, equal keys keep the order of their rows
+      self.clear()
+      entries = []
+      for entry in zip(values, itertools.count()):
+         if entry[0] != entry[0]:
+            self.nan_row_indexes.append(entry[1])
+         else:
+            entries.append(entry)
+      entries.sort(key=operator.itemgetter(0))
+      self.keys = [value for value, _ in entries]
+      self.row_indexes = array('q', (row_index for _, row_index in entries))
+
+
+   def insert(self, first_row_index, values):
+      # used for the rows appended after the index is built
+      keys = self.keys
+      row_indexes = self.row_indexes
+      for row_index, value in enumerate(values, first_row_index):
+         if value != value:
+            self.nan_row_indexes.append(row_index)
+         # rows appended in order (the common case) always land at the end of the arrays
+         elif not keys or keys[-1] <= value:
+            keys.append(value)
+            row_indexes.append(row_index)
+         else:
+            position = bisect.bisect_right(keys, value)
+            keys.insert(position, value)
+            row_indexes.insert(position, row_index)
+
+
+   def lookup(self, operator, value):
+      if value != value:
+         return []
+      if operator == '=':
+         start, end = bisect.bisect_left(self.keys, value), bisect.bisect_right(self.keys, value)
+      elif operator == '<':
+         start, end = 0, bisect.bisect_left(self.keys, value)
+      elif operator == '<=':
+         start, end = 0, bisect.bisect_right(self.keys, value)
+      elif operator == '>':
+         start, end = bisect.bisect_right(self.keys, value), len(self.keys)
+      else:
+         start, end = bisect.bisect_left(self.keys, value), len(self.keys)
+      return sorted(self.row_indexes[start:end])
+
+
+
+index_classes = {'hash': HashIndex,
+                 'ordered': OrderedIndex}
@@ -3,6 +3,9 @@ import re
 
 
 class Token:
+   __slots__ = ('name', 'value')
+
+
    def __init__(self, name, value):
       self.name = name
       self.value = value
@@ -21,60 +24,38 @@ class Token:
 
 
 
-# TODO: instead of returning a simple token list, create an object which has a next method for
-# for every token type and keeps track internally of the token list
 class SQLLexer:
-   commands = {'create', 'load', 'store', 'drop', 'insert', 'print', 'select'}
-   keywords = {'table', 'as', 'into', 'from', 'where'}
+   commands = {'create', 'load', 'store', 'drop', 'insert', 'print', 'select', 'explain', 'analyze'}
+   keywords = {'table', 'as', 'into', 'from', 'where', 'index', 'on', 'using', 'to', 'group', 'order', 'by', 'asc', 'desc', 'limit',
+               'materialized', 'view'}
    types = {'string', 'int', 'float'}
-   operators = {'and', 'or', '>', '<', '=', '=>', '<=', '-', '+', '*', '/'}
+   operators = {'and', 'or', '>', '<', '=', '>=', '<=', '<>', '-', '+', '*', '/'}
    list_separator = {',', '(', ')'} # TODO: move , and () into different sets
 
 
-   split_maintaining = {',', '(', ')'}
-   split_discarding = {'\n', '\t', ' '}
+   # a token is either a separator or a sequence of characters which aren't spaces or separators,
+   # where everything between two ' characters (or after an unmatched one) is part of the token
+   token_regex = re.compile(r"[,()]|(?:[^ \t\n,()']+|'[^']*'?)+")
+
+
+   # every word which isn't a literal, with the name of its token
+   token_names = dict.fromkeys(commands, 'COMMAND')
+   token_names.update(dict.fromkeys(keywords, 'KEYWORD'))
+   token_names.update(dict.fromkeys(list_separator, 'SEPARATOR'))
+   token_names.update(dict.fromkeys(types, 'TYPE'))
+   token_names.update(dict.fromkeys(operators, 'OPERATOR'))
 
 
    def token(self, token_value):
-      if token_value in self.commands:
-         token_name = 'COMMAND'
-      elif token_value in self.keywords:
-         token_name = 'KEYWORD'
-      elif token_value in self.list_separator:
-         token_name = 'SEPARATOR'
-      elif token_value in self.types:
-         token_name = 'TYPE'
-      elif token_value in self.operators:
-         token_name = 'OPERATOR'
-      else:
-         token_name = 'LITERAL'
-      return Token(token_name, token_value)
+      return Token(self.token_names.get(token_value, 'LITERAL'), token_value)
+
+
+   def scan(self, string):
+      # yields the tokens one at a time, the string is read only once by the regex engine
+      token = self.token
+      for match in self.token_regex.finditer(string):
+         yield token(match.group())
 
 
    def tokenize(self, string):
-      inside_string = False
-      t_start = 0
-      t_end = -1  # needed for empty string checking
-      tokens = []
-      for t_end, character in enumerate(string):
-         if character == "'":
-            inside_string = not inside_string
-         elif not inside_string and character in self.split_discarding:
-            if t_start == t_end:
-               # if we find a discarding_split_character at the start of the string or after we just split
-               # we ignore it because there's nothing to split
-               t_start += 1
-            else:
-               # otherwise we append what is inside the interval [t_start, t_end) and move on
-               tokens.append(self.token(string[t_start:t_end]))
-               t_start = t_end + 1
-         elif not inside_string and character in self.split_maintaining:
-            if t_start != t_end:
-               # if we find a maintaining_splitcharacter at the start of the string or after we just split
-               # we append it and move on without append anything else
-               tokens.append(self.token(string[t_start:t_end]))
-            tokens.append(self.token(character))
-            t_start = t_end + 1
-      if t_start <= t_end:
-         tokens.append(self.token(string[t_start:t_end+1]))
-      return tokens
\ No newline at end of file
+      return list(self.scan(string))
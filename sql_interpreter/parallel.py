@@ -0,0 +1,225 @@
+import itertools
+import pickle
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from sql_interpreter import compiler
+from sql_interpreter import executor
+
+
+
+# scans and products are split into chunks of rows filtered by a pool of processes, so that the
+# predicates don't run under a single GIL
+# the columns are copied once inside shared memory blocks which every worker maps, only the
+# positions of the matching rows are sent back and the rows are then read by the main process, the
+# chunks are merged in order so the rows come out as they would from the sequential operators
+
+
+
+# below this number of rows (or of pairs for products) the cost of starting the chunks isn't worth it
+min_rows = 100000
+
+
+# every worker gets about this number of chunks, so that a slow chunk doesn't keep the others waiting
+chunks_per_worker = 4
+
+
+pools = {}
+
+
+
+def get_pool(workers):
+   if workers not in pools:
+      pools[workers] = ProcessPoolExecutor(workers)
+   return pools[workers]
+
+
+
+def shutdown():
+   for pool in pools.values():
+      pool.shutdown()
+   pools.clear()
+
+
+
+def get_chunks(length, workers):
+   chunk_size = max(-(-length // (workers * chunks_per_worker)), 1)
+   return [(start, min(start + chunk_size, length)) for start in range(0, length, chunk_size)]
+
+
+
+# the memory blocks created for a query, they are removed when the query is over
+class SharedBlocks:
+   def __init__(self):
+      self.blocks = []
+
+
+   def __enter__(self):
+      return self
+
+
+   def __exit__(self, *args):
+      for block in self.blocks:
+         block.close()
+         block.unlink()
+      self.blocks = []
+
+
+   def share_bytes(self, data):
+      # shared memory blocks can't be empty
+      block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+      self.blocks.append(block)
+      block.buf[:len(data)] = data
+      return block.name
+
+
+   def share_column(self, column):
+      # strings are shared as their ids plus the pool, the pool is encoded as the offsets of the
+      # strings followed by their utf-8 bytes
+      data = memoryview(column.data).cast('B')
+      pool_name = None
+      if hasattr(column, 'pool'):
+         encoded = [string.encode() for string in column.pool.strings]
+         offsets = array('q', itertools.accumulate(map(len, encoded), initial=0))
+         pool_name = self.share_bytes(array('q', (len(encoded),)).tobytes() + offsets.tobytes() + b''.join(encoded))
+      return self.share_bytes(data), column.typecode, len(column), pool_name
+
+
+   def share_table(self, table):
+      return [self.share_column(column) for column in table.columns]
+
+
+   def share_rows(self, rows):
+      return self.share_bytes(pickle.dumps(rows, pickle.HIGHEST_PROTOCOL))
+
+
+
+# decoded pools and unpickled rows, cached by every worker for the rest of the query
+worker_cache = {}
+worker_cache_size = 16
+
+
+
+def read_block(name, decode):
+   if name not in worker_cache:
+      if len(worker_cache) >= worker_cache_size:
+         worker_cache.clear()
+      block = shared_memory.SharedMemory(name=name)
+      try:
+         worker_cache[name] = decode(block.buf)
+      finally:
+         block.close()
+   return worker_cache[name]
+
+
+
+def decode_pool(buffer):
+   with buffer[:8].cast('q') as header:
+      count = header[0]
+   with buffer[8:8 * (count + 2)].cast('q') as offsets_view:
+      offsets = offsets_view.tolist()
+   data = bytes(buffer[8 * (count + 2):8 * (count + 2) + offsets[-1]])
+   return [data[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+
+
+
+def decode_rows(buffer):
+   return pickle.loads(buffer)
+
+
+
+def read_column(shared_column, start, end):
+   name, typecode, length, pool_name = shared_column
+   block = shared_memory.SharedMemory(name=name)
+   try:
+      itemsize = array(typecode).itemsize
+      with block.buf[start * itemsize:end * itemsize] as buffer, buffer.cast(typecode) as view:
+         values = view.tolist()
+   finally:
+      block.close()
+   if pool_name:
+      strings = read_block(pool_name, decode_pool)
+      values = [strings[string_id] for string_id in values]
+   return values
+
+
+
+def filter_chunk(task):
+   # runs inside the workers, returns the positions of the rows of the chunk satisfying scan_tree
+   # and, for products, the positions of the right rows whose union with them satisfies product_tree
+   shared_columns, column_types, start, end, scan_tree, right_rows_name, right_types, product_tree = task
+   columns = [read_column(shared_column, start, end) for shared_column in shared_columns]
+   rows = zip(*columns)
+   row_indexes = range(start, end)
+   if scan_tree:
+      predicate = compiler.ConditionCompiler(column_types).compile_tree(scan_tree)
+      selectors = list(map(predicate, zip(*columns)))
+      rows = itertools.compress(rows, selectors)
+      row_indexes = itertools.compress(row_indexes, selectors)
+   if right_rows_name is None:
+      return array('q', row_indexes).tobytes(), None
+
+   right_rows = read_block(right_rows_name, decode_rows)
+   predicate = compiler.ConditionCompiler(tuple(column_types) + tuple(right_types)).compile_tree(product_tree)
+   left_matches = array('q')
+   right_matches = array('q')
+   for row_index, left_row in zip(row_indexes, rows):
+      for right_index, right_row in enumerate(right_rows):
+         if predicate(left_row + right_row):
+            left_matches.append(row_index)
+            right_matches.append(right_index)
+   return left_matches.tobytes(), right_matches.tobytes()
+
+
+
+class ParallelScan(executor.Operator):
+   def __init__(self, table, condition_tree, workers):
+      super().__init__(table.get_column_names(), table.get_column_types())
+      self.table = table
+      self.condition_tree = condition_tree
+      self.workers = workers
+
+
+   def __iter__(self):
+      table = self.table
+      with SharedBlocks() as shared_blocks:
+         shared_columns = shared_blocks.share_table(table)
+         tasks = ((shared_columns, self.column_types, start, end, self.condition_tree, None, None, None)
+                  for start, end in get_chunks(len(table), self.workers))
+         for row_indexes, _ in get_pool(self.workers).map(filter_chunk, tasks):
+            yield from map(table.get_raw_row, array('q', row_indexes))
+
+
+
+class ParallelProduct(executor.Operator):
+   # the product of a table, filtered by left_tree, and of the rows of right, filtered by condition_tree,
+   # the table is the outer side of the product and it's split into chunks
+   def __init__(self, table, left_tree, right, condition_tree, workers):
+      super().__init__(table.get_column_names() + right.get_column_names(),
+                       table.get_column_types() + right.get_column_types())
+      self.table = table
+      self.left_tree = left_tree
+      self.right = right
+      self.condition_tree = condition_tree
+      self.workers = workers
+
+
+   def __iter__(self):
+      table = self.table
+      right_rows = list(self.right)
+      if not right_rows:
+         return
+      with SharedBlocks() as shared_blocks:
+         shared_columns = shared_blocks.share_table(table)
+         right_rows_name = shared_blocks.share_rows(right_rows)
+         tasks = ((shared_columns, table.get_column_types(), start, end, self.left_tree,
+                   right_rows_name, self.right.get_column_types(), self.condition_tree)
+                  for start, end in get_chunks(len(table), self.workers))
+         for left_matches, right_matches in get_pool(self.workers).map(filter_chunk, tasks):
+            row_index = None
+            for left_index, right_index in zip(array('q', left_matches), array('q', right_matches)):
+               if left_index != row_index:
+                  row_index = left_index
+                  left_row = table.get_raw_row(row_index)
+               yield left_row + right_rows[right_index]
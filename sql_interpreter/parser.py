@@ -10,10 +10,41 @@ import re
 # 2) the "database virtual machine" offers a function oriented API because that was the easiest
 #    way to implent one, even though this way operations optimization is way more difficult (if
 #    not entirely impossible)
+#    select statements are the exception, they are turned into a logical plan by planner.py
+#    which can be inspected with explain
+
+# a view over a list of tokens starting from the current one, tokens[0] is always the next token
+# to be eaten and advance moves to the following one
+class TokenCursor:
+   def __init__(self, tokens):
+      self.tokens = tokens if type(tokens) is list else list(tokens)
+      self.position = 0
+
+
+   def __len__(self):
+      return len(self.tokens) - self.position
+
+
+   def __getitem__(self, index):
+      return self.tokens[self.position + index]
+
+
+   def __iter__(self):
+      # eats the remaining tokens
+      while self.position < len(self.tokens):
+         self.position += 1
+         yield self.tokens[self.position - 1]
+
+
+   def advance(self):
+      self.position += 1
+
+
 
 # TODO: definite exceptions classes for every error type
 class SQLParser:
    name_regex = re.compile(r"^[a-zA-Z]\w*$")
+   file_name_regex = re.compile(r"^'[^']+'$")
 
 
    operators_priority = {'+': 2,
@@ -25,36 +56,145 @@ class SQLParser:
                          '<': 1,
                          '<=': 1,
                          '=': 1,
-                         '!=': 1,
+                         '<>': 1,
                          'and': 0,
                          'or': 0}
 
 
+   index_types = {'hash', 'ordered'}
+
+
+   # keywords starting the clauses which can follow the condition of a select
+   select_clauses = {'group', 'order', 'limit'}
+
+
+   aggregate_functions = {'count', 'sum', 'avg', 'min', 'max'}
+
+
    def __init__(self):
-      self.commands = {'create': self.create_table,
+      self.commands = {'analyze': self.analyze,
+                       'create': self.create,
                        'drop': self.drop_table,
+                       'explain': self.explain,
                        'insert': self.insert_into,
+                       'load': self.load,
                        'print': self.print_table,
+                       'store': self.store,
                        'select': self.select}
 
 
    def parse(self, tokens):
+      # the methods parsing the commands move the cursor forward instead of slicing the token list,
+      # so the parsing time is linear in the number of tokens
+      tokens = TokenCursor(tokens)
+
       #eats command token
       if not tokens:
          raise ValueError('Empty token list.')
       if tokens[0].get_name() != 'COMMAND':
          raise ValueError('Wrong syntax, missing command.')
       command = tokens[0].get_value()
-      tokens = tokens[1:]
+      tokens.advance()
 
       return self.commands[command](tokens)
 
 
+   def create(self, tokens):
+      if tokens and tokens[0].get_value() == 'index':
+         tokens.advance()
+         return self.create_index(tokens)
+      if tokens and tokens[0].get_value() == 'materialized':
+         tokens.advance()
+         return self.create_materialized_view(tokens)
+      return self.create_table(tokens)
+
+
+   def create_materialized_view(self, tokens):
+      # eats view token
+      if not tokens or tokens[0].get_value() != 'view':
+         raise ValueError('Wrong syntax for CREATE MATERIALIZED VIEW, missing VIEW after MATERIALIZED.')
+      tokens.advance()
+
+      # eats view_name token
+      if not tokens or tokens[0].get_name() != 'LITERAL':
+         raise ValueError('Wrong syntax for CREATE MATERIALIZED VIEW, view_name is a reserved keyword.')
+      if not self.name_regex.match(tokens[0].get_value()):
+         raise ValueError('Wrong syntax for CREATE MATERIALIZED VIEW, view_name contains forbidden characters.')
+      view_name = tokens[0].get_value()
+      tokens.advance()
+
+      # eats as token
+      if not tokens or tokens[0].get_value() != 'as':
+         raise ValueError('Wrong syntax for CREATE MATERIALIZED VIEW, missing AS after view_name.')
+      tokens.advance()
+
+      # eats select token
+      if not tokens or tokens[0].get_value() != 'select':
+         raise ValueError('Wrong syntax for CREATE MATERIALIZED VIEW, missing select statement.')
+      tokens.advance()
+
+      return ('create_materialized_view', view_name) + self.select(tokens)[1:]
+
+
+   def create_index(self, tokens):
+      # eats index_name token
+      if not tokens or tokens[0].get_name() != 'LITERAL':
+         raise ValueError('Wrong syntax for CREATE INDEX, index_name is a reserved keyword.')
+      if not self.name_regex.match(tokens[0].get_value()):
+         raise ValueError('Wrong syntax for CREATE INDEX, index_name contains forbidden characters.')
+      index_name = tokens[0].get_value()
+      tokens.advance()
+
+      # eats on token
+      if not tokens or tokens[0].get_value() != 'on':
+         raise ValueError('Wrong syntax for CREATE INDEX, missing ON after index_name.')
+      tokens.advance()
+
+      # eats table_name token
+      if not tokens or tokens[0].get_name() != 'LITERAL':
+         raise ValueError('Wrong syntax for CREATE INDEX, table_name is a reserved keyword.')
+      if not self.name_regex.match(tokens[0].get_value()):
+         raise ValueError('Wrong syntax for CREATE INDEX, table_name contains forbidden characters.')
+      table_name = tokens[0].get_value()
+      tokens.advance()
+
+      # eats (column_name) tokens
+      if not tokens or tokens[0].get_value() != '(':
+         raise ValueError('Wrong syntax for CREATE INDEX, missing ( after table_name.')
+      tokens.advance()
+      if not tokens or tokens[0].get_name() != 'LITERAL':
+         raise ValueError('Wrong syntax for CREATE INDEX, column_name is a reserved keyword.')
+      if not self.name_regex.match(tokens[0].get_value()):
+         raise ValueError('Wrong syntax for CREATE INDEX, column_name contains forbidden characters.')
+      column_name = tokens[0].get_value()
+      tokens.advance()
+      if not tokens or tokens[0].get_value() != ')':
+         raise ValueError('Wrong syntax for CREATE INDEX, missing ) after column_name.')
+      tokens.advance()
+
+      # the using clause is optional, hash indexes are the default
+      index_type = 'hash'
+      if tokens:
+         if tokens[0].get_value() != 'using':
+            raise ValueError('Wrong syntax for CREATE INDEX, expecting USING after ).')
+         tokens.advance()
+         if not tokens or tokens[0].get_value() not in self.index_types:
+            raise ValueError('Wrong syntax for CREATE INDEX, index type must be hash or ordered.')
+         index_type = tokens[0].get_value()
+         tokens.advance()
+
+      # checks if all the tokens have been eaten
+      if tokens:
+         raise ValueError('Wrong syntax for CREATE INDEX, command doesn\'t end after index type.')
+
+      return ('create_index', index_name, table_name, column_name, index_type)
+
+
    def create_table(self, tokens):
       # eats table token
       if not tokens or tokens[0].get_value() != 'table':
          raise ValueError('Wrong syntax for CREATE TABLE, missing TABLE after CREATE.')
-      tokens = tokens[1:]
+      tokens.advance()
 
       # eats table_table token
       if not tokens or tokens[0].get_name() != 'LITERAL':
@@ -62,26 +202,25 @@ class SQLParser:
       if not self.name_regex.match(tokens[0].get_value()):
          raise ValueError('Wrong syntax for CREATE TABLE, table_name contains forbidden characters.')
       table_name = tokens[0].get_value()
-      tokens = tokens[1:]
+      tokens.advance()
 
       if not tokens:
          raise ValueError('Wrong syntax for CREATE TABLE, missing column list or select statement.')
 
       # as <select> version
       if tokens[0].get_value() == 'as':
-         tokens = tokens[1:]
+         tokens.advance()
          if not tokens or tokens[0].get_value() != 'select':
             raise ValueError('Wrong syntax for CREATE TABLE, missing select statement.')
-         tokens = tokens[1:]
+         tokens.advance()
 
-         (_, columns_list, tables_list, condition) = self.select(tokens)
-         return ('create_table_as', table_name, columns_list, tables_list, condition)
+         return ('create_table_as', table_name) + self.select(tokens)[1:]
 
       # normal version
       # eats '(' token
       if tokens[0].get_value() != '(':
          raise ValueError('Wrong syntax for CREATE TABLE, expecting column list, got something else.')
-      tokens = tokens[1:]
+      tokens.advance()
 
       column_names = []
       column_types = []
@@ -94,24 +233,24 @@ class SQLParser:
             raise ValueError('Wrong syntax for CREATE TABLE, column_name number {} contains forbidden characters.'.format(i))
          column_name = tokens[0].get_value()
          column_names.append(column_name)
-         tokens = tokens[1:]
+         tokens.advance()
 
          # eats column_type token
          if not tokens or tokens[0].get_name() != 'TYPE':
             raise ValueError('Wrong syntax for CREATE TABLE, missing column_type after column_name number {}.'.format(i))
          column_type = tokens[0].get_value()
          column_types.append(column_type)
-         tokens = tokens[1:]
+         tokens.advance()
 
          # eats separator token
          if not tokens or tokens[0].get_name() != 'SEPARATOR':
             raise ValueError('Wrong syntax for CREATE TABLE, missing separator after column entry number {}.'.format(i))
          if tokens[0].get_value() == ')':
-            tokens = tokens[1:]
+            tokens.advance()
             break
          if tokens[0].get_value() != ',':
             raise ValueError('Wrong syntax for CREATE TABLE, wrong ( character inside columns list.')
-         tokens = tokens[1:]
+         tokens.advance()
          i += 1
 
       # checks if all the tokens have been eaten
@@ -121,6 +260,24 @@ class SQLParser:
       return ('create_table', table_name, column_names, column_types)
 
 
+   def analyze(self, tokens):
+      # eats table_name token
+      if not tokens:
+         raise ValueError('Wrong syntax for ANALYZE, missing table_name.')
+      if tokens[0].get_name() != 'LITERAL':
+         raise ValueError('Wrong syntax for ANALYZE, table_name is a reserved keyword.')
+      if not self.name_regex.match(tokens[0].get_value()):
+         raise ValueError('Wrong syntax for ANALYZE, table_name contains forbidden characters.')
+      table_name = tokens[0].get_value()
+      tokens.advance()
+
+      # checks if all the tokens have been eaten
+      if tokens:
+         raise ValueError('Wrong syntax for ANALYZE, command doesn\'t end after table_name.')
+
+      return ('analyze', table_name)
+
+
    def print_table(self, tokens):
       # eats table_name token
       if not tokens:
@@ -130,7 +287,7 @@ class SQLParser:
       if not self.name_regex.match(tokens[0].get_value()):
          raise ValueError('Wrong syntax for PRINT, table_name contains forbidden characters.')
       table_name = tokens[0].get_value()
-      tokens = tokens[1:]
+      tokens.advance()
 
       # checks if all the tokens have been eaten
       if tokens:
@@ -139,11 +296,77 @@ class SQLParser:
       return ('print_table', table_name)
 
 
+   def load(self, tokens):
+      # whole database version
+      if tokens and tokens[0].get_value() == 'from':
+         tokens.advance()
+         file_name = self.file_name(tokens, 'LOAD')
+         return ('load_database', file_name)
+
+      # eats table_name token
+      if not tokens:
+         raise ValueError('Wrong syntax for LOAD, missing table_name.')
+      if tokens[0].get_name() != 'LITERAL':
+         raise ValueError('Wrong syntax for LOAD, table_name is a reserved keyword.')
+      if not self.name_regex.match(tokens[0].get_value()):
+         raise ValueError('Wrong syntax for LOAD, table_name contains forbidden characters.')
+      table_name = tokens[0].get_value()
+      tokens.advance()
+
+      # eats from token
+      if not tokens or tokens[0].get_value() != 'from':
+         raise ValueError('Wrong syntax for LOAD, missing FROM after table_name.')
+      tokens.advance()
+
+      file_name = self.file_name(tokens, 'LOAD')
+      return ('load', table_name, file_name)
+
+
+   def store(self, tokens):
+      # whole database version
+      if tokens and tokens[0].get_value() == 'to':
+         tokens.advance()
+         file_name = self.file_name(tokens, 'STORE')
+         return ('store_database', file_name)
+
+      # eats table_name token
+      if not tokens:
+         raise ValueError('Wrong syntax for STORE, missing table_name.')
+      if tokens[0].get_name() != 'LITERAL':
+         raise ValueError('Wrong syntax for STORE, table_name is a reserved keyword.')
+      if not self.name_regex.match(tokens[0].get_value()):
+         raise ValueError('Wrong syntax for STORE, table_name contains forbidden characters.')
+      table_name = tokens[0].get_value()
+      tokens.advance()
+
+      # eats to token
+      if not tokens or tokens[0].get_value() != 'to':
+         raise ValueError('Wrong syntax for STORE, missing TO after table_name.')
+      tokens.advance()
+
+      file_name = self.file_name(tokens, 'STORE')
+      return ('store', table_name, file_name)
+
+
+   def file_name(self, tokens, command):
+      # eats file_name token, which must be the last one
+      if not tokens or not self.file_name_regex.match(tokens[0].get_value()):
+         raise ValueError('Wrong syntax for {}, file_name must be enclosed between \' characters.'.format(command))
+      file_name = tokens[0].get_value()[1:-1]
+      tokens.advance()
+
+      # checks if all the tokens have been eaten
+      if tokens:
+         raise ValueError('Wrong syntax for {}, command doesn\'t end after file_name.'.format(command))
+
+      return file_name
+
+
    def insert_into(self, tokens):
       # eats into token
       if not tokens or tokens[0].get_value() != 'into':
          raise ValueError('Wrong syntax for INSERT INTO, missing into after insert.')
-      tokens = tokens[1:]
+      tokens.advance()
 
       # eats table_name token
       if not tokens:
@@ -153,12 +376,16 @@ class SQLParser:
       if not self.name_regex.match(tokens[0].get_value()):
          raise ValueError('Wrong syntax for INSERT INTO, table_name contains forbidden characters.')
       table_name = tokens[0].get_value()
-      tokens = tokens[1:]
+      tokens.advance()
 
       # eats values token
       if not tokens or tokens[0].get_value() != 'values':
          raise ValueError('Wrong syntax for INSERT INTO, missing values after table_name.')
-      tokens = tokens[1:]
+      tokens.advance()
+
+      # multi row version, every row is enclosed between brackets
+      if tokens and tokens[0].get_value() == '(':
+         return self.insert_many(table_name, tokens)
 
       values_list = []
       i = 1
@@ -168,7 +395,7 @@ class SQLParser:
             raise ValueError('Wrong syntax for INSERT INTO, missing expected value entry number {}.'.format(i))
          if tokens[0].get_name() == 'LITERAL':
             value = tokens[0].get_value()
-            tokens = tokens[1:]
+            tokens.advance()
          else:
             raise ValueError('Wrong syntax for INSERT INTO, missing value entry number {}.'.format(i))
          values_list.append(value)
@@ -182,13 +409,63 @@ class SQLParser:
             raise ValueError('Wrong syntax for INSERT INTO, missing separator after value in entry number {}.'.format(i))
          if tokens[0].get_value() != ',':
             raise ValueError('Wrong syntax for INSERT INTO, expecting , got something else.')
-         tokens = tokens[1:]
+         tokens.advance()
          i += 1
 
       # this code can't be executed
       raise ValueError('Something went wrong while parsing an INSERT INTO command.')
 
 
+   def insert_many(self, table_name, tokens):
+      rows = []
+      i = 1
+      while True:
+         # eats ( token
+         if not tokens or tokens[0].get_value() != '(':
+            raise ValueError('Wrong syntax for INSERT INTO, missing ( before row number {}.'.format(i))
+         tokens.advance()
+
+         values_list = []
+         j = 1
+         while True:
+            # eats value token
+            if not tokens or tokens[0].get_name() != 'LITERAL':
+               raise ValueError('Wrong syntax for INSERT INTO, missing value entry number {} of row number {}.'.format(j, i))
+            values_list.append(tokens[0].get_value())
+            tokens.advance()
+
+            # eats separator token, ) ends the row
+            if not tokens or tokens[0].get_name() != 'SEPARATOR':
+               raise ValueError('Wrong syntax for INSERT INTO, missing separator after value entry number {} of row number {}.'.format(j, i))
+            if tokens[0].get_value() == ')':
+               tokens.advance()
+               break
+            if tokens[0].get_value() != ',':
+               raise ValueError('Wrong syntax for INSERT INTO, expecting , got something else.')
+            tokens.advance()
+            j += 1
+         rows.append(values_list)
+
+         # stops parsing if tokens are over
+         if not tokens:
+            return ('insert_many', table_name, rows)
+
+         # eats the separator between rows
+         if tokens[0].get_value() != ',':
+            raise ValueError('Wrong syntax for INSERT INTO, expecting , after row number {}.'.format(i))
+         tokens.advance()
+         i += 1
+
+
+   def explain(self, tokens):
+      # eats select token
+      if not tokens or tokens[0].get_value() != 'select':
+         raise ValueError('Wrong syntax for EXPLAIN, missing select statement.')
+      tokens.advance()
+
+      return ('explain',) + self.select(tokens)[1:]
+
+
    def drop_table(self, tokens):
       # eats table_name token
       if not tokens:
@@ -198,7 +475,7 @@ class SQLParser:
       if not self.name_regex.match(tokens[0].get_value()):
          raise ValueError('Wrong syntax for DROP, table_name contains forbidden characters.')
       table_name = tokens[0].get_value()
-      tokens = tokens[1:]
+      tokens.advance()
 
       # checks if all the tokens have been eaten
       if tokens:
@@ -214,7 +491,7 @@ class SQLParser:
       # columns_list will remain empty only if * is specified instead of a columns list
       columns_list = []
       if tokens[0].get_value() == '*':
-         tokens = tokens[1:]
+         tokens.advance()
       else:
          i = 0
          while True:
@@ -222,12 +499,11 @@ class SQLParser:
             if not tokens:
                raise ValueError('Wrong syntax for SELECT, expecting column_name.')
 
-            # eats column_name token
+            # eats column_name token or aggregate tokens
             if tokens[0].get_name() != 'LITERAL':
                raise ValueError('Wrong syntax for SELECT, missing column name number {}.'.format(i))
 
-            columns_list.append(tokens[0].get_value())
-            tokens = tokens[1:]
+            columns_list.append(self.column_item(tokens, 'SELECT'))
 
             # stops parsing if we don't find a separator token
             if not tokens:
@@ -236,13 +512,13 @@ class SQLParser:
                break
 
             # we eat the separator token and go on parsing the column_list
-            tokens = tokens[1:]
+            tokens.advance()
             i += 1
 
       # eats from token
       if tokens[0].get_value() != 'from':
          raise ValueError('Wrong syntax for SELECT, missing FROM clause')
-      tokens = tokens[1:]
+      tokens.advance()
 
       i = 0
       tables_list = []
@@ -257,28 +533,138 @@ class SQLParser:
             raise ValueError('Wrong syntax for SELECT, missing column name number {}.'.format(i))
 
          tables_list.append(tokens[0].get_value())
-         tokens = tokens[1:]
-
-         # the where clause is optional
-         if not tokens:
-            return ('select', columns_list, tables_list, [])
+         tokens.advance()
 
-         if tokens[0].get_name() != 'SEPARATOR':
+         if not tokens or tokens[0].get_name() != 'SEPARATOR':
             break
 
-         tokens = tokens[1:]
+         tokens.advance()
          i += 1
 
-      # eats where token
-      if tokens[0].get_value() != 'where':
-         raise ValueError('Wrong syntax for SELECT, expecting where clause after tables list.')
-      tokens = tokens[1:]
+      # the where clause is optional
+      condition = []
+      if tokens and tokens[0].get_value() not in self.select_clauses:
+         # eats where token
+         if tokens[0].get_value() != 'where':
+            raise ValueError('Wrong syntax for SELECT, expecting where clause after tables list.')
+         tokens.advance()
+
+         condition_tokens = []
+         while tokens and tokens[0].get_value() not in self.select_clauses:
+            condition_tokens.append(tokens[0])
+            tokens.advance()
+         condition = self.infix_to_postfix(condition_tokens)
+
+      group_by = self.group_by(tokens)
+      order_by = self.order_by(tokens)
+      limit = self.limit(tokens)
 
-      condition = self.infix_to_postfix(tokens)
+      # checks if all the tokens have been eaten
+      if tokens:
+         raise ValueError('Wrong syntax for SELECT, unexpected {} after the condition.'.format(tokens[0].get_value()))
 
+      # order by, limit and group by are added only if present, so the plain selects keep their old form
+      if group_by:
+         return ('select', columns_list, tables_list, condition, order_by, limit, group_by)
+      if order_by or limit is not None:
+         return ('select', columns_list, tables_list, condition, order_by, limit)
       return ('select', columns_list, tables_list, condition)
 
 
+   def column_item(self, tokens, clause):
+      # eats a column name, or an aggregate function applied to a column which is returned as a
+      # (function, column_name) pair, count(*) is ('count', '*')
+      name = tokens[0].get_value()
+      tokens.advance()
+      if not tokens or tokens[0].get_value() != '(':
+         return name
+      if name not in self.aggregate_functions:
+         raise ValueError('Wrong syntax for {}, unknown aggregate function {}.'.format(clause, name))
+      tokens.advance()
+
+      # eats column_name token
+      if not tokens or (tokens[0].get_name() != 'LITERAL' and tokens[0].get_value() != '*'):
+         raise ValueError('Wrong syntax for {}, missing the column of {}.'.format(clause, name))
+      column_name = tokens[0].get_value()
+      if column_name == '*' and name != 'count':
+         raise ValueError('Wrong syntax for {}, only count can be applied to *.'.format(clause))
+      tokens.advance()
+
+      # eats ) token
+      if not tokens or tokens[0].get_value() != ')':
+         raise ValueError('Wrong syntax for {}, expecting ) after the column of {}.'.format(clause, name))
+      tokens.advance()
+      return (name, column_name)
+
+
+   def group_by(self, tokens):
+      # returns the list of the grouped column names, empty if there is no group by clause
+      group_by = []
+      if not tokens or tokens[0].get_value() != 'group':
+         return group_by
+      tokens.advance()
+
+      # eats by token
+      if not tokens or tokens[0].get_value() != 'by':
+         raise ValueError('Wrong syntax for SELECT, expecting BY after GROUP.')
+      tokens.advance()
+
+      while True:
+         # eats column_name token
+         if not tokens or tokens[0].get_name() != 'LITERAL':
+            raise ValueError('Wrong syntax for SELECT, missing column name number {} of GROUP BY.'.format(len(group_by)))
+         group_by.append(tokens[0].get_value())
+         tokens.advance()
+
+         if not tokens or tokens[0].get_value() != ',':
+            return group_by
+         tokens.advance()
+
+
+   def order_by(self, tokens):
+      # returns a list of (column_name, descending) pairs, empty if there is no order by clause
+      order_by = []
+      if not tokens or tokens[0].get_value() != 'order':
+         return order_by
+      tokens.advance()
+
+      # eats by token
+      if not tokens or tokens[0].get_value() != 'by':
+         raise ValueError('Wrong syntax for SELECT, expecting BY after ORDER.')
+      tokens.advance()
+
+      while True:
+         # eats column_name token or aggregate tokens
+         if not tokens or tokens[0].get_name() != 'LITERAL':
+            raise ValueError('Wrong syntax for SELECT, missing column name number {} of ORDER BY.'.format(len(order_by)))
+         column_name = self.column_item(tokens, 'ORDER BY')
+
+         # eats the optional direction token
+         descending = False
+         if tokens and tokens[0].get_value() in ('asc', 'desc'):
+            descending = tokens[0].get_value() == 'desc'
+            tokens.advance()
+         order_by.append((column_name, descending))
+
+         if not tokens or tokens[0].get_value() != ',':
+            return order_by
+         tokens.advance()
+
+
+   def limit(self, tokens):
+      # returns the maximum number of rows, None if there is no limit clause
+      if not tokens or tokens[0].get_value() != 'limit':
+         return None
+      tokens.advance()
+
+      # eats row_count token
+      if not tokens or not tokens[0].get_value().isdecimal():
+         raise ValueError('Wrong syntax for SELECT, LIMIT expects a number of rows.')
+      limit = int(tokens[0].get_value())
+      tokens.advance()
+      return limit
+
+
    # shunting-yard algorithm without brackets support
    def infix_to_postfix(self, infix_tokens):
       if not infix_tokens:
@@ -0,0 +1,439 @@
+import bisect
+import itertools
+
+from sql_interpreter import aggregate
+from sql_interpreter import compiler
+from sql_interpreter import executor
+from sql_interpreter import parallel
+from sql_interpreter import sort
+
+
+
+def is_equi_join(conjunct, column_to_table, column_types):
+   # column = column between two different tables, answered by a hash join
+   if conjunct[0] != 'OPERATOR' or conjunct[1] != '=':
+      return False
+   left, right = conjunct[2], conjunct[3]
+   if left[0] != 'COLUMN_NAME' or right[0] != 'COLUMN_NAME':
+      return False
+   return column_to_table[left[1]] != column_to_table[right[1]] and column_types[left[1]] == column_types[right[1]]
+
+
+
+# the nodes of a logical plan know how many rows they are expected to produce, explain prints them
+# and build turns them into the tree of operators run by the executor
+class PlanNode:
+   def __init__(self, column_names, estimated_rows, children=()):
+      self.column_names = tuple(column_names)
+      self.estimated_rows = estimated_rows
+      self.children = tuple(children)
+
+
+   def describe(self):
+      raise NotImplementedError
+
+
+   def build(self):
+      raise NotImplementedError
+
+
+   def explain(self, depth=0):
+      lines = ['   ' * depth + '{} (rows={:.0f})'.format(self.describe(), self.estimated_rows)]
+      for child in self.children:
+         lines.extend(child.explain(depth + 1))
+      return lines
+
+
+
+class ScanNode(PlanNode):
+   def __init__(self, table_name, table, conjuncts, estimated_rows, vectorize=False, workers=1):
+      column_names = (table_name + '.' + column_name for column_name in table.get_column_names())
+      super().__init__(column_names, estimated_rows)
+      self.table_name = table_name
+      self.table = table
+      # the columns of the conjuncts are positions inside the table
+      self.conjuncts = list(conjuncts)
+      self.vectorize = vectorize
+      self.workers = workers
+
+
+   def describe(self):
+      description = 'Scan ' + self.table_name
+      # the same choice made by build
+      access_path, argument = self.table.choose_access(self.conjuncts, self.vectorize, self.workers)
+      if access_path == 'index':
+         description += ' using index ' + argument[0].name
+      elif access_path == 'zone maps':
+         description += ' using zone maps ({} of {} rows)'.format(sum(end - start for start, end in argument), len(self.table))
+      elif access_path == 'parallel':
+         description += ' in parallel'
+      if self.conjuncts:
+         description += ' where ' + compiler.format_tree(compiler.join_conjuncts(self.conjuncts), self.column_names)
+      return description
+
+
+   def build(self):
+      return self.table.scan(self.conjuncts, self.vectorize, self.workers)
+
+
+
+class JoinNode(PlanNode):
+   def __init__(self, left, right, left_keys, right_keys, conjuncts, estimated_rows, workers=1):
+      super().__init__(left.column_names + right.column_names, estimated_rows, (left, right))
+      self.left = left
+      self.right = right
+      self.left_keys = tuple(left_keys)
+      self.right_keys = tuple(right_keys)
+      # residual conjuncts, applied to the joined rows
+      self.conjuncts = list(conjuncts)
+      self.workers = workers
+
+
+   def is_parallel(self):
+      # a filtered product whose outer side is a table is split among the workers
+      if self.workers <= 1 or self.left_keys or not self.conjuncts or not isinstance(self.left, ScanNode):
+         return False
+      return len(self.left.table) * self.right.estimated_rows >= parallel.min_rows
+
+
+   def describe(self):
+      if self.left_keys:
+         offset = len(self.left.column_names)
+         keys = ('{} = {}'.format(self.column_names[left_key], self.column_names[offset + right_key])
+                 for left_key, right_key in zip(self.left_keys, self.right_keys))
+         description = 'HashJoin on ' + ' and '.join(keys)
+      elif self.is_parallel():
+         description = 'ParallelProduct'
+      else:
+         description = 'CrossProduct'
+      if self.conjuncts:
+         description += ' where ' + compiler.format_tree(compiler.join_conjuncts(self.conjuncts), self.column_names)
+      return description
+
+
+   def build(self):
+      if self.is_parallel():
+         left_tree = compiler.join_conjuncts(self.left.conjuncts) if self.left.conjuncts else None
+         return parallel.ParallelProduct(self.left.table, left_tree, self.right.build(),
+                                         compiler.join_conjuncts(self.conjuncts), self.workers)
+      left, right = self.left.build(), self.right.build()
+      if self.left_keys:
+         pipeline = executor.HashJoin(left, right, self.left_keys, self.right_keys)
+      else:
+         pipeline = executor.CrossProduct(left, right)
+      if self.conjuncts:
+         pipeline = executor.Filter(pipeline, compiler.join_conjuncts(self.conjuncts))
+      return pipeline
+
+
+
+class ProjectNode(PlanNode):
+   def __init__(self, child, column_indexes):
+      self.column_indexes = tuple(column_indexes)
+      column_names = (child.column_names[i] for i in self.column_indexes)
+      super().__init__(column_names, child.estimated_rows, (child,))
+      self.child = child
+
+
+   def describe(self):
+      return 'Project ' + ', '.join(self.column_names)
+
+
+   def build(self):
+      return executor.Project(self.child.build(), self.column_indexes)
+
+
+
+class AggregateNode(PlanNode):
+   # group_keys and the columns of the (function, column_index) aggregates are positions inside the
+   # rows of child, the aggregated rows contain the grouped columns followed by the aggregates
+   def __init__(self, child, group_keys, aggregates, estimated_rows, vectorize=False):
+      self.group_keys = tuple(group_keys)
+      self.aggregates = tuple(aggregates)
+      column_names = [child.column_names[i] for i in self.group_keys]
+      column_names.extend(aggregate.get_column_name(function, None if column_index is None else child.column_names[column_index])
+                          for function, column_index in self.aggregates)
+      super().__init__(column_names, estimated_rows, (child,))
+      self.child = child
+      self.vectorize = vectorize
+
+
+   def is_vectorized(self):
+      # the aggregates of a single scan can be computed over whole columns
+      if not self.vectorize or not isinstance(self.child, ScanNode):
+         return False
+      return aggregate.supports_vectorized(self.child.table, self.child.conjuncts, self.group_keys, self.aggregates)
+
+
+   def describe(self):
+      description = 'VectorizedAggregate' if self.is_vectorized() else 'HashAggregate'
+      if self.group_keys:
+         description += ' by ' + ', '.join(self.column_names[:len(self.group_keys)])
+      return description + ': ' + ', '.join(self.column_names[len(self.group_keys):])
+
+
+   def build(self):
+      if self.is_vectorized():
+         # the scan is replaced by the aggregation, which reads the table itself
+         conjuncts = self.child.conjuncts
+         return aggregate.VectorizedAggregate(self.child.table, compiler.join_conjuncts(conjuncts) if conjuncts else None,
+                                              self.group_keys, self.aggregates)
+      return aggregate.HashAggregate(self.child.build(), self.group_keys, self.aggregates)
+
+
+
+class SortNode(PlanNode):
+   # keys are (column_index, descending) pairs, count limits the result to the first count rows
+   def __init__(self, child, keys, count=None, memory_budget=sort.default_memory_budget):
+      estimated_rows = child.estimated_rows if count is None else min(child.estimated_rows, count)
+      super().__init__(child.column_names, estimated_rows, (child,))
+      self.child = child
+      self.keys = tuple(keys)
+      self.count = count
+      self.memory_budget = memory_budget
+
+
+   def describe(self):
+      keys = ', '.join(self.column_names[column_index] + (' desc' if descending else '')
+                       for column_index, descending in self.keys)
+      if self.count is None:
+         return 'Sort by ' + keys
+      return 'TopN {} by {}'.format(self.count, keys)
+
+
+   def build(self):
+      if self.count is None:
+         return executor.Sort(self.child.build(), self.keys, self.memory_budget)
+      return executor.TopN(self.child.build(), self.keys, self.count)
+
+
+
+class LimitNode(PlanNode):
+   def __init__(self, child, count):
+      super().__init__(child.column_names, min(child.estimated_rows, count), (child,))
+      self.child = child
+      self.count = count
+
+
+   def describe(self):
+      return 'Limit {}'.format(self.count)
+
+
+   def build(self):
+      return executor.Limit(self.child.build(), self.count)
+
+
+
+# turns the tables and the condition of a select into a logical plan: conjuncts on a single table
+# are pushed down to its scan, the other ones are applied as soon as all of their tables are joined
+# and the tables are joined in the order producing the smallest intermediate results
+class Planner:
+   # selectivities used when nothing better is known, the same guesses of the classic System R optimizer
+   default_selectivities = {'=': 0.1, '<>': 0.9, '<': 1 / 3, '<=': 1 / 3, '>': 1 / 3, '>=': 1 / 3}
+   default_selectivity = 0.5
+
+
+   # above this number of tables the join order is built greedily instead of trying every order
+   exhaustive_search_limit = 8
+
+
+   def __init__(self, vectorize=False, workers=1, sort_memory_budget=sort.default_memory_budget):
+      self.vectorize = vectorize
+      self.workers = workers
+      self.sort_memory_budget = sort_memory_budget
+
+
+   def plan_select(self, tables_scope, condition, projection, order=(), limit=None, aggregation=None):
+      # tables_scope maps the names of the tables to the tables, the columns of the condition, of the
+      # projection and of the (column_index, descending) pairs of order are positions inside the
+      # product of the tables, in the order of tables_scope
+      # aggregation is a (group_keys, aggregates) pair whose columns are positions inside the product,
+      # when present order and projection refer to the aggregated rows instead
+      # rows are sorted before the projection, so they can be ordered by columns which aren't returned
+      tables = list(tables_scope.values())
+      root, column_positions = self.plan_joins(tables, condition, list(tables_scope))
+      if aggregation:
+         group_keys, aggregates = aggregation
+         estimated_rows = self.estimate_groups(tables, group_keys, root.estimated_rows)
+         root = AggregateNode(root, (column_positions[i] for i in group_keys),
+                              ((function, None if i is None else column_positions[i]) for function, i in aggregates),
+                              estimated_rows, self.vectorize)
+         column_positions = range(len(root.column_names))
+      if order:
+         # with a limit only the first rows are kept while reading the input
+         root = SortNode(root, ((column_positions[i], descending) for i, descending in order), limit, self.sort_memory_budget)
+      elif limit is not None:
+         root = LimitNode(root, limit)
+      return ProjectNode(root, (column_positions[i] for i in projection))
+
+
+   def plan_joins(self, tables, condition, table_names=None):
+      # returns the root of the plan and the position of every column of the product inside the
+      # rows it produces, which can differ when the tables are reordered
+      if table_names is None:
+         table_names = ['table{}'.format(i) for i in range(len(tables))]
+      column_types = tuple(column_type for table in tables for column_type in table.get_column_types())
+      table_offsets = list(itertools.accumulate((len(table.get_column_names()) for table in tables), initial=0))
+      column_to_table = [i for i, table in enumerate(tables) for _ in table.get_column_names()]
+
+      local_conjuncts = [[] for _ in tables]
+      join_conjuncts = []
+      if condition:
+         # the whole condition is compiled once to report type errors as if it wasn't split
+         tree = compiler.build_tree(condition)
+         compiler.ConditionCompiler(column_types).compile_tree(tree)
+         for conjunct in compiler.split_conjuncts(tree):
+            referenced_tables = frozenset(column_to_table[index] for index in compiler.get_column_indexes(conjunct))
+            if len(referenced_tables) <= 1:
+               i = min(referenced_tables, default=0)
+               local_conjuncts[i].append(compiler.shift_columns(conjunct, -table_offsets[i]))
+            else:
+               join_conjuncts.append((conjunct, referenced_tables))
+
+      # estimates are never below one row, as an empty result can't be predicted anyway
+      scan_rows = [max(len(table) * self.estimate_selectivity(table, conjuncts), 1)
+                   for table, conjuncts in zip(tables, local_conjuncts)]
+      join_selectivities = [self.estimate_join_selectivity(tables, conjunct, column_to_table, table_offsets, column_types)
+                            for conjunct, _ in join_conjuncts]
+      estimated_rows = {}
+      def estimate_rows(joined_tables):
+         if joined_tables not in estimated_rows:
+            rows = 1
+            for i in joined_tables:
+               rows *= scan_rows[i]
+            for (_, referenced_tables), selectivity in zip(join_conjuncts, join_selectivities):
+               if referenced_tables <= joined_tables:
+                  rows *= selectivity
+            estimated_rows[joined_tables] = max(rows, 1)
+         return estimated_rows[joined_tables]
+
+      if not join_conjuncts:
+         # the product of unrelated tables has always the same size, the order of the from list is kept
+         order = list(range(len(tables)))
+      elif len(tables) <= self.exhaustive_search_limit:
+         order = self.search_join_order(len(tables), scan_rows, estimate_rows)
+      else:
+         order = self.greedy_join_order(len(tables), scan_rows, estimate_rows)
+
+      # every column of the product is moved to its position inside the reordered rows
+      positions = {table_index: position for position, table_index in enumerate(order)}
+      new_offsets = list(itertools.accumulate((len(tables[i].get_column_names()) for i in order), initial=0))
+      column_positions = [new_offsets[positions[column_to_table[index]]] + index - table_offsets[column_to_table[index]]
+                          for index in range(len(column_types))]
+
+      # every join conjunct is applied right after the last of its tables
+      conjuncts_by_position = [[] for _ in tables]
+      for conjunct, referenced_tables in join_conjuncts:
+         conjuncts_by_position[max(positions[i] for i in referenced_tables)].append(conjunct)
+
+      root = None
+      for position, i in enumerate(order):
+         scan = ScanNode(table_names[i], tables[i], local_conjuncts[i], scan_rows[i], self.vectorize, self.workers)
+         if root is None:
+            root = scan
+            continue
+         left_keys = []
+         right_keys = []
+         residual_conjuncts = []
+         for conjunct in conjuncts_by_position[position]:
+            if is_equi_join(conjunct, column_to_table, column_types):
+               left_index, right_index = conjunct[2][1], conjunct[3][1]
+               if column_to_table[left_index] == i:
+                  left_index, right_index = right_index, left_index
+               left_keys.append(column_positions[left_index])
+               right_keys.append(right_index - table_offsets[i])
+            else:
+               residual_conjuncts.append(compiler.map_columns(conjunct, column_positions))
+         root = JoinNode(root, scan, left_keys, right_keys, residual_conjuncts,
+                         estimate_rows(frozenset(order[:position + 1])), self.workers)
+      return root, column_positions
+
+
+   @staticmethod
+   def search_join_order(table_count, scan_rows, estimate_rows):
+      # dynamic programming over the sets of tables, the best left deep order of every set is
+      # extended with one more table, the cost of an order is the total size of its intermediate
+      # results, ties are broken in favor of the order of the from list
+      best_orders = {frozenset((i,)): (0, [i]) for i in range(table_count)}
+      for size in range(2, table_count + 1):
+         for joined_tables in itertools.combinations(range(table_count), size):
+            joined_tables = frozenset(joined_tables)
+            candidates = []
+            for i in sorted(joined_tables):
+               cost, order = best_orders[joined_tables - {i}]
+               cost += estimate_rows(joined_tables - {i}) + scan_rows[i] + estimate_rows(joined_tables)
+               candidates.append((cost, order + [i]))
+            best_orders[joined_tables] = min(candidates)
+      return best_orders[frozenset(range(table_count))][1]
+
+
+   @staticmethod
+   def greedy_join_order(table_count, scan_rows, estimate_rows):
+      # starts from the smallest table and keeps adding the table giving the smallest result
+      order = [min(range(table_count), key=lambda i: (scan_rows[i], i))]
+      remaining = set(range(table_count)) - set(order)
+      while remaining:
+         joined_tables = frozenset(order)
+         i = min(remaining, key=lambda i: (estimate_rows(joined_tables | {i}), i))
+         order.append(i)
+         remaining.remove(i)
+      return order
+
+
+   def estimate_selectivity(self, table, conjuncts):
+      # fraction of the rows of table satisfying all the conjuncts, their columns are positions inside table
+      selectivity = 1
+      for conjunct in conjuncts:
+         selectivity *= self.estimate_conjunct_selectivity(table, conjunct)
+      return selectivity
+
+
+   def estimate_conjunct_selectivity(self, table, conjunct):
+      # table is None for conjuncts referencing more than one table
+      if conjunct[0] != 'OPERATOR':
+         return self.default_selectivity
+      operator = conjunct[1]
+      if operator == 'and':
+         return self.estimate_conjunct_selectivity(table, conjunct[2]) * self.estimate_conjunct_selectivity(table, conjunct[3])
+      if operator == 'or':
+         left = self.estimate_conjunct_selectivity(table, conjunct[2])
+         right = self.estimate_conjunct_selectivity(table, conjunct[3])
+         return left + right - left * right
+      statistics = table.get_statistics() if table is not None else None
+      comparison = table.get_column_comparison(conjunct) if statistics else None
+      if comparison:
+         column_index, operator, value = comparison
+         return statistics.get_column(column_index).estimate_selectivity(operator, value)
+      return self.default_selectivities.get(operator, self.default_selectivity)
+
+
+   def estimate_join_selectivity(self, tables, conjunct, column_to_table, table_offsets, column_types):
+      if not is_equi_join(conjunct, column_to_table, column_types):
+         return self.estimate_conjunct_selectivity(None, conjunct)
+      # every value of the column with less distinct values is assumed to match one of the other column
+      distinct_values = 1
+      for index in (conjunct[2][1], conjunct[3][1]):
+         i = column_to_table[index]
+         distinct_values = max(distinct_values, self.estimate_distinct_values(tables[i], index - table_offsets[i]))
+      return 1 / distinct_values
+
+
+   def estimate_groups(self, tables, group_keys, input_rows):
+      # every combination of the distinct values of the grouped columns is assumed to be present,
+      # but there can't be more groups than input rows
+      if not group_keys:
+         return 1
+      table_offsets = list(itertools.accumulate((len(table.get_column_names()) for table in tables), initial=0))
+      groups = 1
+      for index in group_keys:
+         i = bisect.bisect_right(table_offsets, index) - 1
+         groups *= max(self.estimate_distinct_values(tables[i], index - table_offsets[i]), 1)
+      return max(min(groups, input_rows), 1)
+
+
+   def estimate_distinct_values(self, table, column_index):
+      # without statistics every value is assumed to be distinct
+      statistics = table.get_statistics()
+      if statistics is None:
+         return len(table)
+      return statistics.get_column(column_index).get_distinct_count()
@@ -0,0 +1,85 @@
+import json
+import struct
+
+from sql_interpreter import database
+
+
+
+# every message exchanged by the server and its clients is a frame made of a 4 bytes big endian
+# length followed by that many bytes of utf-8 json
+# requests:  {"query": "select ...", "parameters": [...]}
+# responses: {"result": ...} or {"error": {"type": "ValueError", "message": "..."}}
+# a client can send many requests before reading the responses (pipelining), the responses always
+# come back in the order of the requests
+
+
+
+header = struct.Struct('>I')
+
+
+# frames larger than this are rejected, the connection can't be trusted anymore
+max_frame_size = 1 << 30
+
+
+# errors raised by the database which are sent back to the client as they are
+error_types = {'NameError': NameError,
+               'ValueError': ValueError,
+               'TypeError': TypeError}
+
+
+
+class ProtocolError(Exception):
+   pass
+
+
+
+def encode_frame(message):
+   payload = json.dumps(message).encode()
+   return header.pack(len(payload)) + payload
+
+
+
+def decode_length(data):
+   (length,) = header.unpack(data)
+   if length > max_frame_size:
+      raise ProtocolError('Frame of {} bytes is too large.'.format(length))
+   return length
+
+
+
+def decode_payload(payload):
+   try:
+      return json.loads(payload)
+   except ValueError as ve:
+      raise ProtocolError('Frame doesn\'t contain valid json.') from ve
+
+
+
+def encode_result(result):
+   # tables are sent as their columns and rows of raw values, everything else as text
+   if isinstance(result, database.Table):
+      return {'column_names': result.get_column_names(),
+              'column_types': result.get_column_types(),
+              'rows': list(result.get_raw_rows())}
+   if result is None:
+      return None
+   return str(result)
+
+
+
+def decode_result(result):
+   if isinstance(result, dict):
+      table = database.Table(result['column_names'], result['column_types'])
+      table.insert_raw_rows(result['rows'])
+      return table
+   return result
+
+
+
+def encode_error(error):
+   return {'type': type(error).__name__, 'message': str(error)}
+
+
+
+def decode_error(error):
+   return error_types.get(error['type'], RuntimeError)(error['message'])
@@ -0,0 +1,69 @@
+import sys
+from collections import OrderedDict
+
+
+
+# keeps the results of the most recently used selects: every result is stored with the versions
+# the tables it read had when it was computed, the database increments the version of a table
+# every time rows are inserted into it or it's dropped, so a result is returned only while all
+# its tables are unchanged, stale results are removed the first time they are looked up
+# the least recently used results are evicted once the memory they use exceeds memory_limit bytes
+class ResultCache:
+   def __init__(self, memory_limit):
+      self.memory_limit = memory_limit
+      self.memory_usage = 0
+      self.hits = 0
+      self.misses = 0
+      # key -> (versions, result, size), ordered from the least recently used
+      self.entries = OrderedDict()
+
+
+   def get(self, key, versions):
+      # returns None if the result isn't stored or its tables changed
+      entry = self.entries.get(key)
+      if entry is None or entry[0] != versions:
+         if entry is not None:
+            self.remove(key)
+         self.misses += 1
+         return None
+      self.entries.move_to_end(key)
+      self.hits += 1
+      return entry[1]
+
+
+   def put(self, key, versions, result, size):
+      if key in self.entries:
+         self.remove(key)
+      # a result which doesn't fit would evict everything else
+      if size > self.memory_limit:
+         return
+      self.entries[key] = (versions, result, size)
+      self.memory_usage += size
+      while self.memory_usage > self.memory_limit:
+         _, (_, _, evicted_size) = self.entries.popitem(last=False)
+         self.memory_usage -= evicted_size
+
+
+   def remove(self, key):
+      _, _, size = self.entries.pop(key)
+      self.memory_usage -= size
+
+
+   def __len__(self):
+      return len(self.entries)
+
+
+
+def get_query_key(*parts):
+   # the parts of a parsed select, with the lists turned into tuples so that they can be hashed
+   return tuple(get_query_key(*part) if isinstance(part, (list, tuple)) else part for part in parts)
+
+
+
+def get_result_size(table):
+   # the memory used by the columns of a result, with the strings of their pools
+   size = table.get_memory_usage()
+   for column in table.columns:
+      if hasattr(column, 'pool'):
+         size += sum(map(sys.getsizeof, column.pool.strings))
+   return size
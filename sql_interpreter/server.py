@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+
+# the server can be run as a script, the package has to be importable for its modules to see each other
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sql_interpreter import database
+from sql_interpreter import protocol
+from sql_interpreter import session
+
+
+
+# serves a single database to many clients over tcp or a unix socket, see protocol.py for the format
+# of the messages
+# statements run inside the event loop, so the database is never accessed concurrently, the plans of
+# the statements are shared by all the connections
+# selects read versions of their tables and give the loop back every chunk_size rows they produce, the
+# statements of the other connections run in between without waiting for the selects to finish and
+# the rows they insert aren't seen by the selects already running
+class Server:
+   chunk_size = 4096
+
+
+   def __init__(self, database_):
+      self.database = database_
+      self.session = session.Session(database_)
+
+
+   async def start(self, host='127.0.0.1', port=0, path=None):
+      # returns the asyncio server, port 0 picks a free port
+      if path:
+         return await asyncio.start_unix_server(self.handle_connection, path)
+      return await asyncio.start_server(self.handle_connection, host, port)
+
+
+   async def handle_connection(self, reader, writer):
+      try:
+         while True:
+            try:
+               length = protocol.decode_length(await reader.readexactly(protocol.header.size))
+               request = protocol.decode_payload(await reader.readexactly(length))
+            except asyncio.IncompleteReadError:
+               # the client closed the connection
+               break
+            writer.write(protocol.encode_frame(await self.execute(request)))
+            # drain only waits when the client doesn't read the responses fast enough
+            await writer.drain()
+      except (protocol.ProtocolError, ConnectionError):
+         pass
+      finally:
+         writer.close()
+
+
+   async def execute(self, request):
+      try:
+         if not isinstance(request, dict) or not isinstance(request.get('query'), str):
+            raise ValueError('Requests must contain a query.')
+         parameters = tuple(request.get('parameters', ()))
+         plan = self.session.get_bound_plan(request['query'], parameters)
+         if isinstance(plan, session.SelectPlan):
+            result = await self.run_select(plan, parameters)
+         else:
+            result = plan.execute(self.database, parameters)
+         return {'result': protocol.encode_result(result)}
+      except Exception as e:
+         # a failing statement must not close the connection of the client
+         return {'error': protocol.encode_error(e)}
+
+
+   async def run_select(self, plan, parameters):
+      # the versions of the tables are taken together with the pipeline, so they match the rows it reads
+      result_cache = self.database.result_cache
+      if result_cache is not None:
+         key = plan.get_key(parameters)
+         versions = self.database.get_table_versions(list(plan.tables_scope))
+         table = result_cache.get(key, versions)
+         if table is not None:
+            return table
+      pipeline = plan.build_versioned(self.database, parameters)
+      table = database.Table(pipeline.get_column_names(), pipeline.get_column_types())
+      rows = iter(pipeline)
+      while True:
+         chunk = list(itertools.islice(rows, self.chunk_size))
+         table.insert_raw_rows(chunk)
+         if len(chunk) < self.chunk_size:
+            break
+         await asyncio.sleep(0)
+      if result_cache is not None:
+         self.database.cache_result(key, versions, table)
+      return table
+
+
+
+async def serve(database_, host='127.0.0.1', port=5433, path=None):
+   server = await Server(database_).start(host, port, path)
+   async with server:
+      await server.serve_forever()
+
+
+
+if __name__ == '__main__':
+   argument_parser = argparse.ArgumentParser(description='Serves an in memory database.')
+   argument_parser.add_argument('--host', default='127.0.0.1')
+   argument_parser.add_argument('--port', type=int, default=5433)
+   argument_parser.add_argument('--unix', help='path of a unix socket, used instead of tcp')
+   argument_parser.add_argument('--wal', help='file name of the write ahead log')
+   argument_parser.add_argument('--result-cache', type=int, default=64 << 20,
+                                help='bytes used by the cache of the select results, 0 disables it')
+   arguments = argument_parser.parse_args()
+
+   database_ = database.Database(wal_file_name=arguments.wal, result_cache_memory=arguments.result_cache)
+   try:
+      asyncio.run(serve(database_, arguments.host, arguments.port, arguments.unix))
+   except KeyboardInterrupt:
+      pass
+   finally:
+      database_.close()
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+
+from sql_interpreter import cursor
+from sql_interpreter import database as database_module
+from sql_interpreter import lexer
+from sql_interpreter import parser
+from sql_interpreter import result_cache
+
+
+
+# a plan is everything which can be computed from the text of a statement and the schema of the
+# database: the parsed command, the tables it reads and the literals already converted into values,
+# executing it only needs the values of the ? parameters
+class CommandPlan:
+   parameter_count = 0
+
+
+   def __init__(self, command, args):
+      self.command = command
+      self.args = args
+
+
+   def execute(self, database, parameters):
+      return database.transact(self.command, *self.args)
+
+
+
+class SelectPlan:
+   def __init__(self, database, columns_list, tables_list, condition, order_by=(), limit=None, group_by=()):
+      self.tables_scope, self.condition, self.projection, self.order, self.aggregation = database.resolve_query(
+         columns_list, tables_list, condition, order_by, group_by)
+      self.limit = limit
+      self.parameter_count = database_module.count_parameters(self.condition)
+      self.key = result_cache.get_query_key(columns_list, tables_list, condition, order_by, limit, group_by)
+
+
+   def execute(self, database, parameters):
+      # the results of the same statement with the same parameters can be cached
+      return database.get_cached_result(self.get_key(parameters), list(self.tables_scope), lambda: database.run_select(
+         self.tables_scope, self.bind(parameters), self.projection, self.order, self.limit, self.aggregation))
+
+
+   def get_key(self, parameters):
+      # 1, 1.0 and True are equal but don't give the same result (or error), so the types are part of the key
+      return self.key + (tuple((type(parameter), parameter) for parameter in parameters),)
+
+
+   def open_cursor(self, database, parameters):
+      return cursor.Cursor(self.build_versioned(database, parameters))
+
+
+   def build_versioned(self, database, parameters):
+      # returns the pipeline reading the rows the tables contain now, the rows inserted while it's
+      # consumed aren't returned
+      tables_scope = {table_name: table.get_version() for table_name, table in self.tables_scope.items()}
+      return database.build_select(tables_scope, self.bind(parameters), self.projection, self.order, self.limit, self.aggregation)
+
+
+   def bind(self, parameters):
+      return database_module.bind_parameters(self.condition, parameters) if parameters else self.condition
+
+
+
+class InsertPlan:
+   def __init__(self, database, table_name, rows):
+      self.table_name = table_name
+      self.rows, self.parameter_count = database.resolve_insert(table_name, rows)
+
+
+   def execute(self, database, parameters):
+      rows = self.rows
+      if parameters:
+         rows = [[parameters[value[1]] if type(value) is tuple else value for value in row] for row in rows]
+      return database.transact('insert_values', self.table_name, rows)
+
+
+
+class PreparedStatement:
+   def __init__(self, session, query):
+      self.session = session
+      self.query = query
+
+
+   def execute(self, *parameters):
+      return self.session.execute(self.query, parameters)
+
+
+
+# runs textual statements against a database, the plans of the most recently used statements are
+# kept so that repeating a statement, even with different parameters, skips lexing, parsing and
+# name resolution
+class Session:
+   def __init__(self, database, cache_size=256):
+      self.database = database
+      self.cache_size = cache_size
+      self.lexer = lexer.SQLLexer()
+      self.parser = parser.SQLParser()
+      # query -> [parsed command, schema version, plan], ordered from the least recently used
+      self.plans = OrderedDict()
+
+
+   def prepare(self, query):
+      # parses the statement right away to report syntax errors
+      self.get_plan(query)
+      return PreparedStatement(self, query)
+
+
+   def execute(self, query, parameters=(), cursor=False):
+      # with cursor set the rows of selects are returned by a cursor.Cursor as they are fetched
+      plan = self.get_bound_plan(query, parameters)
+      if cursor and isinstance(plan, SelectPlan):
+         return plan.open_cursor(self.database, parameters)
+      return plan.execute(self.database, parameters)
+
+
+   def get_bound_plan(self, query, parameters):
+      # returns the plan of the statement after checking that it needs exactly the given parameters
+      plan = self.get_plan(query)
+      if len(parameters) != plan.parameter_count:
+         raise ValueError('The statement has {} parameters, {} values were given.'.format(plan.parameter_count, len(parameters)))
+      return plan
+
+
+   def get_plan(self, query):
+      entry = self.plans.get(query)
+      if entry is None:
+         parsed = self.parser.parse(self.lexer.tokenize(query))
+         entry = [parsed, None, None]
+         self.plans[query] = entry
+         if len(self.plans) > self.cache_size:
+            self.plans.popitem(last=False)
+      else:
+         self.plans.move_to_end(query)
+
+      # the plan is resolved again after tables are created or dropped
+      if entry[1] != self.database.schema_version:
+         entry[2] = self.create_plan(*entry[0])
+         entry[1] = self.database.schema_version
+      return entry[2]
+
+
+   def create_plan(self, command, *args):
+      if command == 'select':
+         return SelectPlan(self.database, *args)
+      if command == 'insert_into':
+         table_name, values_list = args
+         return InsertPlan(self.database, table_name, [values_list])
+      if command == 'insert_many':
+         return InsertPlan(self.database, *args)
+      return CommandPlan(command, args)
@@ -0,0 +1,134 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from sql_interpreter import storage
+
+
+
+# a snapshot file contains:
+# - the magic bytes
+# - the length of the header, as a little endian unsigned 64 bit integer
+# - the header, a json document describing the schema of every table and where its columns are
+# - the buffers of the columns, every one of them aligned to 8 bytes
+# string columns store the array of their ids plus their pool, as an array of offsets followed by
+# the utf-8 encoded strings
+MAGIC = b'SQLSNAP1'
+HEADER_LENGTH = struct.Struct('<Q')
+ALIGNMENT = 8
+
+
+
+def is_snapshot(file_name):
+   try:
+      with open(file_name, 'rb') as snapshot_file:
+         return snapshot_file.read(len(MAGIC)) == MAGIC
+   except OSError:
+      return False
+
+
+
+def write_snapshot(file_name, tables, metadata=None):
+   # tables maps every table name to its Table, the file is replaced only once it's complete,
+   # metadata is stored as it is inside the header
+   buffers = []
+   offset = 0
+   def add_buffer(data):
+      nonlocal offset
+      position = offset
+      buffers.append(data)
+      offset += len(data)
+      padding = -offset % ALIGNMENT
+      if padding:
+         buffers.append(bytes(padding))
+         offset += padding
+      return {'offset': position, 'length': len(data)}
+
+   tables_header = []
+   for table_name, table in tables.items():
+      columns_header = []
+      for column in table.columns:
+         column_header = add_buffer(column.to_bytes())
+         column_header['itemsize'] = array(column.typecode).itemsize
+         if isinstance(column, storage.StringColumn):
+            # the whole pool is stored so that the ids don't need to be translated
+            encoded_strings = [string.encode('utf-8') for string in column.pool.strings]
+            string_offsets = array('q', [0])
+            for encoded_string in encoded_strings:
+               string_offsets.append(string_offsets[-1] + len(encoded_string))
+            column_header['pool_offsets'] = add_buffer(string_offsets.tobytes())
+            column_header['pool_strings'] = add_buffer(b''.join(encoded_strings))
+         columns_header.append(column_header)
+      tables_header.append({'name': table_name,
+                            'column_names': table.get_column_names(),
+                            'column_types': table.get_column_types(),
+                            'row_count': len(table),
+                            'columns': columns_header,
+                            'indexes': [(index.name, index.column_index, index.index_type) for index in table.indexes]})
+
+   header = {'byteorder': sys.byteorder, 'tables': tables_header, 'metadata': metadata}
+   header = json.dumps(header).encode('utf-8')
+   data_start = len(MAGIC) + HEADER_LENGTH.size + len(header)
+   data_start += -data_start % ALIGNMENT
+
+   temporary_file_name = file_name + '.tmp'
+   with open(temporary_file_name, 'wb') as snapshot_file:
+      snapshot_file.write(MAGIC)
+      snapshot_file.write(HEADER_LENGTH.pack(len(header)))
+      snapshot_file.write(header)
+      snapshot_file.write(bytes(data_start - snapshot_file.tell()))
+      for data in buffers:
+         snapshot_file.write(data)
+      snapshot_file.flush()
+      os.fsync(snapshot_file.fileno())
+   os.replace(temporary_file_name, file_name)
+
+
+
+def read_snapshot(file_name):
+   # returns the metadata and a list of (table_name, column_names, column_types, columns, indexes),
+   # indexes contains (index_name, column_index, index_type) tuples
+   # the columns of numbers and the ids of the strings are views over the memory mapped file, so
+   # their pages are read only when they are accessed
+   with open(file_name, 'rb') as snapshot_file:
+      if snapshot_file.read(len(MAGIC)) != MAGIC:
+         raise ValueError('File {} is not a snapshot.'.format(file_name))
+      (header_length,) = HEADER_LENGTH.unpack(snapshot_file.read(HEADER_LENGTH.size))
+      header = json.loads(snapshot_file.read(header_length).decode('utf-8'))
+      data_start = len(MAGIC) + HEADER_LENGTH.size + header_length
+      data_start += -data_start % ALIGNMENT
+      mapped_file = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+   if header['byteorder'] != sys.byteorder:
+      raise ValueError('Snapshot {} was written on a machine with a different byte order.'.format(file_name))
+
+   data = memoryview(mapped_file)
+   def get_buffer(buffer_header):
+      start = data_start + buffer_header['offset']
+      return data[start:start + buffer_header['length']]
+
+   tables = []
+   for table_header in header['tables']:
+      columns = []
+      for column_type, column_header in zip(table_header['column_types'], table_header['columns']):
+         column_class = storage.column_classes[column_type]
+         if array(column_class.typecode).itemsize != column_header['itemsize']:
+            raise ValueError('Snapshot {} was written on a machine with different integer sizes.'.format(file_name))
+         if column_class is storage.StringColumn:
+            string_offsets = array('q')
+            string_offsets.frombytes(get_buffer(column_header['pool_offsets']))
+            encoded_strings = get_buffer(column_header['pool_strings'])
+            strings = (str(encoded_strings[start:end], 'utf-8') for start, end in zip(string_offsets, string_offsets[1:]))
+            pool = storage.StringPool(strings)
+            column = column_class.create_from_buffer(get_buffer(column_header), pool=pool)
+         else:
+            column = column_class.create_from_buffer(get_buffer(column_header))
+         if len(column) != table_header['row_count']:
+            raise ValueError('Snapshot {} is corrupted.'.format(file_name))
+         columns.append(column)
+      indexes = [tuple(index) for index in table_header['indexes']]
+      tables.append((table_header['name'], table_header['column_names'], table_header['column_types'], columns, indexes))
+   return tables, header['metadata']
@@ -0,0 +1,124 @@
+import heapq
+import itertools
+import operator
+import pickle
+import sys
+import tempfile
+
+
+
+# rows are sorted on normalized keys: the raw values of the key columns, with the descending ones
+# transformed so that their natural order is reversed, so sorts mixing directions still compare
+# plain python values (numbers are negated, strings are turned into bytes with every byte
+# inverted, followed by a byte greater than all of them so that longer strings come first)
+# sorts whose rows don't fit inside memory_budget bytes are split into sorted runs stored inside
+# temporary files, which are then merged
+
+
+
+# memory used by the rows of a sort before they are moved to disk
+default_memory_budget = 256 << 20
+
+
+# utf-8 never contains bytes greater than 0xf4, 0xfe - byte keeps the inverted bytes below 0xff
+inverted_bytes = bytes(0xfe - byte if byte <= 0xfe else 0 for byte in range(256))
+
+
+
+def invert_string(value):
+   return value.encode('utf-8', 'surrogatepass').translate(inverted_bytes) + b'\xff'
+
+
+
+def get_sort_key(keys, column_types):
+   # keys are (column_index, descending) pairs, returns the function computing the normalized key of a row
+   if not any(descending for _, descending in keys):
+      return operator.itemgetter(*(column_index for column_index, _ in keys))
+   normalizers = []
+   for column_index, descending in keys:
+      if not descending:
+         normalizers.append(operator.itemgetter(column_index))
+      elif column_types[column_index] == 'string':
+         normalizers.append(lambda row, column_index=column_index: invert_string(row[column_index]))
+      else:
+         normalizers.append(lambda row, column_index=column_index: -row[column_index])
+   if len(normalizers) == 1:
+      return normalizers[0]
+   return lambda row: tuple(normalizer(row) for normalizer in normalizers)
+
+
+
+def get_row_size(row):
+   # an estimate of the memory used by a row and its values
+   return sys.getsizeof(row) + sum(map(sys.getsizeof, row))
+
+
+
+class ExternalSorter:
+   # number of rows pickled together inside the run files
+   batch_size = 1024
+
+
+   # maximum number of runs merged at once, more runs are merged in several passes
+   merge_fan_in = 64
+
+
+   def __init__(self, key, memory_budget):
+      self.key = key
+      self.memory_budget = memory_budget
+      self.runs = []
+
+
+   def sort(self, rows):
+      # returns the sorted rows, rows with the same key keep their order
+      buffer = []
+      buffer_size = 0
+      for row in rows:
+         buffer.append(row)
+         buffer_size += get_row_size(row)
+         if buffer_size > self.memory_budget:
+            buffer.sort(key=self.key)
+            self.runs.append(self.write_run(buffer))
+            buffer = []
+            buffer_size = 0
+      buffer.sort(key=self.key)
+      if not self.runs:
+         return iter(buffer)
+      if buffer:
+         self.runs.append(self.write_run(buffer))
+      while len(self.runs) > self.merge_fan_in:
+         runs, self.runs = self.runs[:self.merge_fan_in], self.runs[self.merge_fan_in:]
+         # the merged run is put first, as its rows came before the ones of the remaining runs
+         self.runs.insert(0, self.write_run(self.merge(runs)))
+      return self.merge(self.runs)
+
+
+   def merge(self, runs):
+      # heapq.merge takes equal rows from the earlier runs first, so the sort stays stable
+      try:
+         yield from heapq.merge(*(self.read_run(run) for run in runs), key=self.key)
+      finally:
+         for run in runs:
+            run.close()
+
+
+   def write_run(self, rows):
+      run = tempfile.TemporaryFile()
+      rows = iter(rows)
+      while True:
+         batch = list(itertools.islice(rows, self.batch_size))
+         if not batch:
+            break
+         pickle.dump(batch, run, pickle.HIGHEST_PROTOCOL)
+      run.seek(0)
+      return run
+
+
+   @staticmethod
+   def read_run(run):
+      while True:
+         try:
+            batch = pickle.load(run)
+         except EOFError:
+            return
+         yield from batch
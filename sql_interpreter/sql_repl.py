@@ -1,22 +1,58 @@
-import lexer
-import parser
-import database
+import argparse
+import os
+import sys
+
+# the interpreter is run as a script, the package has to be importable for its modules to see each other
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sql_interpreter import cursor
+from sql_interpreter import database
+from sql_interpreter import session
+
+
+# number of rows printed before asking whether to continue
+page_size = 50
+
+
+def print_rows(rows_cursor):
+   # the rows are computed one page at a time, the first ones are printed right away
+   print(rows_cursor.get_header_string())
+   while True:
+      rows = rows_cursor.fetchmany(page_size)
+      for row in rows:
+         print(rows_cursor.format_row(row))
+      if len(rows) < page_size:
+         break
+      if input('Press enter to show more rows, write q to stop.\n') == 'q':
+         rows_cursor.close()
+         break
 
 
 if __name__ == '__main__':
-   lexer_ = lexer.SQLLexer()
-   parser_ = parser.SQLParser()
-   database_ = database.Database()
+   # an optional argument is the name of the write ahead log, making the database durable
+   argument_parser = argparse.ArgumentParser(description='Runs the statements written on the command line.')
+   argument_parser.add_argument('wal', nargs='?', help='file name of the write ahead log')
+   argument_parser.add_argument('--result-cache', type=int, default=0,
+                                help='bytes used by the cache of the select results, disabled by default')
+   arguments = argument_parser.parse_args()
+   database_ = database.Database(wal_file_name=arguments.wal, result_cache_memory=arguments.result_cache)
+   session_ = session.Session(database_)
 
    while True:
       query = input('Waiting for a new query, write exit to stop.\n')
       if query == 'exit':
+         database_.close()
          break
 
-      tokens = lexer_.tokenize(query)
       try:
-         result = database_.transact(*parser_.parse(tokens))
-         if result:
+         # without the cache the first page is printed before the whole result is computed, cached
+         # results are whole tables, they are paged through a cursor as well
+         result = session_.execute(query, cursor=database_.result_cache is None)
+         if isinstance(result, database.Table):
+            result = cursor.Cursor.create_from_table(result)
+         if isinstance(result, cursor.Cursor):
+            print_rows(result)
+         elif result is not None:
             print(result)
       except (NameError, ValueError, TypeError) as e:
          print(e)
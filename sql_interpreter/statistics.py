@@ -0,0 +1,122 @@
+import bisect
+
+
+
+# statistics about the values of a column, collected by the analyze command and used by the planner
+# to estimate how many rows satisfy column-operator-literal conditions
+# the histogram is equi-depth: its bounds split the sorted values into buckets containing the same
+# number of values, so skewed distributions get more buckets where the values are denser
+# the rows appended after analyze move min and max, once they are more than interpolation_fraction
+# of the analyzed ones the histogram no longer describes the column: the values are assumed to be
+# uniformly distributed between min and max, and the appended rows to bring new distinct values at
+# the rate of the analyzed ones
+class ColumnStatistics:
+   interpolation_fraction = 0.05
+
+
+   def __init__(self, values, bucket_count):
+      values = sorted(values)
+      self.row_count = len(values)
+      self.appended_count = 0
+      self.min = values[0] if values else None
+      self.max = values[-1] if values else None
+      self.distinct_count = len(set(values))
+      self.bounds = []
+      if values:
+         bucket_count = min(bucket_count, len(values))
+         self.bounds = [values[(len(values) - 1) * i // bucket_count] for i in range(bucket_count + 1)]
+
+
+   def update(self, values):
+      # called with the values of the rows appended after analyze
+      values = list(values)
+      if not values:
+         return
+      self.appended_count += len(values)
+      self.min = min(values) if self.min is None else min(self.min, min(values))
+      self.max = max(values) if self.max is None else max(self.max, max(values))
+
+
+   def is_interpolated(self):
+      return self.appended_count > self.interpolation_fraction * self.row_count
+
+
+   def get_distinct_count(self):
+      if not self.is_interpolated():
+         return self.distinct_count
+      return max(round(self.distinct_count * (self.row_count + self.appended_count) / max(self.row_count, 1)), 1)
+
+
+   def estimate_selectivity(self, operator, value):
+      if self.min is None:
+         return 0
+      equal = 1 / self.get_distinct_count() if self.min <= value <= self.max else 0
+      if operator == '=':
+         return equal
+      if operator == '<>':
+         return 1 - equal
+      less = self.estimate_less_fraction(value)
+      if operator == '<':
+         selectivity = less
+      elif operator == '<=':
+         selectivity = less + equal
+      elif operator == '>':
+         selectivity = 1 - less - equal
+      else:
+         selectivity = 1 - less
+      return min(max(selectivity, 0), 1)
+
+
+   def estimate_less_fraction(self, value):
+      # fraction of the values lower than value, they are assumed to be uniformly distributed inside
+      # every bucket
+      bounds = self.bounds if not self.is_interpolated() else [self.min, self.max]
+      if value <= bounds[0]:
+         return 0
+      if value > bounds[-1]:
+         return 1
+      bucket = bisect.bisect_left(bounds, value) - 1
+      low, high = bounds[bucket], bounds[bucket + 1]
+      if type(value) is not str and high > low:
+         position = (value - low) / (high - low)
+      else:
+         position = 0.5
+      return (bucket + position) / (len(bounds) - 1)
+
+
+
+class TableStatistics:
+   # number of buckets of the histograms
+   bucket_count = 32
+
+
+   # statistics are stale, and ignored by the planner, once the rows changed since analyze are more
+   # than this fraction of the analyzed ones
+   stale_fraction = 0.2
+
+
+   def __init__(self, table):
+      self.row_count = len(table)
+      self.modified_rows = 0
+      self.columns = tuple(ColumnStatistics(column.get_raw_values(), self.bucket_count) for column in table.columns)
+
+
+   def is_stale(self):
+      return self.modified_rows > self.stale_fraction * max(self.row_count, 1)
+
+
+   def update(self, table, first_row_index):
+      # called after rows from first_row_index on have been appended to table
+      appended_rows = len(table) - first_row_index
+      self.modified_rows += appended_rows
+      if not self.is_stale():
+         for column, column_statistics in zip(table.columns, self.columns):
+            column_statistics.update(column.get_raw(i) for i in range(first_row_index, len(table)))
+
+
+   def invalidate(self):
+      self.modified_rows = float('inf')
+
+
+   def get_column(self, column_index):
+      return self.columns[column_index]
@@ -0,0 +1,180 @@
+from array import array
+
+
+
+# every column keeps its values in a single typed buffer instead of one python object per cell,
+# the buffers only ever contain raw python values (int, float, str), wrapping them into the
+# Type classes of the database module is left to the Table
+# the buffer of a column can also be a read only memoryview (for example over a memory mapped
+# snapshot), it's copied inside an array only when the column is modified for the first time
+class Column:
+   typecode = None
+
+
+   def __init__(self, values=()):
+      self.data = array(self.typecode)
+      self.extend(values)
+
+
+   @classmethod
+   def create_from_buffer(cls, buffer, **kwargs):
+      column = cls(**kwargs)
+      column.data = memoryview(buffer).cast('B').cast(cls.typecode)
+      return column
+
+
+   def __len__(self):
+      return len(self.data)
+
+
+   def make_writable(self):
+      if type(self.data) is not array:
+         data = array(self.typecode)
+         data.frombytes(self.data.cast('B'))
+         self.data = data
+
+
+   def to_bytes(self):
+      return self.data.tobytes()
+
+
+   def append(self, value):
+      self.make_writable()
+      try:
+         self.data.append(value)
+      except OverflowError as oe:
+         raise ValueError('Value {} doesn\'t fit inside a column of type {}.'.format(value, self.type_name)) from oe
+
+
+   def extend(self, values):
+      self.make_writable()
+      try:
+         self.data.extend(values)
+      except OverflowError as oe:
+         raise ValueError('A value doesn\'t fit inside a column of type {}.'.format(self.type_name)) from oe
+
+
+   def truncate(self, length):
+      self.make_writable()
+      del self.data[length:]
+
+
+   def get_raw(self, index):
+      return self.data[index]
+
+
+   def get_raw_values(self):
+      return self.data
+
+
+   def get_raw_slice(self, start, end):
+      return self.data[start:end]
+
+
+   def take(self, indexes):
+      # returns a new column containing only the values in the specified positions
+      column = type(self)()
+      data = self.data
+      column.data = array(self.typecode, (data[i] for i in indexes))
+      return column
+
+
+   def copy(self):
+      column = type(self)()
+      column.data.frombytes(memoryview(self.data).cast('B'))
+      return column
+
+
+   def get_memory_usage(self):
+      return self.data.nbytes if type(self.data) is memoryview else self.data.buffer_info()[1] * self.data.itemsize
+
+
+
+class IntColumn(Column):
+   type_name = 'int'
+   typecode = 'q'
+
+
+
+class FloatColumn(Column):
+   type_name = 'float'
+   typecode = 'd'
+
+
+
+class StringPool:
+   def __init__(self, strings=()):
+      self.strings = list(strings)
+      self.ids = {string: string_id for string_id, string in enumerate(self.strings)}
+
+
+   def __len__(self):
+      return len(self.strings)
+
+
+   def __getitem__(self, string_id):
+      return self.strings[string_id]
+
+
+   def intern(self, string):
+      string_id = self.ids.get(string)
+      if string_id is None:
+         string_id = len(self.strings)
+         self.ids[string] = string_id
+         self.strings.append(string)
+      return string_id
+
+
+
+# a string column stores an array of ids pointing inside a pool of distinct strings, repeated
+# values therefore cost only the size of the id
+class StringColumn(Column):
+   type_name = 'string'
+   typecode = 'I'
+
+
+   def __init__(self, values=(), pool=None):
+      self.pool = StringPool() if pool is None else pool
+      super().__init__(values)
+
+
+   def append(self, value):
+      self.make_writable()
+      self.data.append(self.pool.intern(value))
+
+
+   def extend(self, values):
+      self.make_writable()
+      self.data.extend(map(self.pool.intern, values))
+
+
+   def get_raw(self, index):
+      return self.pool[self.data[index]]
+
+
+   def get_raw_values(self):
+      return map(self.pool.strings.__getitem__, self.data)
+
+
+   def get_raw_slice(self, start, end):
+      return list(map(self.pool.strings.__getitem__, self.data[start:end]))
+
+
+   def take(self, indexes):
+      # the new column shares the pool, pools are append only so this is safe
+      column = StringColumn(pool=self.pool)
+      data = self.data
+      column.data = array(self.typecode, (data[i] for i in indexes))
+      return column
+
+
+   def copy(self):
+      column = StringColumn(pool=self.pool)
+      column.data.frombytes(memoryview(self.data).cast('B'))
+      return column
+
+
+
+column_classes = {'int': IntColumn,
+                  'float': FloatColumn,
+                  'string': StringColumn}
@@ -0,0 +1,108 @@
+try:
+   import numpy
+except ImportError:
+   numpy = None
+
+
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+
+def is_available():
+   return numpy is not None
+
+
+
+# evaluates conditions on numeric columns as numpy operations over whole columns, producing a boolean
+# mask instead of calling a predicate for every row
+# every numeric subexpression is a pair (values, nan_mask): NaN values produced by the Type classes
+# can't be stored inside int64 arrays, so they are tracked separately and the values in those
+# positions are meaningless
+# int arithmetic is done on int64 values, so unlike python ints it wraps around on overflow
+class VectorizedEvaluator:
+   dtypes = {'int': 'int64', 'float': 'float64'}
+   comparison_functions = {'<': 'less', '<=': 'less_equal', '=': 'equal', '<>': 'not_equal',
+                           '>': 'greater', '>=': 'greater_equal'}
+   arithmetic_functions = {'+': 'add', '-': 'subtract', '*': 'multiply'}
+
+
+   def __init__(self, columns, column_types, row_count):
+      self.columns = columns
+      self.column_types = column_types
+      self.row_count = row_count
+      self.arrays = {}
+
+
+   def supports(self, tree):
+      # only conditions made of int and float values can be vectorized
+      if not is_available():
+         return False
+      if tree[0] == 'COLUMN_NAME':
+         return self.column_types[tree[1]] in self.dtypes
+      if tree[0] == 'LITERAL':
+         value = tree[1].get_value()
+         if type(value) is int:
+            return INT64_MIN <= value <= INT64_MAX
+         return type(value) is float
+      return self.supports(tree[2]) and self.supports(tree[3])
+
+
+   def evaluate(self, tree):
+      # the tree has already been type checked by the ConditionCompiler
+      mask = self.translate(tree)
+      if numpy.ndim(mask) == 0:
+         mask = numpy.full(self.row_count, bool(mask))
+      return mask
+
+
+   def get_array(self, column_index):
+      if column_index not in self.arrays:
+         data = self.columns[column_index].get_raw_values()
+         dtype = self.dtypes[self.column_types[column_index]]
+         self.arrays[column_index] = numpy.frombuffer(data, dtype=dtype, count=self.row_count)
+      return self.arrays[column_index]
+
+
+   def translate(self, node):
+      # returns a boolean array for bool expressions and a (values, nan_mask) pair for numbers
+      if node[0] == 'COLUMN_NAME':
+         return self.get_array(node[1]), False
+      if node[0] == 'LITERAL':
+         return node[1].get_value(), False
+
+      operator, left, right = node[1:]
+      if operator == 'and':
+         return numpy.logical_and(self.translate(left), self.translate(right))
+      if operator == 'or':
+         return numpy.logical_or(self.translate(left), self.translate(right))
+
+      left_values, left_nan = self.translate(left)
+      right_values, right_nan = self.translate(right)
+      nan_mask = numpy.logical_or(left_nan, right_nan)
+      if operator in self.comparison_functions:
+         result = getattr(numpy, self.comparison_functions[operator])(left_values, right_values)
+         # comparisons involving NaN are always false
+         return numpy.logical_and(result, numpy.logical_not(nan_mask))
+      if operator in self.arithmetic_functions:
+         return getattr(numpy, self.arithmetic_functions[operator])(left_values, right_values), nan_mask
+
+      # division by zero gives NaN
+      is_zero = numpy.equal(right_values, 0)
+      nan_mask = numpy.logical_or(nan_mask, is_zero)
+      divisor = numpy.where(is_zero, 1, right_values)
+      quotient = numpy.true_divide(left_values, divisor)
+      if self.get_type(left) == 'float':
+         return quotient, nan_mask
+      # int division truncates towards zero, as int(value1 / value2) does
+      return numpy.trunc(quotient).astype('int64'), nan_mask
+
+
+   def get_type(self, node):
+      # arithmetic operators always keep the type of their left operand
+      while node[0] == 'OPERATOR':
+         node = node[2]
+      if node[0] == 'COLUMN_NAME':
+         return self.column_types[node[1]]
+      return 'int' if type(node[1].get_value()) is int else 'float'
@@ -0,0 +1,50 @@
+from sql_interpreter import database
+
+
+
+# a materialized view is a table holding the result of a select, kept current while rows are inserted
+# into the tables it reads: tables only grow, so the rows added to the view by an insert are the
+# ones produced by the select when the inserted table is replaced by the new rows alone, while the
+# other tables are read as they are (the new rows are filtered, and joined with the rest of the
+# other tables, without reading the old rows of the inserted table again)
+# the view remembers how many rows of every table it has already read, views reading views are
+# updated in turn
+class MaterializedView:
+   def __init__(self, columns_list, tables_list, condition, lengths):
+      # lengths maps the name of every table read by the view to the number of its rows already read
+      self.columns_list = list(columns_list)
+      self.tables_list = list(tables_list)
+      self.condition = list(condition)
+      self.lengths = dict(lengths)
+
+
+   def resolve(self, database_):
+      # the tables of a view can't be dropped, so the resolved select stays valid
+      tables_scope, self.resolved_condition, self.projection = database_.resolve_select(
+         self.columns_list, self.tables_list, self.condition)
+      self.table_names = list(tables_scope)
+
+
+   def reads(self, table_name):
+      return table_name in self.lengths
+
+
+   def get_delta(self, database_, table_name):
+      # returns the rows to append to the view for the rows inserted into table_name since the last update
+      table = database_.tables[table_name]
+      new_length = len(table)
+      if new_length <= self.lengths[table_name]:
+         return iter(())
+      tables_scope = {}
+      for name in self.table_names:
+         if name == table_name:
+            tables_scope[name] = table.take_rows(range(self.lengths[name], new_length))
+         else:
+            tables_scope[name] = database.TableVersion(database_.tables[name], self.lengths[name])
+      self.lengths[table_name] = new_length
+      return database_.build_select(tables_scope, self.resolved_condition, self.projection)
+
+
+   def get_definition(self):
+      # stored inside the checkpoints of the write ahead log
+      return [self.columns_list, self.tables_list, self.condition, self.lengths]
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+
+
+# every record is a json document on its own line: {"lsn": ..., "command": ..., "args": [...]}
+# records are written to the file as soon as they arrive, but the expensive fsync is done at most
+# once every fsync_interval seconds (group commit), either by the next append or by a background
+# thread, so a crash loses at most the last fsync_interval seconds of mutations
+class WriteAheadLog:
+   def __init__(self, file_name, fsync_interval=1.0, next_lsn=1):
+      self.file_name = file_name
+      self.fsync_interval = fsync_interval
+      self.next_lsn = next_lsn
+      self.file = open(file_name, 'a', encoding='utf-8')
+      self.lock = threading.Lock()
+      self.last_sync = time.monotonic()
+      self.dirty = False
+      self.closed = threading.Event()
+      self.flusher = None
+      if fsync_interval > 0:
+         self.flusher = threading.Thread(target=self.run_flusher, daemon=True)
+         self.flusher.start()
+
+
+   @staticmethod
+   def recover(file_name):
+      # returns the (lsn, command, args) records inside the log, a crash can leave the last record
+      # half written, it's ignored and removed from the file since it was never synced
+      records = []
+      if not os.path.exists(file_name):
+         return records
+      valid_length = 0
+      with open(file_name, 'rb') as log_file:
+         for line in log_file:
+            try:
+               if not line.endswith(b'\n'):
+                  raise ValueError('Incomplete record.')
+               record = json.loads(line)
+            except ValueError:
+               break
+            records.append((record['lsn'], record['command'], record['args']))
+            valid_length += len(line)
+      if valid_length != os.path.getsize(file_name):
+         with open(file_name, 'r+b') as log_file:
+            log_file.truncate(valid_length)
+      return records
+
+
+   def append(self, command, args):
+      with self.lock:
+         lsn = self.next_lsn
+         self.next_lsn += 1
+         self.file.write(json.dumps({'lsn': lsn, 'command': command, 'args': args}) + '\n')
+         self.dirty = True
+         if time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync_locked()
+      return lsn
+
+
+   def sync(self):
+      with self.lock:
+         self.sync_locked()
+
+
+   def sync_locked(self):
+      if self.dirty:
+         self.file.flush()
+         os.fsync(self.file.fileno())
+         self.dirty = False
+      self.last_sync = time.monotonic()
+
+
+   def run_flusher(self):
+      while not self.closed.wait(self.fsync_interval):
+         self.sync()
+
+
+   def truncate(self):
+      # called after a checkpoint, the records are all inside the checkpoint snapshot
+      with self.lock:
+         self.file.truncate(0)
+         self.file.seek(0)
+         os.fsync(self.file.fileno())
+         self.dirty = False
+
+
+   def close(self):
+      self.closed.set()
+      if self.flusher:
+         self.flusher.join()
+      with self.lock:
+         self.sync_locked()
+         self.file.close()
@@ -0,0 +1,76 @@
+# the rows of a table are split into blocks of block_size consecutive rows and the zone map of a
+# column keeps the minimum and the maximum value of every block, a scan can then skip the blocks
+# which can't contain any value satisfying a column-operator-literal condition
+# for columns growing with the rows (timestamps, counters) a range condition only reads a few blocks
+class ZoneMap:
+   block_size = 4096
+
+
+   # whether a block with values in [low, high] can contain a value satisfying column-operator-value
+   may_match = {'=': lambda low, high, value: low <= value <= high,
+                '<>': lambda low, high, value: not low == value == high,
+                '<': lambda low, high, value: low < value,
+                '<=': lambda low, high, value: low <= value,
+                '>': lambda low, high, value: high > value,
+                '>=': lambda low, high, value: high >= value}
+
+
+   def __init__(self, column):
+      self.mins = []
+      self.maxs = []
+      self.update(column, 0)
+
+
+   def __len__(self):
+      return len(self.mins)
+
+
+   def update(self, column, first_row_index):
+      # the rows starting from first_row_index have been appended to the column, they are folded
+      # into the last block and new blocks are added only past its end
+      # NaNs can't be compared, the bounds of a block containing one are None and it's always read
+      length = len(column)
+      has_nans = column.type_name == 'float'
+      start = first_row_index
+      while start < length:
+         block_index = start // self.block_size
+         end = min((block_index + 1) * self.block_size, length)
+         values = column.get_raw_slice(start, end)
+         if has_nans and any(value != value for value in values):
+            low = high = None
+         else:
+            low, high = min(values), max(values)
+         if block_index < len(self.mins):
+            if low is None or self.mins[block_index] is None:
+               low = high = None
+            else:
+               low, high = min(low, self.mins[block_index]), max(high, self.maxs[block_index])
+            self.mins[block_index] = low
+            self.maxs[block_index] = high
+         else:
+            self.mins.append(low)
+            self.maxs.append(high)
+         start = end
+
+
+   def get_blocks(self, operator, value):
+      # one flag for every block, False if the block surely doesn't contain rows satisfying the condition
+      may_match = self.may_match[operator]
+      return [low is None or may_match(low, high, value) for low, high in zip(self.mins, self.maxs)]
+
+
+
+def get_row_ranges(blocks, length, block_size=ZoneMap.block_size):
+   # turns the flags of the blocks into the (start, end) ranges of rows to be read, adjacent blocks
+   # are merged into a single range
+   row_ranges = []
+   # the zone maps can have more blocks than length rows when reading a version of the table
+   for block_index, flag in enumerate(blocks[:-(-length // block_size)]):
+      if not flag:
+         continue
+      start, end = block_index * block_size, min((block_index + 1) * block_size, length)
+      if row_ranges and row_ranges[-1][1] == start:
+         row_ranges[-1] = (row_ranges[-1][0], end)
+      else:
+         row_ranges.append((start, end))
+   return row_ranges
@@ -0,0 +1,111 @@
+import math
+import random
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.session
+import sql_interpreter.vectorized
+
+
+
+class Aggregate(unittest.TestCase):
+
+   def setUp(self):
+      generator = random.Random(3)
+      self.rows = [[generator.randrange(-50, 50), generator.choice(['a', 'b', 'c', 'd']), generator.uniform(-1, 1), i % 7]
+                   for i in range(3000)]
+      self.databases = [sql_interpreter.database.Database()]
+      if sql_interpreter.vectorized.is_available():
+         self.databases.append(sql_interpreter.database.Database(vectorize=True))
+      for database in self.databases:
+         database.create_table('t', ['i', 's', 'f', 'g'], ['int', 'string', 'float', 'int'])
+         database.insert_values('t', self.rows)
+
+
+   def expected(self, group_columns, condition=lambda row: True):
+      # groups in the order of their first rows, with count, sum(i), avg(f), min(i) and max(f)
+      groups = {}
+      for row in self.rows:
+         if condition(row):
+            groups.setdefault(tuple(row[i] for i in group_columns), []).append(row)
+      return [key + (len(rows), sum(row[0] for row in rows), sum(row[2] for row in rows) / len(rows),
+                     min(row[0] for row in rows), max(row[2] for row in rows))
+              for key, rows in groups.items()]
+
+
+   def assertRowsEqual(self, rows, expected):
+      self.assertEqual(len(rows), len(expected))
+      for row, expected_row in zip(rows, expected):
+         self.assertEqual(len(row), len(expected_row))
+         for value, expected_value in zip(row, expected_row):
+            if isinstance(expected_value, float):
+               self.assertAlmostEqual(value, expected_value)
+            else:
+               self.assertEqual(value, expected_value)
+
+
+   def test_group_by(self):
+      aggregates = [('count', '*'), ('sum', 'i'), ('avg', 'f'), ('min', 'i'), ('max', 'f')]
+      for database in self.databases:
+         result = database.select(['s'] + aggregates, ['t'], [], group_by=['s'])
+         self.assertEqual(result.get_column_names(), ('s', 'count(*)', 'sum(i)', 'avg(f)', 'min(i)', 'max(f)'))
+         self.assertEqual(result.get_column_types(), ('string', 'int', 'int', 'float', 'int', 'float'))
+         self.assertRowsEqual(list(result.get_raw_rows()), self.expected([1]))
+
+         result = database.select(['g', 's'] + aggregates, ['t'], ['i', '10', '>='], group_by=['s', 'g'])
+         expected = [(row[1], row[0]) + row[2:] for row in self.expected([1, 3], lambda row: row[0] >= 10)]
+         self.assertRowsEqual(list(result.get_raw_rows()), expected)
+
+         # without group by the aggregates of all the rows
+         result = database.select(aggregates, ['t'], ['f', '0.0', '<'])
+         self.assertRowsEqual(list(result.get_raw_rows()), self.expected([], lambda row: row[2] < 0))
+
+
+   def test_order_by_aggregate(self):
+      for database in self.databases:
+         result = database.select(['g', ('sum', 'i')], ['t'], [], [(('sum', 'i'), True), ('g', False)], 3, ['g'])
+         expected = sorted(((row[0], row[2]) for row in self.expected([3])), key=lambda row: (-row[1], row[0]))
+         self.assertEqual(list(result.get_raw_rows()), expected[:3])
+
+         # the aggregates used only by order by aren't returned
+         result = database.select(['s'], ['t'], [], [(('count', '*'), False), ('s', False)], group_by=['s'])
+         expected = sorted(self.expected([1]), key=lambda row: (row[1], row[0]))
+         self.assertEqual(list(result.get_raw_rows()), [row[:1] for row in expected])
+
+
+   def test_empty_input(self):
+      for database in self.databases:
+         result = database.select([('count', '*'), ('sum', 'i'), ('sum', 'f'), ('avg', 'f')], ['t'], ['i', '1000', '>'])
+         rows = list(result.get_raw_rows())
+         self.assertEqual(rows[0][:3], (0, 0, 0.0))
+         self.assertTrue(math.isnan(rows[0][3]))
+         self.assertEqual(len(database.select([('max', 'i')], ['t'], ['i', '1000', '>'])), 0)
+         self.assertEqual(len(database.select(['s', ('count', '*')], ['t'], ['i', '1000', '>'], group_by=['s'])), 0)
+
+
+   def test_errors(self):
+      database = self.databases[0]
+      self.assertRaises(ValueError, database.select, ['s', 'i'], ['t'], [], group_by=['s'])
+      self.assertRaises(ValueError, database.select, ['i', ('count', '*')], ['t'], [])
+      self.assertRaises(ValueError, database.select, [], ['t'], [], group_by=['s'])
+      self.assertRaises(TypeError, database.select, [('sum', 's')], ['t'], [])
+      self.assertRaises(NameError, database.select, [('min', 'x')], ['t'], [])
+      self.assertRaises(NameError, database.select, ['s'], ['t'], [], group_by=['x'])
+
+
+   def test_explain(self):
+      for database in self.databases:
+         plan = database.explain(['s', ('count', '*')], ['t'], ['i', '0', '>'], group_by=['s'])
+         operator = 'VectorizedAggregate' if database.vectorize else 'HashAggregate'
+         self.assertIn('{} by t.s: count(*)'.format(operator), plan)
+
+         # string aggregates can't be read as numpy arrays
+         plan = database.explain([('max', 's')], ['t'], [])
+         self.assertIn('HashAggregate', plan)
+
+
+   def test_session(self):
+      session = sql_interpreter.session.Session(self.databases[0])
+      result = session.execute('select s, count(*) from t where i > ? group by s order by s', (0,))
+      expected = sorted(row[:2] for row in self.expected([1], lambda row: row[0] > 0))
+      self.assertEqual(list(result.get_raw_rows()), expected)
@@ -0,0 +1,71 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.storage
+
+
+
+class ColumnarStorage(unittest.TestCase):
+
+   column_names = ("c1", "c2", "c3")
+   column_types = ("int", "float", "string")
+   values = ((1, 1.5, "a"), (2, 2.5, "b"), (3, 3.5, "a"))
+
+   str_result = "c1 int,c2 float,c3 string\n1,1.5,'a'\n2,2.5,'b'\n3,3.5,'a'"
+
+
+   def create_table(self):
+      table = sql_interpreter.database.Table(self.column_names, self.column_types)
+      for row in self.values:
+         table.insert_row(row)
+      return table
+
+
+   def test_typed_buffers(self):
+      table = self.create_table()
+      self.assertEqual(table.get_column(0).get_raw_values().typecode, 'q')
+      self.assertEqual(table.get_column(1).get_raw_values().typecode, 'd')
+      self.assertSequenceEqual(list(table.get_raw_rows()), self.values)
+      self.assertEqual(len(table), 3)
+
+
+   def test_string_pool(self):
+      column = sql_interpreter.storage.StringColumn(("a", "b", "a", "a"))
+      self.assertEqual(len(column.pool), 2)
+      self.assertSequenceEqual(list(column.get_raw_values()), ("a", "b", "a", "a"))
+
+
+   def test_get_rows(self):
+      table = self.create_table()
+      row = next(iter(table.get_rows()))
+      self.assertIsInstance(row[0], sql_interpreter.database.TypeInt)
+      self.assertIsInstance(row[1], sql_interpreter.database.TypeFloat)
+      self.assertIsInstance(row[2], sql_interpreter.database.TypeString)
+      self.assertEqual(str(table), self.str_result)
+
+
+   def test_insert_type_values(self):
+      table = sql_interpreter.database.Table(self.column_names, self.column_types)
+      table.insert_row((sql_interpreter.database.TypeInt("1"),
+                        sql_interpreter.database.TypeFloat("1.5"),
+                        sql_interpreter.database.TypeString("'a'")))
+      self.assertSequenceEqual(list(table.get_raw_rows()), ((1, 1.5, "a"),))
+
+
+   def test_failed_insert_keeps_columns_aligned(self):
+      table = self.create_table()
+      self.assertRaises(ValueError, table.insert_row, (2 ** 70, 1.5, "a"))
+      self.assertRaises(TypeError, table.insert_row, (4, "not a float", "a"))
+      self.assertRaises(ValueError, table.insert_row, (4, 4.5))
+      self.assertEqual(str(table), self.str_result)
+
+
+   def test_filter_table(self):
+      table = self.create_table()
+      filtered_table = table.filter_table(["c3", "'a'", "="])
+      self.assertEqual(str(filtered_table), "c1 int,c2 float,c3 string\n1,1.5,'a'\n3,3.5,'a'")
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.compiler
+
+
+
+class CompileCondition(unittest.TestCase):
+
+   column_names = ("i", "f", "s", "z")
+   column_types = ("int", "float", "string", "int")
+   values = ((1, 1.5, "a", 0), (2, 2.5, "b", 0), (7, 3.5, "a", 0), (-7, 0.5, "c", 0))
+
+   # every condition is checked against the interpreted Row.verify_condition
+   conditions = (
+      ["i", "1", ">"],
+      ["i", "2", "<="],
+      ["i", "2", "/", "3", "="],
+      ["i", "-2", "/", "-3", "="],
+      ["i", "2", "*", "1", "+", "i", "-", "3", ">="],
+      ["s", "'a'", "="],
+      ["s", "'b'", "<"],
+      ["f", "1.0", ">", "s", "'a'", "=", "and"],
+      ["f", "3.0", ">", "s", "'c'", "=", "or"],
+      ["i", "z", "/", "0", "<"],
+      ["i", "z", "/", "0", ">="],
+      ["i", "z", "/", "i", "<>"],
+      ["i", "z", "/", "1", "-", "i", "="],
+      ["f", "0.0", "/", "f", "<>"],
+      ["i", "i", "<>", "i", "1", "=", "or"],
+      ["s", "'a'", "+", "'ab'", "="]
+   )
+
+   type_errors = (
+      ["i", "1.0", ">"],
+      ["s", "1", "="],
+      ["i", "1", "=", "1", "and"]
+   )
+
+   value_errors = (
+      ["s", "'a'", "-", "'b'", "="],
+      ["i", "1", "+"],
+      ["i", "1", "=", "1"],
+      ["i", "i", "and"]
+   )
+
+
+   def create_table(self):
+      table = sql_interpreter.database.Table(self.column_names, self.column_types)
+      for row in self.values:
+         table.insert_row(row)
+      return table
+
+
+   def test_same_result_as_interpreter(self):
+      table = self.create_table()
+      for condition in self.conditions:
+         modified_condition = table.modify_condition(condition)
+         predicate = sql_interpreter.compiler.ConditionCompiler(table.get_column_types()).compile(modified_condition)
+         compiled = [predicate(values) for values in table.get_raw_rows()]
+         interpreted = [row.verify_condition(modified_condition) for row in table.get_rows()]
+         self.assertSequenceEqual(compiled, interpreted, condition)
+
+
+   def test_type_errors(self):
+      table = self.create_table()
+      for condition in self.type_errors:
+         self.assertRaises(TypeError, table.filter_table, condition)
+
+
+   def test_value_errors(self):
+      table = self.create_table()
+      for condition in self.value_errors:
+         self.assertRaises(ValueError, table.filter_table, condition)
+
+
+
+if __name__ == '__main__':
+   unittest.main()
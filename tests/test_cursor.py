@@ -0,0 +1,64 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.cursor
+import sql_interpreter.database
+import sql_interpreter.executor
+import sql_interpreter.session
+
+
+
+class Cursors(unittest.TestCase):
+
+   def setUp(self):
+      self.database = sql_interpreter.database.Database()
+      self.database.create_table('t', ['i', 's'], ['int', 'string'])
+      self.database.insert_values('t', [[i, 's{}'.format(i)] for i in range(250)])
+
+
+   def test_fetch(self):
+      cursor = self.database.select(['s', 'i'], ['t'], ['i', '10', '>='], cursor=True)
+      self.assertIsInstance(cursor, sql_interpreter.cursor.Cursor)
+      self.assertEqual(cursor.get_header_string(), 's string,i int')
+      self.assertEqual(cursor.fetchone(), ('s10', 10))
+      self.assertEqual(cursor.format_row(('s10', 10)), "'s10',10")
+      self.assertEqual(len(cursor.fetchmany()), cursor.arraysize)
+      self.assertEqual(cursor.fetchmany(3), [('s111', 111), ('s112', 112), ('s113', 113)])
+      # the rows inserted after the cursor was opened aren't returned
+      self.database.insert_values('t', [[1000, 'new']])
+      rows = cursor.fetchall()
+      self.assertEqual(len(rows), 136)
+      self.assertEqual(rows[-1], ('s249', 249))
+      self.assertIsNone(cursor.fetchone())
+      self.assertEqual(cursor.fetchmany(), [])
+
+
+   def test_lazy_rows(self):
+      # only the fetched rows are pulled from the pipeline
+      pulled = []
+      class Pipeline(sql_interpreter.executor.TableScan):
+         def __iter__(self):
+            for row in super().__iter__():
+               pulled.append(row)
+               yield row
+      cursor = sql_interpreter.cursor.Cursor(Pipeline(self.database.tables['t']))
+      self.assertEqual(cursor.fetchmany(2), [(0, 's0'), (1, 's1')])
+      self.assertEqual(len(pulled), 2)
+      cursor.close()
+      self.assertEqual(cursor.fetchall(), [])
+      self.assertEqual(len(pulled), 2)
+
+      cursor = sql_interpreter.cursor.Cursor.create_from_table(self.database.tables['t'])
+      self.assertEqual(len(list(cursor)), 250)
+
+
+   def test_session(self):
+      session = sql_interpreter.session.Session(self.database)
+      cursor = session.execute("select i from t where i < ?", (5,), cursor=True)
+      self.assertEqual(list(cursor), [(i,) for i in range(5)])
+      self.assertIsNone(session.execute("insert into t values ?, ?", (1, 'a'), cursor=True))
+      self.assertEqual(len(session.execute("select i from t")), 251)
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.executor
+import sql_interpreter.index
+import sql_interpreter.lexer
+import sql_interpreter.parser
+
+
+
+class Index(unittest.TestCase):
+
+   setup_queries = (
+      "create table t (k int, v float, s string)",
+      "insert into t values 5, 0.5, 'e'",
+      "insert into t values 3, 1.5, 'c'",
+      "insert into t values 8, 2.5, 'h'",
+      "insert into t values 3, 3.5, 'c'"
+   )
+
+   conditions = (
+      "k = 3",
+      "3 = k",
+      "k < 5",
+      "k <= 5",
+      "5 > k",
+      "k > 3",
+      "k >= 3 and v < 3.0",
+      "s = 'c' and k = 3",
+      "s >= 'd'",
+      "v = 2.5",
+      "k = 4"
+   )
+
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.database = sql_interpreter.database.Database()
+      for query in self.setup_queries:
+         self.execute(query)
+
+
+   def execute(self, query):
+      return self.database.transact(*self.parser.parse(self.lexer.tokenize(query)))
+
+
+   def select_all(self):
+      return [str(self.execute("select * from t where " + condition)) for condition in self.conditions]
+
+
+   def test_same_results_as_full_scan(self):
+      expected = self.select_all()
+      self.execute("create index k_hash on t (k)")
+      self.execute("create index s_ordered on t (s) using ordered")
+      self.execute("create index v_ordered on t (v) using ordered")
+      self.assertSequenceEqual(self.select_all(), expected)
+      self.execute("create index k_ordered on t (k) using ordered")
+      self.assertSequenceEqual(self.select_all(), expected)
+
+
+   def test_index_is_used(self):
+      self.execute("create index k_hash on t (k)")
+      self.execute("create index v_ordered on t (v) using ordered")
+      table = self.database.tables['t']
+      condition = table.modify_condition(["v", "2.0", ">", "k", "3", "=", "and"])
+      scan = table.scan(sql_interpreter.compiler.split_conjuncts(sql_interpreter.compiler.build_tree(condition)))
+      self.assertIsInstance(scan, sql_interpreter.executor.Filter)
+      self.assertIsInstance(scan.child, sql_interpreter.executor.IndexScan)
+      self.assertEqual(scan.child.index.name, 'k_hash')
+      self.assertSequenceEqual(list(scan), ((3, 3.5, 'c'),))
+
+
+   def test_index_is_updated_by_inserts(self):
+      self.execute("create index k_hash on t (k)")
+      self.execute("create index k_ordered on t (k) using ordered")
+      self.execute("insert into t values 3, 4.5, 'c'")
+      self.execute("insert into t values 1, 5.5, 'a'")
+      self.assertEqual(str(self.execute("select v from t where k = 3")), "v float\n1.5\n3.5\n4.5")
+      self.assertEqual(str(self.execute("select v from t where k < 4")), "v float\n1.5\n3.5\n4.5\n5.5")
+
+
+   def test_ordered_build(self):
+      # building sorts the values once, the result is the same as inserting them one at a time
+      values = [(i * 7919) % 1000 for i in range(5000)]
+      built = sql_interpreter.index.OrderedIndex('built', 0)
+      built.build(values)
+      inserted = sql_interpreter.index.OrderedIndex('inserted', 0)
+      inserted.insert(0, values)
+      self.assertEqual((built.keys, built.row_indexes), (inserted.keys, inserted.row_indexes))
+      self.assertEqual(built.lookup('=', 500), [i for i, value in enumerate(values) if value == 500])
+
+
+   def test_ordered_nans(self):
+      # NaNs don't satisfy any comparison, whether they are indexed by the build or by later inserts
+      database = sql_interpreter.database.Database()
+      database.create_table('t', ['f'], ['float'])
+      database.insert_values('t', [[3.0], [float('nan')], [1.0], [2.0], [0.5]])
+      database.create_index('f_ordered', 't', 'f', 'ordered')
+      database.insert_values('t', [[float('nan')], [1.5]])
+      for condition, expected in ((['f', '2.5', '<'], [1.0, 2.0, 0.5, 1.5]), (['f', '1.0', '>='], [3.0, 1.0, 2.0, 1.5]),
+                                  (['f', '2.0', '='], [2.0]), (['f', '0.0', '>'], [3.0, 1.0, 2.0, 0.5, 1.5])):
+         result = database.select(['f'], ['t'], condition)
+         self.assertEqual([row[0] for row in result.get_raw_rows()], expected, condition)
+      index = database.tables['t'].indexes[0]
+      self.assertEqual(list(index.nan_row_indexes), [1, 5])
+      self.assertEqual(index.lookup('<', float('nan')), [])
+
+
+   def test_index_errors(self):
+      self.execute("create index k_hash on t (k)")
+      self.assertRaises(NameError, self.execute, "create index k_hash on t (v)")
+      self.assertRaises(NameError, self.execute, "create index k2 on u (k)")
+      self.assertRaises(NameError, self.execute, "create index k2 on t (z)")
+      self.execute("drop t")
+      self.execute("create table t (k int)")
+      self.execute("create index k_hash on t (k)")
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.lexer
+import sql_interpreter.parser
+
+
+
+class InsertMany(unittest.TestCase):
+
+   correct_queries = (
+      ("insert into Test values (1, 2.5, 'a')", ('insert_many', 'Test', [['1', '2.5', "'a'"]])),
+      ("insert into Test values (1, 2.5, 'a'), (2, 3.5, 'b c')",
+       ('insert_many', 'Test', [['1', '2.5', "'a'"], ['2', '3.5', "'b c'"]])),
+      ("insert into Test values 1, 2.5, 'a'", ('insert_into', 'Test', ['1', '2.5', "'a'"]))
+   )
+
+   syntax_errors = (
+      "insert into Test values (",
+      "insert into Test values ()",
+      "insert into Test values (1, 2",
+      "insert into Test values (1, 2),",
+      "insert into Test values (1, 2) (3, 4)",
+      "insert into Test values (1, 2), 3, 4",
+      "insert into Test values (1, , 2)",
+      "insert into Test values (1 2)",
+      "insert into Test values (1, 2) stuff"
+   )
+
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.database = sql_interpreter.database.Database()
+      self.database.create_table('t', ('i', 'f', 's'), ('int', 'float', 'string'))
+      self.database.create_index('t_i', 't', 'i', 'hash')
+
+
+   def test_correct_queries(self):
+      for query, result in self.correct_queries:
+         self.assertEqual(self.parser.parse(self.lexer.tokenize(query)), result)
+
+
+   def test_syntax_errors(self):
+      for query in self.syntax_errors:
+         tokens = self.lexer.tokenize(query)
+         self.assertRaises(ValueError, self.parser.parse, tokens)
+
+
+   def test_insert_many(self):
+      query = "insert into t values (1, 2.5, 'a'), (-2, .5, 'b c'), (1, 3., '')"
+      self.database.transact(*self.parser.parse(self.lexer.tokenize(query)))
+      self.database.insert_many('t', [['4', '4.5', "'d'"]])
+      self.assertEqual(str(self.database.print_table('t')), "i int,f float,s string\n1,2.5,'a'\n-2,0.5,'b c'\n1,3.0,''\n4,4.5,'d'")
+      self.assertEqual(str(self.database.select(['f'], ['t'], ['i', '1', '='])), "f float\n2.5\n3.0")
+
+
+   def test_insert_many_is_atomic(self):
+      self.database.insert_many('t', [['1', '2.5', "'a'"]])
+      wrong_rows = (
+         [['2', '2.5', "'a'"], ['3', '2.5']],
+         [['2', '2.5', "'a'"], ['3', '2.5', "'a'", '4']],
+         [['2', '2.5', "'a'"], ['3.5', '2.5', "'a'"]],
+         [['2', '2.5', "'a'"], ['3', '2', "'a'"]],
+         [['2', '2.5', "'a'"], ['3', '.', "'a'"]],
+         [['2', '2.5', "'a'"], ['3', '2.5', "a"]],
+         [['2', '2.5', "'a'"], [str(2 ** 70), '2.5', "'a'"]]
+      )
+      for rows in wrong_rows:
+         self.assertRaises((ValueError, TypeError), self.database.insert_many, 't', rows)
+      self.assertEqual(len(self.database.tables['t']), 1)
+      self.assertEqual(str(self.database.select(['f'], ['t'], ['i', '2', '='])), "f float")
+      self.assertRaises(NameError, self.database.insert_many, 'u', [['1']])
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.lexer
+import sql_interpreter.parser
+
+
+
+class Load(unittest.TestCase):
+
+   correct_queries = (
+      ("load Test from 'data.csv'", ('load', 'Test', 'data.csv')),
+      ("load Test from '/tmp/my data.csv'", ('load', 'Test', '/tmp/my data.csv'))
+   )
+
+   syntax_errors = (
+      "load",
+      "load table from 'data.csv'",
+      "load Test 'data.csv'",
+      "load Test from",
+      "load Test from data.csv",
+      "load Test from ''",
+      "load Test from 'data.csv' stuff"
+   )
+
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.database = sql_interpreter.database.Database()
+      self.database.create_table('t', ('i', 'f', 's'), ('int', 'float', 'string'))
+      self.database.create_index('t_i', 't', 'i', 'ordered')
+      self.directory = tempfile.TemporaryDirectory()
+
+
+   def tearDown(self):
+      self.directory.cleanup()
+
+
+   def write_file(self, content):
+      file_name = os.path.join(self.directory.name, 'data.csv')
+      with open(file_name, 'w', newline='') as csv_file:
+         csv_file.write(content)
+      return file_name
+
+
+   def test_correct_queries(self):
+      for query, result in self.correct_queries:
+         self.assertEqual(self.parser.parse(self.lexer.tokenize(query)), result)
+
+
+   def test_syntax_errors(self):
+      for query in self.syntax_errors:
+         tokens = self.lexer.tokenize(query)
+         self.assertRaises(ValueError, self.parser.parse, tokens)
+
+
+   def test_load(self):
+      self.database.load_chunk_size = 2
+      file_name = self.write_file('i,f,s\n1,1.5,a\n2,2.5,"b, c"\n3,.5,\n')
+      result = self.database.transact('load', 't', file_name)
+      self.assertTrue(result.startswith('Loaded 3 rows into t'))
+      self.assertEqual(str(self.database.print_table('t')), "i int,f float,s string\n1,1.5,'a'\n2,2.5,'b, c'\n3,0.5,''")
+      self.assertEqual(str(self.database.select(['s'], ['t'], ['i', '2', '>='])), "s string\n'b, c'\n''")
+
+
+   def test_failed_load_is_rolled_back(self):
+      self.database.load_chunk_size = 2
+      self.database.insert_into('t', ['7', '7.5', "'x'"])
+      wrong_files = (
+         '1,1.5,a\n2,2.5,b\n3,3.5\n',
+         '1,1.5,a\n2,2.5,b\n3,3,c\n',
+         '1,1.5,a\n2,2.5,b\nc,3.5,c\n'
+      )
+      for content in wrong_files:
+         self.assertRaises((ValueError, TypeError), self.database.load, 't', self.write_file(content))
+      self.assertRaises(ValueError, self.database.load, 't', os.path.join(self.directory.name, 'missing.csv'))
+      self.assertRaises(NameError, self.database.load, 'u', self.write_file(''))
+      self.assertEqual(str(self.database.select([], ['t'], ['i', '0', '>'])), "i int,f float,s string\n7,7.5,'x'")
+
+
+
+if __name__ == '__main__':
+   unittest.main()
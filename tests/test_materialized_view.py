@@ -0,0 +1,93 @@
+import os
+import random
+import tempfile
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.session
+
+
+
+class MaterializedView(unittest.TestCase):
+
+   def setUp(self):
+      self.database = sql_interpreter.database.Database()
+      self.session = sql_interpreter.session.Session(self.database)
+      self.session.execute('create table a (x int, n string)')
+      self.session.execute('create table b (y int, f float)')
+      self.session.execute("insert into a values (1, 'one'), (2, 'two')")
+      self.session.execute('insert into b values (1, 0.5), (3, 1.5)')
+
+
+   def assertSameRows(self, view_name, query):
+      # the rows of a view are in the order they were added
+      view = self.database.print_table(view_name)
+      expected = self.session.execute(query)
+      self.assertEqual(view.get_column_names(), expected.get_column_names())
+      self.assertEqual(sorted(view.get_raw_rows()), sorted(expected.get_raw_rows()))
+
+
+   def test_filter_and_join(self):
+      join = 'select n, f from a, b where x = y and f < 10.0'
+      self.session.execute('create materialized view j as ' + join)
+      self.session.execute('create materialized view s as select x from a where x > 1')
+      self.assertSameRows('j', join)
+
+      generator = random.Random(5)
+      insert = self.session.prepare('insert into a values ?, ?')
+      for i in range(200):
+         if generator.random() < 0.5:
+            insert.execute(generator.randrange(10), 'n{}'.format(i))
+         else:
+            self.session.execute('insert into b values ({0}, {1}.5), ({2}, {1}0.5)'.format(generator.randrange(10), i % 3, generator.randrange(10)))
+      self.database.insert_many('a', [['3', "'x'"], ['4', "'y'"]])
+      self.assertSameRows('j', join)
+      self.assertSameRows('s', 'select x from a where x > 1')
+
+
+   def test_only_new_rows_are_read(self):
+      self.session.execute('create materialized view s as select n from a where x > 1')
+      view = self.database.views['s']
+      self.session.execute("insert into a values 5, 'five'")
+      self.assertEqual(view.lengths, {'a': 3})
+      self.assertEqual(list(self.database.print_table('s').get_raw_rows()), [('two',), ('five',)])
+
+
+   def test_views_of_views(self):
+      self.session.execute('create materialized view j as select x, f from a, b where x = y')
+      self.session.execute('create materialized view k as select f from j where x > 0')
+      self.session.execute('insert into b values 2, 2.5')
+      self.assertSameRows('k', 'select f from a, b where x = y and x > 0')
+
+
+   def test_errors(self):
+      self.session.execute('create materialized view s as select n from a')
+      self.assertRaises(NameError, self.session.execute, 'create materialized view s as select n from a')
+      self.assertRaises(NameError, self.session.execute, 'create materialized view t as select n from c')
+      self.assertRaises(ValueError, self.session.execute, 'create materialized view t as select n from a order by n')
+      self.assertRaises(ValueError, self.session.execute, 'create materialized view t as select count(*) from a')
+      self.assertRaises(ValueError, self.session.execute, "insert into s values 'x'")
+      self.assertRaises(ValueError, self.session.execute, 'drop a')
+      self.session.execute('drop s')
+      self.session.execute('drop a')
+      self.assertEqual(self.database.views, {})
+
+
+   def test_write_ahead_log(self):
+      with tempfile.TemporaryDirectory() as directory:
+         wal_file_name = os.path.join(directory, 'database.wal')
+         database = sql_interpreter.database.Database(wal_file_name=wal_file_name, fsync_interval=0)
+         session = sql_interpreter.session.Session(database)
+         session.execute('create table a (x int)')
+         session.execute('insert into a values (1), (2)')
+         session.execute('create materialized view s as select x from a where x > 1')
+         session.execute('insert into a values 3')
+         database.checkpoint()
+         session.execute('insert into a values (4), (0)')
+         database.close()
+
+         # the view is restored from the checkpoint and updated by the records logged after it
+         database = sql_interpreter.database.Database(wal_file_name=wal_file_name)
+         database.insert_values('a', [[5]])
+         self.assertEqual(list(database.print_table('s').get_raw_rows()), [(2,), (3,), (4,), (5,)])
+         database.close()
@@ -0,0 +1,78 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.compiler
+import sql_interpreter.database
+import sql_interpreter.lexer
+import sql_interpreter.parallel
+import sql_interpreter.parser
+
+
+
+class Parallel(unittest.TestCase):
+
+   @classmethod
+   def setUpClass(cls):
+      cls.min_rows = sql_interpreter.parallel.min_rows
+      sql_interpreter.parallel.min_rows = 100
+
+
+   @classmethod
+   def tearDownClass(cls):
+      sql_interpreter.parallel.min_rows = cls.min_rows
+      sql_interpreter.parallel.shutdown()
+
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.databases = (sql_interpreter.database.Database(), sql_interpreter.database.Database(workers=2))
+      for database in self.databases:
+         self.execute(database, "create table a (a_id int, a_value float, a_name string)")
+         self.execute(database, "create table b (b_id int, b_name string)")
+         self.execute(database, "insert into a values " + ", ".join("({}, {}.5, 'name {}')".format(i, i % 13, i % 7) for i in range(1000)))
+         self.execute(database, "insert into b values " + ", ".join("({}, 'name {}')".format(i, i) for i in range(10)))
+
+
+   def execute(self, database, query):
+      return database.transact(*self.parser.parse(self.lexer.tokenize(query)))
+
+
+   def check_same_result(self, query):
+      sequential, parallel = (str(self.execute(database, query)) for database in self.databases)
+      self.assertEqual(sequential, parallel, query)
+      return parallel
+
+
+   def test_parallel_scan(self):
+      table = self.databases[1].tables['a']
+      scan = table.scan([sql_interpreter.compiler.build_tree(table.modify_condition(["a_value", "5.0", ">"]))], workers=2)
+      self.assertIsInstance(scan, sql_interpreter.parallel.ParallelScan)
+      self.check_same_result("select a_id, a_name from a where a_value > 5.0 and a_name <> 'name 3'")
+      self.check_same_result("select * from a where a_id = 999 or a_name = 'name 1'")
+      self.assertEqual(self.check_same_result("select a_id from a where a_id > 1000"), "a_id int")
+      expected = table.filter_table(["a_id", "7", "/", "50", "<"])
+      self.assertEqual(str(table.filter_table(["a_id", "7", "/", "50", "<"], workers=2)), str(expected))
+
+
+   def test_explain_matches_scan(self):
+      # string conjuncts can't be vectorized, so a vectorized database still scans in parallel
+      database = sql_interpreter.database.Database(vectorize=True, workers=2)
+      self.execute(database, "create table a (i int, n string)")
+      self.execute(database, "insert into a values " + ", ".join("({}, 'n{}')".format(i, i % 7) for i in range(1000)))
+      self.assertIn("Scan a in parallel", self.execute(database, "explain select i from a where n = 'n3'"))
+      table = database.tables['a']
+      scan = table.scan([sql_interpreter.compiler.build_tree(table.modify_condition(["n", "'n3'", "="]))], True, 2)
+      self.assertIsInstance(scan, sql_interpreter.parallel.ParallelScan)
+
+
+   def test_parallel_product(self):
+      query = "select a_id, b_id, b_name from a, b where a_id < b_id * 10 and a_name < b_name and a_value > 2.0"
+      explanation = self.execute(self.databases[1], "explain " + query)
+      self.assertIn("ParallelProduct", explanation)
+      self.check_same_result(query)
+      self.check_same_result("select * from a, b where a_value * 2.0 > 20.0 or b_id < a_id")
+
+
+
+if __name__ == '__main__':
+   unittest.main()
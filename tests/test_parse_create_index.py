@@ -0,0 +1,63 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.lexer
+import sql_interpreter.parser
+
+
+
+class ParseCreateIndex(unittest.TestCase):
+
+   correct_queries = (
+      ("create index Idx on Test (column_name)", ('create_index', 'Idx', 'Test', 'column_name', 'hash')),
+      ("create index Idx on Test (column_name) using hash", ('create_index', 'Idx', 'Test', 'column_name', 'hash')),
+      ("create index Idx on Test (column_name) using ordered", ('create_index', 'Idx', 'Test', 'column_name', 'ordered'))
+   )
+
+   forbidden_names = (
+      "create index select on Test (column_name)",
+      "create index Idx on table (column_name)",
+      "create index Idx on Test (from)",
+      "create index Idx on Test (int)"
+   )
+
+   syntax_errors = (
+      "create index",
+      "create index Idx",
+      "create index Idx Test (column_name)",
+      "create index Idx on Test",
+      "create index Idx on Test column_name",
+      "create index Idx on Test (column_name",
+      "create index Idx on Test (column_name1, column_name2)",
+      "create index Idx on Test (column_name) using",
+      "create index Idx on Test (column_name) using btree",
+      "create index Idx on Test (column_name) hash",
+      "create index Idx on Test (column_name) using hash stuff"
+   )
+
+
+   def test_correct_queries(self):
+      lexer = sql_interpreter.lexer.SQLLexer()
+      parser = sql_interpreter.parser.SQLParser()
+      for query, result in self.correct_queries:
+         self.assertEqual(parser.parse(lexer.tokenize(query)), result)
+
+
+   def test_forbidden_names(self):
+      lexer = sql_interpreter.lexer.SQLLexer()
+      parser = sql_interpreter.parser.SQLParser()
+      for query in self.forbidden_names:
+         tokens = lexer.tokenize(query)
+         self.assertRaises(ValueError, parser.parse, tokens)
+
+
+   def test_syntax_errors(self):
+      lexer = sql_interpreter.lexer.SQLLexer()
+      parser = sql_interpreter.parser.SQLParser()
+      for query in self.syntax_errors:
+         tokens = lexer.tokenize(query)
+         self.assertRaises(ValueError, parser.parse, tokens)
+
+
+
+if __name__ == '__main__':
+   unittest.main()
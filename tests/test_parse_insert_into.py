@@ -81,5 +81,15 @@ class ParseInsertInto(unittest.TestCase):
          self.assertRaises(ValueError, parser.parse, tokens)
 
 
+   def test_long_values_list(self):
+      lexer = sql_interpreter.lexer.SQLLexer()
+      parser = sql_interpreter.parser.SQLParser()
+      values = ["'value {}, (with separators)'".format(i) if i % 2 else str(i) for i in range(10000)]
+      tokens = lexer.tokenize("insert into Test values " + ", ".join(values))
+      self.assertEqual(parser.parse(tokens), ('insert_into', 'Test', values))
+      tokens = lexer.scan("insert into Test values (" + "), (".join(values) + ")")
+      self.assertEqual(parser.parse(tokens), ('insert_many', 'Test', [[value] for value in values]))
+
+
 if __name__ == '__main__':
    unittest.main()
\ No newline at end of file
@@ -61,6 +61,61 @@ class ParseSelect(unittest.TestCase):
    )
 
 
+   clauses = (
+      ("select * from Test order by a",
+       ('select', [], ['Test'], [], [('a', False)], None)),
+      ("select a, b from Test where a > 1 order by b desc, a asc limit 10",
+       ('select', ['a', 'b'], ['Test'], ['a', '1', '>'], [('b', True), ('a', False)], 10)),
+      ("select * from Test, Test2 limit 0",
+       ('select', [], ['Test', 'Test2'], [], [], 0)),
+      ("select * from Test where a = 1",
+       ('select', [], ['Test'], ['a', '1', '='])),
+      ("explain select * from Test order by a limit 5",
+       ('explain', [], ['Test'], [], [('a', False)], 5)),
+      ("create table t as select * from Test limit 5",
+       ('create_table_as', 't', [], ['Test'], [], [], 5)),
+      ("create materialized view v as select a from Test where a > 1",
+       ('create_materialized_view', 'v', ['a'], ['Test'], ['a', '1', '>'])),
+      ("select b, count(*), sum(a) from Test where a > 1 group by b order by count(*) desc",
+       ('select', ['b', ('count', '*'), ('sum', 'a')], ['Test'], ['a', '1', '>'], [(('count', '*'), True)], None, ['b'])),
+      ("select max(a), min(c) from Test",
+       ('select', [('max', 'a'), ('min', 'c')], ['Test'], [])),
+      ("select a, b, avg(c) from Test group by a, b limit 3",
+       ('select', ['a', 'b', ('avg', 'c')], ['Test'], [], [], 3, ['a', 'b']))
+   )
+
+
+   clause_errors = (
+      "select * from Test order a",
+      "select * from Test order by",
+      "select * from Test order by a,",
+      "select * from Test order by a desc desc",
+      "select * from Test limit",
+      "select * from Test limit -1",
+      "select * from Test limit 1.5",
+      "select * from Test limit 5 order by a",
+      "select * from Test where order by a",
+      "select count(a from Test",
+      "select count() from Test",
+      "select sum(*) from Test",
+      "select median(a) from Test",
+      "select a from Test group a",
+      "select a from Test group by",
+      "select a from Test order by a group by a",
+      "create materialized v as select * from Test",
+      "create materialized view v select * from Test"
+   )
+
+
+   def test_clauses(self):
+      lexer = sql_interpreter.lexer.SQLLexer()
+      parser = sql_interpreter.parser.SQLParser()
+      for query, parsed in self.clauses:
+         self.assertEqual(parser.parse(lexer.tokenize(query)), parsed, query)
+      for query in self.clause_errors:
+         self.assertRaises(ValueError, parser.parse, lexer.tokenize(query))
+
+
    def test_forbidden_table_names(self):
       lexer = sql_interpreter.lexer.SQLLexer()
       parser = sql_interpreter.parser.SQLParser()
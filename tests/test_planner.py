@@ -0,0 +1,78 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.lexer
+import sql_interpreter.parser
+import sql_interpreter.planner
+
+
+
+class Planner(unittest.TestCase):
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.database = sql_interpreter.database.Database()
+      self.execute("create table a (a_id int, a_name string)")
+      self.execute("create table b (b_id int, b_a int)")
+      self.execute("create table c (c_id int, c_b int)")
+      self.execute("insert into a values " + ", ".join("({}, 'n{}')".format(i, i) for i in range(100)))
+      self.execute("insert into b values " + ", ".join("({}, {})".format(i, i % 100) for i in range(1000)))
+      self.execute("insert into c values " + ", ".join("({}, {})".format(i, i * 10) for i in range(10)))
+
+
+   def execute(self, query):
+      return self.database.transact(*self.parser.parse(self.lexer.tokenize(query)))
+
+
+   def test_join_order(self):
+      # a and b are joined first in the from list, starting from the filtered c is cheaper
+      query = "select * from a, b, c where a_id = b_a and b_id = c_b and c_id < 3"
+      tables = [self.database.tables[name] for name in ('a', 'b', 'c')]
+      condition = sql_interpreter.database.modify_condition(["a_id", "b_a", "=", "b_id", "c_b", "=", "and", "c_id", "3", "<", "and"],
+                                                            {"a_id": 0, "a_name": 1, "b_id": 2, "b_a": 3, "c_id": 4, "c_b": 5})
+      root, column_positions = sql_interpreter.planner.Planner().plan_joins(tables, condition)
+      self.assertIs(root.right.table, tables[0])
+      self.assertIs(root.left.right.table, tables[2])
+      self.assertEqual(column_positions, [4, 5, 0, 1, 2, 3])
+      # the columns keep the order of the from list
+      self.assertEqual(str(self.execute(query)),
+                       "a_id int,a_name string,b_id int,b_a int,c_id int,c_b int\n"
+                       "0,'n0',0,0,0,0\n10,'n10',10,10,1,10\n20,'n20',20,20,2,20")
+
+
+   def test_product_keeps_order(self):
+      tables = [self.database.tables[name] for name in ('c', 'a')]
+      root, column_positions = sql_interpreter.planner.Planner().plan_joins(tables, [])
+      self.assertIs(root.left.table, tables[0])
+      self.assertEqual(column_positions, [0, 1, 2, 3])
+
+
+   def test_explain(self):
+      self.execute("create index a_i on a (a_id)")
+      self.assertEqual(self.execute("explain select a_name, c_id from a, b, c where a_id = b_a and b_id = c_b and c_id < 3 and a_name <> 'x'"),
+                       "Project a.a_name, c.c_id (rows=1)\n"
+                       "   HashJoin on b.b_a = a.a_id (rows=1)\n"
+                       "      HashJoin on b.b_id = c.c_b (rows=3)\n"
+                       "         Scan b (rows=1000)\n"
+                       "         Scan c where c.c_id < 3 (rows=3)\n"
+                       "      Scan a where a.a_name <> 'x' (rows=90)")
+      self.assertEqual(self.execute("explain select * from a, c where a_id = 1 or c_id < a_id"),
+                       "Project a.a_id, a.a_name, c.c_id, c.c_b (rows=400)\n"
+                       "   CrossProduct where (a.a_id = 1) or (c.c_id < a.a_id) (rows=400)\n"
+                       "      Scan a (rows=100)\n"
+                       "      Scan c (rows=10)")
+      self.assertEqual(self.execute("explain select a_name from a where a_id = 3"),
+                       "Project a.a_name (rows=10)\n"
+                       "   Scan a using index a_i where a.a_id = 3 (rows=10)")
+
+
+   def test_explain_errors(self):
+      self.assertRaises(ValueError, self.parser.parse, self.lexer.tokenize("explain a"))
+      self.assertRaises(NameError, self.execute, "explain select * from d")
+      self.assertRaises(TypeError, self.execute, "explain select * from a where a_id = 'x'")
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.result_cache
+import sql_interpreter.session
+
+
+
+class ResultCache(unittest.TestCase):
+
+   def setUp(self):
+      self.database = sql_interpreter.database.Database(result_cache_memory=1 << 20)
+      self.session = sql_interpreter.session.Session(self.database)
+      self.session.execute('create table t (i int, s string)')
+      self.session.execute('create table u (j int)')
+      self.session.execute("insert into t values (1, 'a'), (2, 'b'), (3, 'c')")
+      self.session.execute('insert into u values (1), (2)')
+      self.cache = self.database.result_cache
+
+
+   def test_hits_and_invalidation(self):
+      first = self.database.select(['s'], ['t'], ['i', '1', '>'])
+      self.assertIs(self.database.select(['s'], ['t'], ['i', '1', '>']), first)
+      self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+      # inserting into another table doesn't change the result
+      self.session.execute('insert into u values 3')
+      self.assertIs(self.database.select(['s'], ['t'], ['i', '1', '>']), first)
+      self.session.execute("insert into t values 4, 'd'")
+      result = self.database.select(['s'], ['t'], ['i', '1', '>'])
+      self.assertEqual(list(result.get_raw_rows()), [('b',), ('c',), ('d',)])
+      self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+      self.assertEqual(len(self.cache), 1)
+
+      # a table dropped and created again is a different table
+      self.session.execute('drop t')
+      self.session.execute('create table t (i int, s string)')
+      self.assertEqual(len(self.database.select(['s'], ['t'], ['i', '1', '>'])), 0)
+
+
+   def test_statements(self):
+      statement = self.session.prepare('select i from t, u where i = j and j > ?')
+      self.assertEqual(list(statement.execute(1).get_raw_rows()), [(2,)])
+      self.assertEqual(list(statement.execute(0).get_raw_rows()), [(1,), (2,)])
+      self.assertIs(statement.execute(1), statement.execute(1))
+      self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+      self.session.execute('insert into u values 3')
+      self.assertEqual(list(statement.execute(1).get_raw_rows()), [(2,), (3,)])
+
+      # equal parameters of different types don't share the result
+      statement = self.session.prepare('select s from t where i = ?')
+      self.assertEqual(len(statement.execute(1)), 1)
+      self.assertRaises(TypeError, statement.execute, 1.0)
+      self.assertRaises(TypeError, statement.execute, True)
+
+      # the results of cursors and of create table as aren't shared
+      self.assertEqual(self.session.execute('select * from t', cursor=True).fetchall(), [(1, 'a'), (2, 'b'), (3, 'c')])
+      self.session.execute('create table v as select i from t where i > 0')
+      self.assertIsNot(self.session.execute('select i from t where i > 0'), self.database.print_table('v'))
+
+
+   def test_views(self):
+      self.session.execute('create materialized view v as select s from t where i > 1')
+      self.assertEqual(len(self.session.execute('select * from v')), 2)
+      self.session.execute("insert into t values 5, 'e'")
+      self.assertEqual(len(self.session.execute('select * from v')), 3)
+
+
+   def test_eviction(self):
+      cache = sql_interpreter.result_cache.ResultCache(100)
+      cache.put('a', (0,), 'A', 40)
+      cache.put('b', (0,), 'B', 40)
+      self.assertEqual(cache.get('a', (0,)), 'A')
+      # b is the least recently used
+      cache.put('c', (0,), 'C', 40)
+      self.assertEqual(cache.get('b', (0,)), None)
+      self.assertEqual(cache.get('a', (0,)), 'A')
+      self.assertEqual(cache.memory_usage, 80)
+      # results larger than the cache aren't stored
+      cache.put('d', (0,), 'D', 101)
+      self.assertEqual(len(cache), 2)
+      # stale results are removed
+      self.assertEqual(cache.get('c', (1,)), None)
+      self.assertEqual((len(cache), cache.memory_usage, cache.hits, cache.misses), (1, 40, 2, 2))
@@ -0,0 +1,141 @@
+import itertools
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.executor
+import sql_interpreter.lexer
+import sql_interpreter.parser
+
+
+
+class Select(unittest.TestCase):
+
+   setup_queries = (
+      "create table a (a_id int, a_name string)",
+      "create table b (b_id int, b_value float)",
+      "insert into a values 1, 'one'",
+      "insert into a values 2, 'two'",
+      "insert into a values 3, 'three'",
+      "insert into b values 2, 2.5",
+      "insert into b values 3, 3.5",
+      "insert into b values 3, 4.5",
+      "insert into b values 4, 5.5"
+   )
+
+   queries = (
+      ("select * from a",
+       "a_id int,a_name string\n1,'one'\n2,'two'\n3,'three'"),
+      ("select a_name, a_id from a where a_id > 1",
+       "a_name string,a_id int\n'two',2\n'three',3"),
+      ("select a_id, b_value from a, b where a_id = b_id",
+       "a_id int,b_value float\n2,2.5\n3,3.5\n3,4.5"),
+      ("select b_value, a_name from a, b where a_id = b_id and b_value > 3.0",
+       "b_value float,a_name string\n3.5,'three'\n4.5,'three'"),
+      ("select a_id, b_id from a, b where a_id < 2 or b_id = 4",
+       "a_id int,b_id int\n1,2\n1,3\n1,3\n1,4\n2,4\n3,4"),
+      ("select a_id from a, b where a_id > 5",
+       "a_id int")
+   )
+
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.database = sql_interpreter.database.Database()
+      for query in self.setup_queries:
+         self.execute(query)
+
+
+   def execute(self, query):
+      return self.database.transact(*self.parser.parse(self.lexer.tokenize(query)))
+
+
+   def test_select(self):
+      for query, result in self.queries:
+         self.assertEqual(str(self.execute(query)), result, query)
+
+
+   def test_same_result_as_table_methods(self):
+      tables = [self.database.tables['a'], self.database.tables['b']]
+      expected = sql_interpreter.database.Table.cartesian_product(tables).filter_table(["a_id", "b_id", "<"])
+      self.assertEqual(str(self.execute("select * from a, b where a_id < b_id")), str(expected))
+
+
+   def test_equi_join_uses_hash_join(self):
+      tables = [self.database.tables['a'], self.database.tables['b']]
+      condition = sql_interpreter.database.modify_condition(["a_id", "b_id", "=", "b_value", "3.0", ">", "and"],
+                                                            {"a_id": 0, "a_name": 1, "b_id": 2, "b_value": 3})
+      root, _ = self.database.create_planner().plan_joins(tables, condition)
+      pipeline = root.build()
+      self.assertIsInstance(pipeline, sql_interpreter.executor.HashJoin)
+      self.assertIsInstance(pipeline.right, sql_interpreter.executor.Filter)
+      self.assertSequenceEqual(list(pipeline), ((3, 'three', 3, 3.5), (3, 'three', 3, 4.5)))
+
+
+   def test_three_tables_join(self):
+      self.execute("create table c (c_id int, c_name string)")
+      self.execute("insert into c values 3, 'c3'")
+      self.execute("insert into c values 2, 'c2'")
+      self.execute("insert into c values 3, 'c33'")
+      query = "select * from a, b, c where b_id = c_id and a_id = b_id and c_name < 'c33'"
+      tables = [self.database.tables[name] for name in ('a', 'b', 'c')]
+      expected = sql_interpreter.database.Table.cartesian_product(tables)
+      expected = expected.filter_table(["b_id", "c_id", "=", "a_id", "b_id", "=", "and", "c_name", "'c33'", "<", "and"])
+      self.assertEqual(str(self.execute(query)), str(expected))
+
+
+   def test_pipeline_is_lazy(self):
+      scans = [sql_interpreter.executor.TableScan(self.database.tables[name]) for name in ('a', 'b', 'a', 'b')]
+      pipeline = sql_interpreter.executor.cross_product(scans)
+      self.assertSequenceEqual(list(itertools.islice(pipeline, 2)), ((1, 'one', 2, 2.5, 1, 'one', 2, 2.5),
+                                                                      (1, 'one', 2, 2.5, 1, 'one', 3, 3.5)))
+
+
+   def test_order_by_and_limit(self):
+      queries = (
+         ("select a_name from a order by a_name",
+          "a_name string\n'one'\n'three'\n'two'"),
+         ("select a_id from a limit 2",
+          "a_id int\n1\n2"),
+         ("select a_id, b_value from a, b where a_id = b_id order by a_id desc, b_value limit 2",
+          "a_id int,b_value float\n3,3.5\n3,4.5"),
+         ("select b_value from b order by b_id desc limit 3",
+          "b_value float\n5.5\n3.5\n4.5"),
+         ("select b_value from b order by b_id, b_value desc",
+          "b_value float\n2.5\n4.5\n3.5\n5.5"),
+         ("select a_id from a order by a_id limit 0",
+          "a_id int")
+      )
+      for query, result in queries:
+         self.assertEqual(str(self.execute(query)), result, query)
+      self.assertRaises(NameError, self.execute, "select a_id from a order by b_id")
+
+
+   def test_limit_stops_the_scan(self):
+      self.execute("create table c (c_id int)")
+      self.database.insert_values('c', [[i] for i in range(100000)])
+      read_rows = []
+      class CountingScan(sql_interpreter.executor.TableScan):
+         def __iter__(self):
+            for row in super().__iter__():
+               read_rows.append(row)
+               yield row
+      scan = CountingScan(self.database.tables['c'])
+      condition = ('OPERATOR', '>=', ('COLUMN_NAME', 0), ('LITERAL', sql_interpreter.database.TypeInt(10)))
+      pipeline = sql_interpreter.executor.Limit(sql_interpreter.executor.Filter(scan, condition), 5)
+      self.assertEqual(list(pipeline), [(i,) for i in range(10, 15)])
+      self.assertEqual(len(read_rows), 15)
+      self.assertEqual(self.database.explain([], ['c'], [], [('c_id', True)], 3),
+                       "Project c.c_id (rows=3)\n   TopN 3 by c.c_id desc (rows=3)\n      Scan c (rows=100000)")
+
+
+   def test_errors(self):
+      self.assertRaises(NameError, self.execute, "select * from c")
+      self.assertRaises(NameError, self.execute, "select c_id from a")
+      self.assertRaises(ValueError, self.execute, "select a_id, a_id from a")
+      self.assertRaises(TypeError, self.execute, "select * from a, b where a_id = b_value")
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from context import sql_interpreter
+import sql_interpreter.client
+import sql_interpreter.database
+import sql_interpreter.protocol
+import sql_interpreter.server
+
+
+
+class Server(unittest.TestCase):
+
+   def setUp(self):
+      self.directory = tempfile.TemporaryDirectory()
+      self.socket_path = os.path.join(self.directory.name, 'database.sock')
+      self.database = sql_interpreter.database.Database()
+      self.loop = asyncio.new_event_loop()
+      server = sql_interpreter.server.Server(self.database)
+      self.tcp_server = self.loop.run_until_complete(server.start())
+      self.unix_server = self.loop.run_until_complete(server.start(path=self.socket_path))
+      self.port = self.tcp_server.sockets[0].getsockname()[1]
+      self.thread = threading.Thread(target=self.loop.run_forever)
+      self.thread.start()
+
+
+   def tearDown(self):
+      async def close():
+         for server in (self.tcp_server, self.unix_server):
+            server.close()
+            await server.wait_closed()
+      asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+      self.loop.call_soon_threadsafe(self.loop.stop)
+      self.thread.join()
+      self.loop.close()
+      self.directory.cleanup()
+
+
+   def test_execute(self):
+      with sql_interpreter.client.Client(port=self.port) as client:
+         self.assertIsNone(client.execute("create table t (i int, f float, s string)"))
+         client.execute("insert into t values ?, ?, ?", 1, 1.5, 'a')
+         client.execute("insert into t values (2, 2.5, 'b'), (3, 3.5, 'c')")
+         result = client.execute("select s, i from t where f > ?", 2.0)
+         self.assertEqual(str(result), "s string,i int\n'b',2\n'c',3")
+         self.assertRaises(NameError, client.execute, "select * from u")
+         self.assertRaises(ValueError, client.execute, "select")
+         # the connection is still usable after an error
+         self.assertEqual(str(client.execute("print t")), "i int,f float,s string\n1,1.5,'a'\n2,2.5,'b'\n3,3.5,'c'")
+
+      # every client sees the same database
+      with sql_interpreter.client.Client(path=self.socket_path) as client:
+         self.assertEqual(len(client.execute("select i from t")), 3)
+
+
+   def test_pipeline(self):
+      with sql_interpreter.client.Client(port=self.port) as client:
+         statements = ["create table t (i int)"]
+         statements.extend(("insert into t values ?", (i,)) for i in range(1000))
+         statements.append("insert into u values 1")
+         statements.append("select i from t where i >= 998")
+         results = client.pipeline(statements)
+         self.assertEqual(len(results), 1003)
+         self.assertIsInstance(results[-2], NameError)
+         self.assertEqual(str(results[-1]), "i int\n998\n999")
+
+
+   def test_versioned_selects(self):
+      # a long select doesn't stop the inserts of the other connections and doesn't see their rows
+      async def run():
+         server = sql_interpreter.server.Server(sql_interpreter.database.Database())
+         server.chunk_size = 10
+         await server.execute({'query': "create table t (i int)"})
+         await server.execute({'query': "insert into t values " + ', '.join('({})'.format(i) for i in range(100))})
+         select = asyncio.ensure_future(server.execute({'query': "select i from t"}))
+         await asyncio.sleep(0)
+         insert = await server.execute({'query': "insert into t values ?", 'parameters': [100]})
+         self.assertEqual(insert, {'result': None})
+         self.assertFalse(select.done())
+         self.assertEqual((await select)['result']['rows'], [(i,) for i in range(100)])
+         self.assertEqual(len((await server.execute({'query': "select i from t"}))['result']['rows']), 101)
+      asyncio.run(run())
+
+
+   def test_cached_selects(self):
+      # a result is cached with the versions its tables had when the select started
+      async def run():
+         database = sql_interpreter.database.Database(result_cache_memory=1 << 20)
+         server = sql_interpreter.server.Server(database)
+         server.chunk_size = 10
+         await server.execute({'query': "create table t (i int)"})
+         await server.execute({'query': "insert into t values " + ', '.join('({})'.format(i) for i in range(100))})
+         select = asyncio.ensure_future(server.execute({'query': "select i from t where i > ?", 'parameters': [-1]}))
+         await asyncio.sleep(0)
+         await server.execute({'query': "insert into t values ?", 'parameters': [100]})
+         self.assertEqual(len((await select)['result']['rows']), 100)
+         for _ in range(2):
+            result = await server.execute({'query': "select i from t where i > ?", 'parameters': [-1]})
+            self.assertEqual(len(result['result']['rows']), 101)
+         self.assertEqual((database.result_cache.hits, database.result_cache.misses), (1, 2))
+      asyncio.run(run())
+
+
+   def test_bad_frames(self):
+      with socket.create_connection(('127.0.0.1', self.port)) as connection:
+         payload = b'not json'
+         connection.sendall(sql_interpreter.protocol.header.pack(len(payload)) + payload)
+         self.assertEqual(connection.recv(1024), b'')
+      with sql_interpreter.client.Client(port=self.port) as client:
+         client.socket.sendall(sql_interpreter.protocol.encode_frame(['select']))
+         self.assertIsInstance(client.read_response(), ValueError)
+
+
+
+if __name__ == '__main__':
+   unittest.main()
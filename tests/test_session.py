@@ -0,0 +1,70 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.session
+
+
+
+class PreparedStatements(unittest.TestCase):
+
+   def setUp(self):
+      self.database = sql_interpreter.database.Database()
+      self.session = sql_interpreter.session.Session(self.database, cache_size=4)
+      self.session.execute("create table t (i int, f float, s string)")
+      self.session.execute("insert into t values (1, 1.5, 'a'), (2, 2.5, 'b'), (3, 3.5, 'c')")
+
+
+   def test_select_parameters(self):
+      statement = self.session.prepare("select s from t where i > ? and f < ?")
+      self.assertEqual(str(statement.execute(1, 3.0)), "s string\n'b'")
+      self.assertEqual(str(statement.execute(0, 10.0)), "s string\n'a'\n'b'\n'c'")
+      statement = self.session.prepare("select i from t where s = ?")
+      self.assertEqual(str(statement.execute('c')), "i int\n3")
+
+
+   def test_insert_parameters(self):
+      statement = self.session.prepare("insert into t values ?, 4.5, ?")
+      statement.execute(4, 'd')
+      statement = self.session.prepare("insert into t values (?, ?, 'e'), (6, ?, ?)")
+      statement.execute(5, 5.5, 6.5, 'f')
+      self.assertEqual(str(self.session.execute("select i, s from t where i > 3")), "i int,s string\n4,'d'\n5,'e'\n6,'f'")
+
+
+   def test_wrong_parameters(self):
+      statement = self.session.prepare("select s from t where i = ?")
+      self.assertRaises(ValueError, statement.execute)
+      self.assertRaises(ValueError, statement.execute, 1, 2)
+      self.assertRaises(TypeError, statement.execute, 1.0)
+      self.assertRaises(TypeError, statement.execute, [1])
+      statement = self.session.prepare("insert into t values ?, ?, ?")
+      self.assertRaises(TypeError, statement.execute, 4, 4, 'd')
+      self.assertEqual(len(self.database.tables['t']), 3)
+      # placeholders need a prepared statement
+      self.assertRaises(ValueError, self.database.select, [], ['t'], ['i', '?', '='])
+
+
+   def test_plan_cache(self):
+      self.session.execute("select i from t")
+      plan = self.session.get_plan("select i from t")
+      self.assertIs(self.session.get_plan("select i from t"), plan)
+
+      # least recently used plans are evicted
+      for i in range(4):
+         self.session.execute("select i from t where i = {}".format(i))
+      self.assertNotIn("select i from t", self.session.plans)
+      self.assertEqual(len(self.session.plans), 4)
+
+
+   def test_schema_change(self):
+      statement = self.session.prepare("select * from t where i = ?")
+      self.assertEqual(str(statement.execute(1)), "i int,f float,s string\n1,1.5,'a'")
+      self.session.execute("drop t")
+      self.assertRaises(NameError, statement.execute, 1)
+      self.session.execute("create table t (i int, s string)")
+      self.session.execute("insert into t values 1, 'z'")
+      self.assertEqual(str(statement.execute(1)), "i int,s string\n1,'z'")
+
+
+
+if __name__ == '__main__':
+   unittest.main()
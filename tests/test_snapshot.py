@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.lexer
+import sql_interpreter.parser
+
+
+
+class Snapshot(unittest.TestCase):
+
+   correct_queries = (
+      ("store Test to 'data.snap'", ('store', 'Test', 'data.snap')),
+      ("store to 'data.snap'", ('store_database', 'data.snap')),
+      ("load from 'data.snap'", ('load_database', 'data.snap'))
+   )
+
+   syntax_errors = (
+      "store",
+      "store Test",
+      "store Test 'data.snap'",
+      "store Test to",
+      "store Test to data.snap",
+      "store to",
+      "store to 'data.snap' stuff",
+      "load from",
+      "load from 'data.snap' stuff"
+   )
+
+   setup_queries = (
+      "create table t (i int, f float, s string)",
+      "create table u (s string)",
+      "insert into t values (1, 1.5, 'a'), (2, 2.5, 'b'), (3, 3.5, 'a')",
+      "insert into u values ('é')"
+   )
+
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.database = sql_interpreter.database.Database()
+      for query in self.setup_queries:
+         self.execute(self.database, query)
+      self.directory = tempfile.TemporaryDirectory()
+      self.file_name = os.path.join(self.directory.name, 'data.snap')
+
+
+   def tearDown(self):
+      self.directory.cleanup()
+
+
+   def execute(self, database, query):
+      return database.transact(*self.parser.parse(self.lexer.tokenize(query)))
+
+
+   def test_correct_queries(self):
+      for query, result in self.correct_queries:
+         self.assertEqual(self.parser.parse(self.lexer.tokenize(query)), result)
+
+
+   def test_syntax_errors(self):
+      for query in self.syntax_errors:
+         tokens = self.lexer.tokenize(query)
+         self.assertRaises(ValueError, self.parser.parse, tokens)
+
+
+   def test_store_and_load_table(self):
+      self.execute(self.database, "store t to '{}'".format(self.file_name))
+      database = sql_interpreter.database.Database()
+      self.execute(database, "load t2 from '{}'".format(self.file_name))
+      self.assertEqual(str(database.print_table('t2')), str(self.database.print_table('t')))
+      # the loaded table is backed by the file until it's modified
+      self.assertIsInstance(database.tables['t2'].get_column(0).get_raw_values(), memoryview)
+      self.execute(database, "insert into t2 values 4, 4.5, 'c'")
+      self.assertEqual(str(self.execute(database, "select i from t2 where s = 'a' or i > 3")), "i int\n1\n3\n4")
+      # loading into an existing table appends the rows
+      self.execute(database, "load t2 from '{}'".format(self.file_name))
+      self.assertEqual(len(database.tables['t2']), 7)
+
+
+   def test_store_and_load_database(self):
+      self.execute(self.database, "store to '{}'".format(self.file_name))
+      database = sql_interpreter.database.Database()
+      self.execute(database, "load from '{}'".format(self.file_name))
+      for table_name in ('t', 'u'):
+         self.assertEqual(str(database.print_table(table_name)), str(self.database.print_table(table_name)))
+      self.assertRaises(NameError, self.execute, database, "load from '{}'".format(self.file_name))
+
+
+   def test_errors(self):
+      self.assertRaises(NameError, self.execute, self.database, "store v to '{}'".format(self.file_name))
+      self.assertRaises(ValueError, self.execute, self.database, "load from '{}'".format(self.file_name))
+      self.execute(self.database, "store t to '{}'".format(self.file_name))
+      self.assertRaises(TypeError, self.execute, self.database, "load u from '{}'".format(self.file_name))
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,62 @@
+import random
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.sort
+
+
+
+class Sort(unittest.TestCase):
+
+   def setUp(self):
+      generator = random.Random(7)
+      strings = ['', 'a', 'ab', 'abc', 'b', 'ba', 'z\x00', 'z', 'è', '\U0001f600', 'A']
+      self.rows = [(generator.randrange(-5, 5), generator.choice(strings), generator.uniform(-1, 1), i)
+                   for i in range(5000)]
+      self.types = ('int', 'string', 'float', 'int')
+
+
+   def expected(self, keys):
+      # python's stable sort applied from the least significant key
+      rows = list(self.rows)
+      for column_index, descending in reversed(keys):
+         rows.sort(key=lambda row: row[column_index], reverse=descending)
+      return rows
+
+
+   def test_normalized_keys(self):
+      for keys in ([(0, False)], [(1, True)], [(1, True), (0, False)], [(0, True), (1, False), (2, True)],
+                   [(1, False), (0, True)], [(2, True)]):
+         key = sql_interpreter.sort.get_sort_key(keys, self.types)
+         self.assertEqual(sorted(self.rows, key=key), self.expected(keys), keys)
+
+
+   def test_external_sort(self):
+      keys = [(1, True), (0, False)]
+      key = sql_interpreter.sort.get_sort_key(keys, self.types)
+      sorter = sql_interpreter.sort.ExternalSorter(key, 10000)
+      sorter.merge_fan_in = 4
+      sorter.batch_size = 7
+      self.assertEqual(list(sorter.sort(iter(self.rows))), self.expected(keys))
+
+      # the rows fitting inside the budget are never written
+      sorter = sql_interpreter.sort.ExternalSorter(key, 1 << 30)
+      self.assertEqual(list(sorter.sort(iter(self.rows))), self.expected(keys))
+      self.assertEqual(sorter.runs, [])
+
+
+   def test_select(self):
+      database = sql_interpreter.database.Database(sort_memory_budget=20000)
+      database.create_table('t', ['i', 's', 'f', 'n'], list(self.types))
+      database.insert_values('t', [list(row) for row in self.rows])
+      result = database.select(['n', 's'], ['t'], [], [('s', True), ('i', False), ('f', True)])
+      expected = self.expected([(1, True), (0, False), (2, True)])
+      self.assertEqual(list(result.get_raw_rows()), [(row[3], row[1]) for row in expected])
+      cursor = database.select(['n'], ['t'], [], [('f', False)], cursor=True)
+      self.assertEqual(cursor.fetchmany(3), [(row[3],) for row in self.expected([(2, False)])[:3]])
+      cursor.close()
+
+
+
+if __name__ == '__main__':
+   unittest.main()
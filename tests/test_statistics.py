@@ -0,0 +1,101 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.lexer
+import sql_interpreter.parser
+import sql_interpreter.statistics
+
+
+
+class Statistics(unittest.TestCase):
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.database = sql_interpreter.database.Database()
+      self.execute("create table t (i int, f float, s string)")
+      self.execute("insert into t values " + ", ".join("({}, {}.5, 's{}')".format(i, i % 10, i % 4) for i in range(1000)))
+
+
+   def execute(self, query):
+      return self.database.transact(*self.parser.parse(self.lexer.tokenize(query)))
+
+
+   def test_analyze(self):
+      self.assertEqual(self.parser.parse(self.lexer.tokenize("analyze t")), ('analyze', 't'))
+      self.assertRaises(ValueError, self.parser.parse, self.lexer.tokenize("analyze t t"))
+      self.assertRaises(NameError, self.execute, "analyze u")
+
+      self.execute("analyze t")
+      statistics = self.database.tables['t'].get_statistics()
+      self.assertEqual(statistics.row_count, 1000)
+      i, f, s = statistics.columns
+      self.assertEqual((i.min, i.max, i.distinct_count), (0, 999, 1000))
+      self.assertEqual((f.min, f.max, f.distinct_count), (0.5, 9.5, 10))
+      self.assertEqual((s.min, s.max, s.distinct_count), ('s0', 's3', 4))
+      self.assertEqual(len(i.bounds), 33)
+      self.assertEqual((i.bounds[0], i.bounds[16], i.bounds[-1]), (0, 499, 999))
+
+
+   def test_selectivity(self):
+      self.execute("analyze t")
+      i, f, s = self.database.tables['t'].get_statistics().columns
+      self.assertAlmostEqual(i.estimate_selectivity('<', 250), 0.25, places=2)
+      self.assertAlmostEqual(i.estimate_selectivity('>=', 900), 0.1, places=2)
+      self.assertEqual(i.estimate_selectivity('>', 2000), 0)
+      self.assertEqual(i.estimate_selectivity('<', -1), 0)
+      self.assertEqual(i.estimate_selectivity('=', 10), 0.001)
+      self.assertEqual(i.estimate_selectivity('=', 1000), 0)
+      self.assertEqual(f.estimate_selectivity('<>', 1.5), 0.9)
+      self.assertEqual(s.estimate_selectivity('=', 's1'), 0.25)
+
+      # empty tables
+      self.execute("create table u (i int)")
+      self.execute("analyze u")
+      self.assertEqual(self.database.tables['u'].get_statistics().columns[0].estimate_selectivity('<', 1), 0)
+
+
+   def test_planner_estimates(self):
+      self.assertEqual(self.execute("explain select i from t where i < 100"),
+                       "Project t.i (rows=333)\n   Scan t where t.i < 100 (rows=333)")
+      self.execute("analyze t")
+      self.assertEqual(self.execute("explain select i from t where i < 100"),
+                       "Project t.i (rows=101)\n   Scan t where t.i < 100 (rows=101)")
+      self.assertEqual(self.execute("explain select i from t where 's2' = s and 5.5 < f"),
+                       "Project t.i (rows=92)\n   Scan t where ('s2' = t.s) and (5.5 < t.f) (rows=92)")
+
+
+   def test_appended_rows(self):
+      # a few appended rows keep the histogram, more of them switch to min and max interpolation
+      table = self.database.tables['t']
+      self.execute("analyze t")
+      self.execute("insert into t values " + ", ".join("({}, 0.5, 's0')".format(i) for i in range(1000, 1040)))
+      i = table.get_statistics().columns[0]
+      self.assertEqual(i.estimate_selectivity('<', 1020), 1)
+      self.assertEqual(i.get_distinct_count(), 1000)
+      self.execute("insert into t values " + ", ".join("({}, 0.5, 's0')".format(i) for i in range(1040, 1100)))
+      self.assertAlmostEqual(i.estimate_selectivity('<', 1045), 1045 / 1099, places=3)
+      self.assertAlmostEqual(i.estimate_selectivity('>=', 1000), 99 / 1099, places=3)
+      self.assertEqual(i.get_distinct_count(), 1100)
+      self.assertEqual(table.get_statistics().columns[2].get_distinct_count(), 4)
+      self.execute("analyze t")
+      self.assertFalse(table.get_statistics().columns[0].is_interpolated())
+
+
+   def test_stale_statistics(self):
+      table = self.database.tables['t']
+      self.execute("analyze t")
+      self.execute("insert into t values 1000, 0.5, 's9'")
+      self.assertEqual(table.get_statistics().columns[0].max, 1000)
+      self.assertEqual(table.get_statistics().columns[2].max, 's9')
+      self.execute("insert into t values " + ", ".join("({}, 0.5, 's0')".format(i) for i in range(1001, 1300)))
+      self.assertIsNone(table.get_statistics())
+      self.execute("analyze t")
+      self.assertEqual(table.get_statistics().columns[0].max, 1299)
+      table.truncate(10)
+      self.assertIsNone(table.get_statistics())
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.session
+import sql_interpreter.vectorized
+
+
+
+class TableVersions(unittest.TestCase):
+
+   def setUp(self):
+      self.database = sql_interpreter.database.Database(vectorize=True)
+      self.session = sql_interpreter.session.Session(self.database)
+      self.session.execute("create table t (i int, s string)")
+      self.session.execute("create index t_i on t (i) using ordered")
+      self.database.insert_values('t', [[i, 's{}'.format(i % 3)] for i in range(10000)])
+
+
+   def read_while_inserting(self, query):
+      # the pipeline is consumed while rows are appended, it must only return the rows it started with
+      plan = self.session.get_bound_plan(query, ())
+      expected = self.session.execute(query)
+      rows = iter(plan.build_versioned(self.database, ()))
+      result = [next(rows)]
+      # the new rows satisfy all the conditions
+      self.database.insert_values('t', [[9999 - i % 2, 's{}'.format(i % 2 + 1)] for i in range(20000)])
+      result.extend(rows)
+      self.assertEqual(result, list(expected.get_raw_rows()))
+      return expected
+
+
+   def test_versioned_scans(self):
+      table = self.database.tables['t']
+      version = table.get_version()
+      self.assertEqual(len(version), 10000)
+      self.assertEqual(len(self.read_while_inserting("select * from t")), 10000)
+      self.assertEqual(len(self.read_while_inserting("select s from t where i >= 9990")), 20010)
+      self.assertEqual(len(self.read_while_inserting("select i from t where s = 's1'")), 23333)
+      # the zone maps of the table now have more blocks than the version
+      self.read_while_inserting("select i from t where i > 9000 and s = 's2'")
+      self.assertEqual(len(table), 90000)
+      self.assertEqual(len(version), 10000)
+      self.assertEqual(version.get_version(), version)
+
+
+   @unittest.skipUnless(sql_interpreter.vectorized.is_available(), 'numpy is not installed')
+   def test_vectorized_scan(self):
+      self.assertEqual(len(self.read_while_inserting("select s from t where i * 2 < 100")), 50)
+      self.assertEqual(len(self.read_while_inserting("select s from t where i * 2 > 19996")), 10001)
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+
+
+
+class TypeValues(unittest.TestCase):
+
+   values = (
+      sql_interpreter.database.TypeInt("1"),
+      sql_interpreter.database.TypeFloat("1.5"),
+      sql_interpreter.database.TypeString("'a'"),
+      sql_interpreter.database.TypeBool(True)
+   )
+
+
+   def test_values_have_no_dict(self):
+      for value in self.values:
+         self.assertFalse(hasattr(value, '__dict__'))
+         self.assertIs(value.operators, type(value).operators)
+
+
+   def test_interning(self):
+      TypeInt = sql_interpreter.database.TypeInt
+      TypeString = sql_interpreter.database.TypeString
+      self.assertIs(TypeInt.new_instance(7), TypeInt.new_instance(7))
+      self.assertIsNot(TypeInt.new_instance(7, True), TypeInt.new_instance(7))
+      self.assertEqual(TypeInt.new_instance(10 ** 20).get_value(), 10 ** 20)
+      self.assertIs(TypeString.new_instance('abc'), TypeString.new_instance('abc'))
+      self.assertIs(TypeInt("2").do_operation('<', TypeInt("3")), sql_interpreter.database.TypeBool.true)
+
+
+   def test_operations(self):
+      TypeInt = sql_interpreter.database.TypeInt
+      TypeFloat = sql_interpreter.database.TypeFloat
+      TypeString = sql_interpreter.database.TypeString
+      self.assertEqual(str(TypeInt("7").do_operation('/', TypeInt("2"))), "3")
+      self.assertEqual(str(TypeInt("7").do_operation('/', TypeInt("0"))), "NaN")
+      self.assertEqual(str(TypeFloat("7.").do_operation('-', TypeFloat("0.5"))), "6.5")
+      self.assertEqual(str(TypeString("'a'").do_operation('+', TypeString("'b'"))), "'ab'")
+      nan = TypeInt("7").do_operation('/', TypeInt("0"))
+      self.assertFalse(nan.do_operation('=', nan).get_value())
+      self.assertRaises(TypeError, TypeInt("1").do_operation, '+', TypeFloat("1.0"))
+      self.assertRaises(ValueError, TypeString("'a'").do_operation, '*', TypeString("'b'"))
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.executor
+import sql_interpreter.vectorized
+
+
+
+@unittest.skipUnless(sql_interpreter.vectorized.is_available(), 'numpy is not installed')
+class Vectorized(unittest.TestCase):
+
+   column_names = ("i", "f", "z", "s")
+   column_types = ("int", "float", "int", "string")
+   values = ((1, 1.5, 0, "a"), (2, -2.5, 0, "b"), (7, 3.5, 1, "a"), (-7, 0.0, 2, "c"), (0, 0.5, 0, "d"))
+
+   conditions = (
+      ["i", "1", ">"],
+      ["i", "2", "<="],
+      ["i", "1.5", "<="],
+      ["i", "2", "/", "3", "="],
+      ["i", "-2", "/", "-3", "="],
+      ["i", "2", "*", "1", "+", "i", "-", "3", ">="],
+      ["f", "1.0", ">", "i", "2", "<", "and"],
+      ["f", "3.0", ">", "i", "0", "=", "or"],
+      ["i", "z", "/", "0", "<"],
+      ["i", "z", "/", "0", ">="],
+      ["i", "z", "/", "i", "<>"],
+      ["i", "z", "/", "1", "-", "i", "="],
+      ["f", "0.0", "/", "f", "<>"],
+      ["f", "f", "/", "1.0", "="],
+      ["1", "1", "="],
+      ["i", "1", ">", "s", "'a'", "=", "and"]
+   )
+
+
+   def create_table(self):
+      table = sql_interpreter.database.Table(self.column_names, self.column_types)
+      for row in self.values:
+         table.insert_row(row)
+      return table
+
+
+   def test_same_result_as_compiled(self):
+      table = self.create_table()
+      for condition in self.conditions:
+         expected = str(table.filter_table(condition))
+         self.assertEqual(str(table.filter_table(condition, vectorize=True)), expected, condition)
+
+
+   def test_vectorized_scan_is_used(self):
+      table = self.create_table()
+      tree = sql_interpreter.compiler.build_tree(table.modify_condition(["i", "1", ">", "s", "'a'", "=", "and"]))
+      scan = table.scan(sql_interpreter.compiler.split_conjuncts(tree), vectorize=True)
+      self.assertIsInstance(scan, sql_interpreter.executor.Filter)
+      self.assertIsInstance(scan.child, sql_interpreter.executor.VectorizedScan)
+      self.assertSequenceEqual(list(scan), ((7, 3.5, 1, "a"),))
+
+
+   def test_columns_can_grow_after_scan(self):
+      table = self.create_table()
+      table.filter_table(["i", "1", ">"], vectorize=True)
+      table.insert_row((3, 3.0, 3, "e"))
+      self.assertEqual(len(table), 6)
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from context import sql_interpreter
+import sql_interpreter.database
+import sql_interpreter.lexer
+import sql_interpreter.parser
+import sql_interpreter.wal
+
+
+
+class WriteAheadLog(unittest.TestCase):
+
+   queries = (
+      "create table t (i int, s string)",
+      "create index t_i on t (i)",
+      "insert into t values 1, 'a'",
+      "insert into t values (2, 'b'), (3, 'c')",
+      "create table u as select s from t where i > 1",
+      "create table v (i int)",
+      "drop v"
+   )
+
+
+   def setUp(self):
+      self.lexer = sql_interpreter.lexer.SQLLexer()
+      self.parser = sql_interpreter.parser.SQLParser()
+      self.directory = tempfile.TemporaryDirectory()
+      self.wal_file_name = os.path.join(self.directory.name, 'database.wal')
+
+
+   def tearDown(self):
+      self.directory.cleanup()
+
+
+   def open_database(self, **kwargs):
+      return sql_interpreter.database.Database(wal_file_name=self.wal_file_name, **kwargs)
+
+
+   def execute(self, database, query):
+      return database.transact(*self.parser.parse(self.lexer.tokenize(query)))
+
+
+   def check_content(self, database):
+      self.assertEqual(sorted(database.tables), ['t', 'u'])
+      self.assertEqual(str(database.print_table('t')), "i int,s string\n1,'a'\n2,'b'\n3,'c'")
+      self.assertEqual(str(database.print_table('u')), "s string\n'b'\n'c'")
+      self.assertEqual(database.indexes, {'t_i': 't'})
+
+
+   def test_replay(self):
+      database = self.open_database(fsync_interval=0)
+      for query in self.queries:
+         self.execute(database, query)
+      # failed commands aren't logged
+      self.assertRaises(NameError, self.execute, database, "insert into w values 1")
+      database.close()
+
+      database = self.open_database()
+      self.check_content(database)
+      self.execute(database, "insert into t values 4, 'd'")
+      database.close()
+      database = self.open_database()
+      self.assertEqual(len(database.tables['t']), 4)
+      database.close()
+
+
+   def test_half_written_record(self):
+      database = self.open_database()
+      for query in self.queries:
+         self.execute(database, query)
+      database.close()
+      with open(self.wal_file_name, 'a') as log_file:
+         log_file.write('{"lsn": 8, "command": "insert_into", "args": ["t", ["4"')
+
+      database = self.open_database()
+      self.check_content(database)
+      self.execute(database, "insert into t values 4, 'd'")
+      database.close()
+      database = self.open_database()
+      self.assertEqual(len(database.tables['t']), 4)
+      database.close()
+
+
+   def test_checkpoint(self):
+      database = self.open_database(checkpoint_interval=3)
+      for query in self.queries:
+         self.execute(database, query)
+      database.wal.sync()
+      self.assertEqual(len(sql_interpreter.wal.WriteAheadLog.recover(self.wal_file_name)), 1)
+      database.close()
+
+      database = self.open_database()
+      self.check_content(database)
+      database.close()
+
+
+   def test_records_before_checkpoint_are_skipped(self):
+      database = self.open_database()
+      for query in self.queries:
+         self.execute(database, query)
+      database.wal.sync()
+      # simulates a crash between the checkpoint and the truncation of the log
+      with open(self.wal_file_name, 'rb') as log_file:
+         content = log_file.read()
+      database.checkpoint()
+      database.close()
+      with open(self.wal_file_name, 'wb') as log_file:
+         log_file.write(content)
+
+      database = self.open_database()
+      self.check_content(database)
+      database.close()
+
+
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from context import sql_interpreter
+import sql_interpreter.compiler
+import sql_interpreter.database
+import sql_interpreter.executor
+import sql_interpreter.session
+import sql_interpreter.zonemap
+
+
+
+class ZoneMaps(unittest.TestCase):
+
+   def setUp(self):
+      self.block_size = sql_interpreter.zonemap.ZoneMap.block_size
+      self.table = sql_interpreter.database.Table(['t', 'v', 's'], ['int', 'float', 'string'])
+      self.table.insert_raw_columns([list(range(10000)), [float(i % 7) for i in range(10000)], ['s{}'.format(i % 3) for i in range(10000)]])
+
+
+   def build_tree(self, condition):
+      return sql_interpreter.compiler.build_tree(self.table.modify_condition(condition))
+
+
+   def test_zone_maps(self):
+      zone_maps = self.table.get_zone_maps()
+      self.assertEqual(len(zone_maps[0]), 3)
+      self.assertEqual(zone_maps[0].mins, [0, self.block_size, 2 * self.block_size])
+      self.assertEqual(zone_maps[0].maxs, [self.block_size - 1, 2 * self.block_size - 1, 9999])
+      self.assertEqual((zone_maps[1].mins[0], zone_maps[1].maxs[0]), (0.0, 6.0))
+      self.assertEqual((zone_maps[2].mins[0], zone_maps[2].maxs[0]), ('s0', 's2'))
+
+      # appended rows extend the last block and add new ones
+      self.table.insert_raw_rows([(i, 0.0, 'a') for i in range(10000, 13000)])
+      self.assertEqual(zone_maps[0].maxs, [self.block_size - 1, 2 * self.block_size - 1, 3 * self.block_size - 1, 12999])
+      self.assertEqual(zone_maps[2].mins[-1], 'a')
+      self.table.truncate(100)
+      self.assertIsNone(self.table.zone_maps)
+
+
+   def test_single_row_appends(self):
+      zone_maps = self.table.get_zone_maps()
+      for i in range(3 * self.block_size - 10000 + 5):
+         self.table.insert_raw_rows([(20000 - i, 0.5, 's')])
+      rebuilt = sql_interpreter.zonemap.ZoneMap(self.table.get_column(0))
+      self.assertEqual((zone_maps[0].mins, zone_maps[0].maxs), (rebuilt.mins, rebuilt.maxs))
+      self.assertEqual(len(zone_maps[0]), 4)
+
+
+   def test_nans(self):
+      # a block containing a NaN is always read
+      database = sql_interpreter.database.Database()
+      session = sql_interpreter.session.Session(database)
+      session.execute('create table t (f float)')
+      insert = session.prepare('insert into t values ?')
+      insert.execute(float('nan'))
+      database.insert_values('t', [[float(i)] for i in range(10000)])
+      self.assertEqual(len(session.execute('select * from t where f < 5.0')), 5)
+      insert.execute(float('nan'))
+      self.assertEqual(len(session.execute('select * from t where f > 9990.0')), 9)
+      self.assertEqual(len(database.tables['t'].filter_table(['f', '5.0', '<'])), 5)
+
+
+   def test_skipped_blocks(self):
+      tree = ('OPERATOR', '>=', ('COLUMN_NAME', 0), ('LITERAL', sql_interpreter.database.TypeInt(9000)))
+      scan = self.table.scan([tree])
+      self.assertIsInstance(scan.child, sql_interpreter.executor.BlockScan)
+      self.assertEqual(scan.child.row_ranges, [(2 * self.block_size, 10000)])
+      self.assertEqual([row[0] for row in scan], list(range(9000, 10000)))
+
+      condition = ['t', '1000', '>', '5000', 't', '>', 'and', 'v', '1.0', '=', 'and']
+      expected = [row for row in self.table.get_raw_rows() if 1000 < row[0] < 5000 and row[1] == 1.0]
+      self.assertEqual(list(self.table.filter_table(condition).get_raw_rows()), expected)
+      self.assertEqual(self.table.find_row_ranges([self.build_tree(['5000', 't', '>'])]), [(0, 2 * self.block_size)])
+      self.assertEqual(self.table.find_row_ranges([self.build_tree(['t', '-1', '<'])]), [])
+      self.assertIsNone(self.table.find_row_ranges([self.build_tree(['t', '0', '>='])]))
+      self.assertIsNone(self.table.find_row_ranges([self.build_tree(['t', 'v', '>'])]))
+
+      # blocks which can't contain a string
+      tree = ('OPERATOR', '=', ('LITERAL', sql_interpreter.database.TypeString("'s5'")), ('COLUMN_NAME', 2))
+      self.assertEqual(self.table.find_row_ranges([tree]), [])
+      self.assertEqual(list(self.table.scan([tree])), [])
+
+
+   def test_explain(self):
+      database = sql_interpreter.database.Database()
+      database.tables['t'] = self.table
+      self.assertEqual(database.explain(['t'], ['t'], ['t', '9000', '>=']),
+                       "Project t.t (rows=3333)\n   Scan t using zone maps (1808 of 10000 rows) where t.t >= 9000 (rows=3333)")
+
+
+
+if __name__ == '__main__':
+   unittest.main()